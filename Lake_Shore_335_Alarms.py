@@ -0,0 +1,103 @@
+import json
+import math
+
+import numpy as np
+
+
+# Columns of a sample row after the time column
+CHANNELS = ("A", "B", "diff", "rate_a", "rate_b", "heater")
+
+DEFAULT_RULES = [
+    {"name": "A out of range", "channel": "A", "low": 1.0, "high": 400.0, "hysteresis": 1.0, "holdoff": 5.0},
+    {"name": "B out of range", "channel": "B", "low": 1.0, "high": 400.0, "hysteresis": 1.0, "holdoff": 5.0},
+    {"name": "|A-B| too large", "channel": "diff", "low": None, "high": 10.0, "hysteresis": 0.5, "holdoff": 30.0},
+    {"name": "Runaway dT/dt A", "channel": "rate_a", "low": -20.0, "high": 20.0, "hysteresis": 2.0, "holdoff": 10.0},
+    {"name": "Runaway dT/dt B", "channel": "rate_b", "low": -20.0, "high": 20.0, "hysteresis": 2.0, "holdoff": 10.0},
+    {"name": "Heater stuck at 100%", "channel": "heater", "low": None, "high": 99.5, "hysteresis": 5.0,
+     "holdoff": 300.0},
+]
+
+
+def load_rules(file_path):
+    """Read a JSON list of rules; `low`/`high` may be null for a one-sided limit."""
+    with open(file_path) as f:
+        rules = json.load(f)
+    for rule in rules:
+        if rule.get("channel") not in CHANNELS:
+            raise ValueError(f"Rule {rule.get('name')!r} has an unknown channel, use one of {', '.join(CHANNELS)}")
+    return rules
+
+
+class AlarmEngine:
+    """
+    Limit alarms with hysteresis and hold-off, evaluated on batches of samples.
+
+    Rules are held as parallel NumPy arrays, so each sample is checked against all rules
+    with a handful of vector operations and the per-sample cost hardly depends on the
+    number of rules. A rule raises once its channel has been outside [low, high] for
+    `holdoff` seconds and clears once it is back inside [low + hysteresis, high - hysteresis].
+
+    Listeners are called as listener(name, state, time, value) with state "raised" or "cleared".
+    """
+
+    def __init__(self, rules=None):
+        self.listeners = []
+        self.pending = []
+        self.set_rules(DEFAULT_RULES if rules is None else rules)
+
+    def set_rules(self, rules):
+        self.rules = list(rules)
+        self.names = [rule["name"] for rule in self.rules]
+        self.columns = np.array([1 + CHANNELS.index(rule["channel"]) for rule in self.rules], dtype=np.intp)
+        self.low = np.array([-np.inf if rule.get("low") is None else rule["low"] for rule in self.rules], dtype=float)
+        self.high = np.array([np.inf if rule.get("high") is None else rule["high"] for rule in self.rules], dtype=float)
+        self.hysteresis = np.array([rule.get("hysteresis", 0.0) for rule in self.rules], dtype=float)
+        self.holdoff = np.array([rule.get("holdoff", 0.0) for rule in self.rules], dtype=float)
+        self.reset()
+
+    def reset(self):
+        """Forget pending samples and alarm states, e.g. when the run time starts again at 0 s."""
+        self.pending.clear()
+        self.active = np.zeros(len(self.rules), dtype=bool)
+        self.since = np.full(len(self.rules), np.nan)  # Start of the current violation
+
+    def add_listener(self, listener):
+        self.listeners.append(listener)
+
+    def push(self, t, temp_a, temp_b, abs_diff, rate_a, rate_b, heater):
+        # Missing values (e.g. no heater reading yet) never raise or clear anything
+        self.pending.append((t, temp_a, temp_b, abs_diff, rate_a, rate_b, math.nan if heater is None else heater))
+
+    def evaluate(self):
+        """Check all pending samples; returns the list of (name, state, time, value) transitions."""
+        if not self.pending or not self.rules:
+            self.pending.clear()
+            return []
+        batch = np.asarray(self.pending, dtype=float)
+        self.pending.clear()
+        times = batch[:, 0]
+        values = batch[:, self.columns]  # (samples, rules)
+        outside = (values < self.low) | (values > self.high)
+        inside = (values >= self.low + self.hysteresis) & (values <= self.high - self.hysteresis)
+
+        transitions = []
+        for i in range(len(times)):
+            t = times[i]
+            out = outside[i]
+            self.since[out & np.isnan(self.since)] = t
+            self.since[~out] = np.nan
+            raised = ~self.active & out & (t - self.since >= self.holdoff)
+            cleared = self.active & inside[i]
+            if raised.any() or cleared.any():
+                self.active = (self.active | raised) & ~cleared
+                for index in np.flatnonzero(raised | cleared):
+                    state = "raised" if raised[index] else "cleared"
+                    transitions.append((self.names[index], state, float(t), float(values[i, index])))
+
+        for transition in transitions:
+            for listener in self.listeners:
+                listener(*transition)
+        return transitions
+
+    def active_names(self):
+        return [self.names[index] for index in np.flatnonzero(self.active)]
@@ -0,0 +1,175 @@
+import collections
+
+from Lake_Shore_335_Simulation import Lakeshore335PID, settling_metrics
+
+
+class StepTestAutotuner:
+    """
+    Open-loop step test fed from the streaming temperature history.
+
+    The heater is held at `base_output` [%] until the sensor is steady, then stepped to
+    `base_output + step_output` until it is steady again. The recorded response is fitted
+    with a first-order-plus-dead-time model and turned into 335 P/I/D values.
+
+    After the step, steady is relative to the response: the change over the window must be
+    below `settle_fraction` of the change since the step, and at least `min_time_constants`
+    estimated time constants must have passed. An absolute rate alone stops a slow plant
+    well short of its final value, which biases the fitted gain and time constant.
+    """
+
+    def __init__(self, base_output=10.0, step_output=10.0, settle_window=120.0, settle_rate=0.002,
+                 max_duration=3600.0, settle_fraction=0.005, min_time_constants=5.0):
+        self.base_output = base_output
+        self.step_output = step_output
+        self.settle_window = settle_window  # Length of the steadiness window [s]
+        self.settle_rate = settle_rate  # Max |dT/dt| over the window to count as steady [K/s]
+        self.settle_fraction = settle_fraction  # Max change over the window after the step, relative to the step
+        self.min_time_constants = min_time_constants  # Min step phase length in estimated (dead time + tau)
+        self.max_duration = max_duration  # Abort each phase after this long [s]
+        self.state = "baseline"
+        self.window = collections.deque()
+        self.phase_start = None
+        self.baseline = None
+        self.step_time = None
+        self.response = []  # (t, T) after the step
+        self.result = None
+        self.error = None
+
+    def output(self):
+        """Manual output [%] the heater should be at for the current phase."""
+        if self.state == "step":
+            return min(100.0, self.base_output + self.step_output)
+        return self.base_output
+
+    def is_steady(self, t):
+        # Only the window ends are used, so the check is O(1) per sample
+        if not self.window or t - self.window[0][0] < self.settle_window:
+            return False
+        (t0, temp0), (t1, temp1) = self.window[0], self.window[-1]
+        if abs(temp1 - temp0) / (t1 - t0) > self.settle_rate:
+            return False
+        if self.state != "step":
+            return True
+        change = temp1 - self.baseline
+        if abs(temp1 - temp0) > self.settle_fraction * abs(change):
+            return False
+        # Rarely reached, so scanning the response for the 63 % crossing here stays cheap
+        level = self.baseline + 0.632 * change
+        t63 = next((ts for ts, temp in self.response if (temp - level) * change >= 0), t)
+        return t - self.step_time >= self.min_time_constants * (t63 - self.step_time)
+
+    def feed(self, t, temp):
+        """Add one sample. Returns True when the tuner changed phase and the output must be rewritten."""
+        if self.state in ("done", "failed"):
+            return False
+        if self.phase_start is None:
+            self.phase_start = t
+        self.window.append((t, temp))
+        while self.window and t - self.window[0][0] > self.settle_window:
+            self.window.popleft()
+        if self.state == "step":
+            self.response.append((t, temp))
+
+        if self.is_steady(t):
+            mean = sum(v for _, v in self.window) / len(self.window)
+            if self.state == "baseline":
+                self.baseline = mean
+                self.step_time = t
+                self.state = "step"
+                self.phase_start = t
+                self.window.clear()
+                return True
+            self.finish(mean)
+            return True
+        if t - self.phase_start > self.max_duration:
+            self.error = f"No steady state within {self.max_duration:.0f} s in the {self.state} phase"
+            self.state = "failed"
+            return True
+        return False
+
+    def finish(self, final):
+        du = self.output() - self.base_output
+        try:
+            gain, tau, dead_time = fit_fopdt(self.response, self.step_time, self.baseline, final, du)
+        except ValueError as e:
+            self.state = "failed"
+            self.error = str(e)
+            return
+        P, I, D = imc_pid(gain, tau, dead_time)
+        self.result = {"gain": gain, "tau": tau, "dead_time": dead_time, "P": P, "I": I, "D": D}
+        self.state = "done"
+
+
+def fit_fopdt(response, step_time, baseline, final, du):
+    """
+    Two-point (28.3 % / 63.2 %) fit of a first-order-plus-dead-time model.
+
+    Returns (gain [K/%], time constant [s], dead time [s]).
+    """
+    change = final - baseline
+    if du == 0 or abs(change) < 1e-3:
+        raise ValueError("Step response too small to fit, increase the step output")
+
+    def crossing(fraction):
+        level = baseline + fraction * change
+        prev = None
+        for t, temp in response:
+            if (temp - level) * change >= 0:
+                if prev is None:
+                    return t - step_time
+                (tp, vp) = prev
+                # Linear interpolation between the samples around the crossing
+                return tp - step_time + (level - vp) / (temp - vp) * (t - tp) if temp != vp else t - step_time
+            prev = (t, temp)
+        raise ValueError(f"Response never reached {fraction:.0%} of its final value")
+
+    t28 = crossing(0.283)
+    t63 = crossing(0.632)
+    tau = 1.5 * (t63 - t28)
+    dead_time = max(t63 - tau, 0.0)
+    if tau <= 0:
+        raise ValueError("Could not resolve a time constant from the response")
+    return change / du, tau, dead_time
+
+
+def imc_pid(gain, tau, dead_time, closed_loop_tau=None):
+    """
+    IMC PID tuning for a FOPDT model, converted to 335 units.
+
+    The 335 computes Output = P * (e + I/1000 * integral(e) + D/100 * Ti/4 * de/dt),
+    so P = Kc, I = 1000 / Ti and D = 400 * Td / Ti, each clamped to the front-panel limits.
+    """
+    dead_time = max(dead_time, 1e-3)
+    lam = closed_loop_tau if closed_loop_tau is not None else max(dead_time, 0.25 * tau)
+    kc = (tau + dead_time / 2.0) / (abs(gain) * (lam + dead_time / 2.0))
+    ti = tau + dead_time / 2.0
+    td = tau * dead_time / (2.0 * tau + dead_time)
+    P = min(max(kc, 0.1), 1000.0)
+    I = min(max(1000.0 / ti, 0.1), 1000.0)
+    D = min(max(400.0 * td / ti, 0.0), 200.0)
+    return round(P, 1), round(I, 1), round(D, 0)
+
+
+def predict_metrics(gain, tau, dead_time, P, I, D, base_output=10.0, step=1.0, tolerance=0.1, dt=0.5):
+    """
+    Simulate the 335 loop on the fitted model for a setpoint step of `step` kelvin.
+
+    The loop starts in equilibrium at `base_output` [%], so output saturation is modelled.
+    """
+    duration = max(20.0 * (tau + dead_time), 600.0)
+    controller = Lakeshore335PID(P, I, D)
+    if P > 0 and I > 0:
+        controller.integral = base_output * 1000.0 / (P * I)  # Integrator holds the equilibrium output
+    delay = collections.deque([base_output] * max(1, int(round(dead_time / dt))))
+    # Temperatures relative to the equilibrium at base_output
+    y = 0.0
+    times, temps = [], []
+    t = 0.0
+    while t <= duration:
+        out = controller.update(step, y, dt)
+        delay.append(out)
+        y += (gain * (delay.popleft() - base_output) - y) / tau * dt
+        times.append(t)
+        temps.append(y)
+        t += dt
+    return settling_metrics(times, temps, step, tolerance)
@@ -0,0 +1,120 @@
+import tkinter as tk
+
+import numpy as np
+
+
+# Panels of the lightweight live view: title and the traces it shows as (label, color, dash)
+PANELS = (
+    ("Temperature [K]", (("Channel A", "#d62728", ""), ("Channel B", "#1f77b4", (4, 2)))),
+    ("|A - B| [K]", (("|A - B|", "black", ""), ("Lag corrected", "gray", (4, 2)))),
+    ("dT/dt [K/s]", (("dT_A/dt", "purple", ""), ("dT_B/dt", "orange", ""))),
+)
+
+MARGIN_LEFT = 64
+MARGIN_RIGHT = 12
+MARGIN_TOP = 20
+MARGIN_BOTTOM = 20
+GRID_LINES = 3
+
+
+def decimate(t, y, x_lower, x_upper, width):
+    """
+    Pixel-column min/max decimation: at most two points per column, so spikes survive.
+
+    Returns (x, y) with x in pixels from the left edge of the plot area, or None when
+    there is nothing to draw.
+    """
+    finite = np.isfinite(y)
+    t, y = t[finite], y[finite]
+    if len(t) < 2 or x_upper <= x_lower:
+        return None
+    px = np.clip((t - x_lower) / (x_upper - x_lower) * (width - 1), 0, width - 1).astype(np.int64)
+    if len(t) <= 2 * width:
+        return px, y
+    starts = np.flatnonzero(np.concatenate(([True], np.diff(px) != 0)))
+    low = np.minimum.reduceat(y, starts)
+    high = np.maximum.reduceat(y, starts)
+    return np.repeat(px[starts], 2), np.column_stack((low, high)).ravel()
+
+
+class StripChart:
+    """
+    Live strip charts drawn directly on a tk.Canvas.
+
+    Canvas items are created once and only their coordinates change per frame, each trace
+    being one polyline of at most two points per pixel column. There are no legends, tick
+    locators or antialiasing, so a frame costs a small fraction of an Agg redraw.
+    `on_click(index)` is called with the panel index when a panel is clicked.
+    """
+
+    def __init__(self, master, panels=PANELS, on_click=None):
+        self.panels = panels
+        self.on_click = on_click
+        self.canvas = tk.Canvas(master, bg="#b3b3b3", highlightthickness=0)
+        self.canvas.bind("<Button-1>", self.clicked)
+        self.items = []
+        for title, traces in panels:
+            item = {
+                "frame": self.canvas.create_rectangle(0, 0, 0, 0, outline="black"),
+                "grid": [self.canvas.create_line(0, 0, 0, 0, fill="white", dash=(3, 3)) for _ in range(GRID_LINES)],
+                "title": self.canvas.create_text(0, 0, text=title, anchor="n", font=("Helvetica", 10, "bold")),
+                "y_labels": [self.canvas.create_text(0, 0, anchor="e", font=("Helvetica", 8))
+                             for _ in range(GRID_LINES + 2)],
+                "x_labels": [self.canvas.create_text(0, 0, anchor="n", font=("Helvetica", 8)) for _ in range(3)],
+                "traces": [self.canvas.create_line(0, 0, 0, 0, fill=color, dash=dash, width=1.5, state="hidden")
+                           for _, color, dash in traces],
+            }
+            self.items.append(item)
+
+    def widget(self):
+        return self.canvas
+
+    def panel_box(self, index):
+        width = max(self.canvas.winfo_width(), 2 * (MARGIN_LEFT + MARGIN_RIGHT))
+        height = max(self.canvas.winfo_height(), len(self.panels) * (MARGIN_TOP + MARGIN_BOTTOM + 10))
+        panel_height = height / len(self.panels)
+        top = index * panel_height + MARGIN_TOP
+        return MARGIN_LEFT, top, width - MARGIN_RIGHT, (index + 1) * panel_height - MARGIN_BOTTOM
+
+    def clicked(self, event):
+        if self.on_click is None:
+            return
+        for index in range(len(self.panels)):
+            left, top, right, bottom = self.panel_box(index)
+            if left <= event.x <= right and top <= event.y <= bottom:
+                self.on_click(index)
+                return
+
+    def draw(self, x_lower, x_upper, data):
+        """
+        Redraw all panels. `data` holds one (y_lower, y_upper, [(t, y, visible), ...]) per panel,
+        in the order of the panels and their traces.
+        """
+        canvas = self.canvas
+        for index, (item, (y_lower, y_upper, traces)) in enumerate(zip(self.items, data)):
+            left, top, right, bottom = self.panel_box(index)
+            width, height = right - left, bottom - top
+            canvas.coords(item["frame"], left, top, right, bottom)
+            canvas.coords(item["title"], (left + right) / 2, top - MARGIN_TOP + 2)
+
+            for k, line in enumerate(item["grid"]):
+                y = top + height * (k + 1) / (GRID_LINES + 1)
+                canvas.coords(line, left, y, right, y)
+            for k, label in enumerate(item["y_labels"]):
+                fraction = k / (GRID_LINES + 1)
+                canvas.coords(label, left - 4, bottom - height * fraction)
+                canvas.itemconfigure(label, text=f"{y_lower + (y_upper - y_lower) * fraction:.3g}")
+            for k, label in enumerate(item["x_labels"]):
+                canvas.coords(label, left + width * k / 2, bottom + 2)
+                canvas.itemconfigure(label, text=f"{x_lower + (x_upper - x_lower) * k / 2:.0f}")
+
+            span = (y_upper - y_lower) or 1.0
+            for line, (t, y, visible) in zip(item["traces"], traces):
+                points = decimate(t, y, x_lower, x_upper, int(width)) if visible else None
+                if points is None:
+                    canvas.itemconfigure(line, state="hidden")
+                    continue
+                px, values = points
+                ys = np.clip(bottom - (values - y_lower) / span * height, top, bottom)
+                canvas.coords(line, np.column_stack((px + left, ys)).ravel().tolist())
+                canvas.itemconfigure(line, state="normal")
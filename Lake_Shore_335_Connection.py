@@ -0,0 +1,175 @@
+import threading
+import time
+
+import pyvisa
+
+
+class CircuitBreaker:
+    """Stops traffic to a failing bus and lets a probe through with exponential backoff."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(self, failure_threshold=2, base_delay=0.5, max_delay=30.0):
+        self.failure_threshold = failure_threshold
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.state = self.CLOSED
+        self.failures = 0
+        self.trips = 0  # Consecutive trips, drives the backoff exponent
+        self.next_probe = 0.0
+        self.lock = threading.Lock()
+
+    def allow(self):
+        with self.lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() >= self.next_probe:
+                self.state = self.HALF_OPEN
+                return True
+            return False
+
+    def record_success(self):
+        with self.lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self.trips = 0
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.trip()
+
+    def trip(self):
+        # Caller holds the lock
+        delay = min(self.base_delay * (2 ** self.trips), self.max_delay)
+        self.trips += 1
+        self.failures = 0
+        self.state = self.OPEN
+        self.next_probe = time.monotonic() + delay
+
+    def backoff(self):
+        with self.lock:
+            return max(0.0, self.next_probe - time.monotonic())
+
+
+class InstrumentLink:
+    """
+    Drop-in replacement for the pyvisa resource with bounded latency.
+
+    Every command runs with its own timeout budget, so a dead cable costs at most
+    one budget per command instead of the 10 s VISA default. After repeated failures
+    the circuit breaker opens and commands fail immediately, while a background
+    thread reopens the resource with exponential backoff.
+    """
+
+    DEFAULT_TIMEOUT_MS = 500
+    # Per-command timeout budgets in milliseconds, matched on the command header
+    COMMAND_TIMEOUTS_MS = {
+        "KRDG?": 300,
+        "HTR?": 300,
+        "RANGE?": 300,
+        "HTRST?": 300,
+        "SPOLL": 300,  # Serial poll (status byte read), used by ServiceRequestMonitor
+        "*IDN?": 1000,
+    }
+
+    def __init__(self, rm, address):
+        self.rm = rm
+        self.address = address
+        self.breaker = CircuitBreaker()
+        self.resource = None
+        self.io_lock = threading.RLock()
+        self.reconnect_thread = None
+        self.closed = False
+        self.state = "Disconnected"
+
+    @classmethod
+    def worst_case_latency(cls, *commands):
+        """Upper bound in seconds for running the given commands back to back."""
+        return sum(cls.timeout_for(cmd) for cmd in commands) / 1000.0
+
+    @classmethod
+    def timeout_for(cls, command):
+        header = command.split()[0] if command.strip() else command
+        return cls.COMMAND_TIMEOUTS_MS.get(header, cls.DEFAULT_TIMEOUT_MS)
+
+    def open(self):
+        self.closed = False
+        with self.io_lock:
+            self.resource = self.rm.open_resource(self.address)
+            self.resource.timeout = self.DEFAULT_TIMEOUT_MS
+        self.breaker.record_success()
+        self.set_state("Connected")
+
+    def query(self, command):
+        return self.run(command, lambda res: res.query(command))
+
+    def write(self, command):
+        return self.run(command, lambda res: res.write(command))
+
+    def run(self, command, action):
+        # While the breaker is open only the reconnect thread talks to the bus
+        if self.state == "Reconnecting" or not self.breaker.allow():
+            raise ConnectionError(f"Instrument offline, next probe in {self.breaker.backoff():.1f} s")
+        try:
+            with self.io_lock:
+                if self.resource is None:
+                    raise ConnectionError("Instrument resource is not open")
+                self.resource.timeout = self.timeout_for(command)
+                result = action(self.resource)
+        except (pyvisa.VisaIOError, ConnectionError, OSError) as e:
+            self.breaker.record_failure()
+            if self.breaker.state == CircuitBreaker.OPEN:
+                self.start_reconnect()
+            raise ConnectionError(f"{command.strip()} failed: {e}") from e
+        self.breaker.record_success()
+        return result
+
+    def start_reconnect(self):
+        if self.closed or (self.reconnect_thread and self.reconnect_thread.is_alive()):
+            return
+        self.set_state("Reconnecting")
+        self.reconnect_thread = threading.Thread(target=self.reconnect_loop, daemon=True)
+        self.reconnect_thread.start()
+
+    def reconnect_loop(self):
+        while not self.closed:
+            time.sleep(self.breaker.backoff())
+            if self.closed or not self.breaker.allow():
+                continue
+            try:
+                with self.io_lock:
+                    if self.closed:
+                        return  # close() ran while this thread was waiting for the lock
+                    if self.resource is not None:
+                        try:
+                            self.resource.close()
+                        except Exception:
+                            pass
+                        self.resource = None
+                    # Held before probing, so a failed probe is closed by the next attempt or close()
+                    self.resource = self.rm.open_resource(self.address)
+                    self.resource.timeout = self.timeout_for("*IDN?")
+                    self.resource.query("*IDN?")
+                self.breaker.record_success()
+                print("[Info] Reconnected to Lakeshore 335.")
+                self.set_state("Connected")
+                return
+            except Exception as e:
+                self.breaker.record_failure()
+                print(f"[Warning] Reconnect failed, retrying in {self.breaker.backoff():.1f} s: {e}")
+
+    def set_state(self, state):
+        # Read by the GUI thread on its next tick, never touches Tk from here
+        self.state = state
+
+    def close(self):
+        self.closed = True
+        with self.io_lock:
+            if self.resource is not None:
+                self.resource.close()
+                self.resource = None
+        self.state = "Disconnected"
@@ -0,0 +1,135 @@
+import math
+import time
+
+
+class PeriodicJob:
+    """
+    One periodic callback of a DeadlineScheduler. Deadlines are absolute, start + k * interval,
+    so the time the callback itself takes does not add up. Timing is recorded per job: the
+    error of each actual period against the nominal one (mean, standard deviation and worst
+    case, Welford updates) and the number of deadlines skipped because the job ran late.
+    """
+
+    def __init__(self, scheduler, name, callback, interval, deadline):
+        self.scheduler = scheduler
+        self.name = name
+        self.callback = callback
+        self.interval = interval  # [s]
+        self.deadline = deadline  # Next absolute deadline on the scheduler clock
+        self.active = True
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.fired = 0
+        self.missed = 0
+        self.last_fire = None
+        self.n = 0  # Periods measured
+        self.mean_error = 0.0
+        self.m2_error = 0.0
+        self.max_error = 0.0
+        self.max_late = 0.0
+
+    def set_interval(self, interval):
+        """Change the period; the next deadline is one new interval after the last run."""
+        if interval == self.interval:
+            return
+        self.interval = interval
+        base = self.last_fire if self.last_fire is not None else self.scheduler.clock()
+        self.deadline = base + interval
+        self.n = 0
+        self.mean_error = self.m2_error = self.max_error = 0.0
+        self.scheduler.rearm()
+
+    def cancel(self):
+        self.scheduler.remove(self)
+
+    def record(self, now):
+        """Account for a run at `now` and move the deadline past it on the original grid."""
+        late = now - self.deadline
+        # Run once for however many deadlines have passed instead of catching up on each
+        skipped = max(0, int(late // self.interval))
+        self.missed += skipped
+        self.deadline += (skipped + 1) * self.interval
+        self.fired += 1
+        self.max_late = max(self.max_late, late)
+        if self.last_fire is not None:
+            error = (now - self.last_fire) - self.interval * (1 + skipped)
+            self.n += 1
+            delta = error - self.mean_error
+            self.mean_error += delta / self.n
+            self.m2_error += delta * (error - self.mean_error)
+            self.max_error = max(self.max_error, abs(error))
+        self.last_fire = now
+
+    @property
+    def jitter(self):
+        return math.sqrt(self.m2_error / (self.n - 1)) if self.n > 1 else 0.0
+
+    def status_text(self):
+        if not self.n:
+            return f"{self.name}: {self.interval:g} s, waiting"
+        return (f"{self.name}: {self.interval:g} s, jitter {self.jitter * 1000:.1f} ms "
+                f"(max {self.max_error * 1000:.0f} ms), missed {self.missed}")
+
+
+class DeadlineScheduler:
+    """
+    Runs periodic jobs on one Tk timer. Instead of every job re-arming itself with
+    root.after(interval) after its own work (which stretches the period by the work time),
+    each job has an absolute deadline and the single timer is armed for the earliest one.
+    A job that overruns is run once and then skips the deadlines it missed, so a slow
+    period never causes a burst of catch-up calls.
+    """
+
+    TOLERANCE = 0.001  # Tk timers have millisecond resolution
+
+    def __init__(self, root, clock=time.monotonic):
+        self.root = root
+        self.clock = clock
+        self.jobs = []
+        self.after_id = None
+
+    def add(self, name, callback, interval, delay=0.0):
+        job = PeriodicJob(self, name, callback, interval, self.clock() + delay)
+        self.jobs.append(job)
+        self.rearm()
+        return job
+
+    def remove(self, job):
+        job.active = False
+        if job in self.jobs:
+            self.jobs.remove(job)
+            self.rearm()
+
+    def find(self, name):
+        return [job for job in self.jobs if job.name == name]
+
+    def rearm(self):
+        if self.after_id is not None:
+            self.root.after_cancel(self.after_id)
+            self.after_id = None
+        if self.jobs:
+            wait = min(job.deadline for job in self.jobs) - self.clock()
+            self.after_id = self.root.after(max(0, int(wait * 1000)), self.fire)
+
+    def fire(self):
+        self.after_id = None
+        for job in sorted(self.jobs, key=lambda j: j.deadline):
+            now = self.clock()
+            if not job.active or job.deadline > now + self.TOLERANCE:
+                continue
+            job.record(now)
+            try:
+                job.callback()
+            except Exception as e:
+                print(f"[Error] Periodic job '{job.name}' failed: {e}")
+        self.rearm()
+
+    def stop(self):
+        for job in list(self.jobs):
+            job.active = False
+        self.jobs.clear()
+        self.rearm()
+
+    def report(self):
+        return [job.status_text() for job in self.jobs]
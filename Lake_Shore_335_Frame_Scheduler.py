@@ -0,0 +1,105 @@
+import time
+
+
+class FrameScheduler:
+    """
+    Redraws the live plots on their own Tk timer, independent of the reading interval.
+
+    Samples only call `mark_dirty()`; every sample that arrived since the last frame is
+    drawn by the next one. The measured cost of a frame (exponential average) sets the
+    frame interval so that drawing uses at most `budget` of the wall time: when frames get
+    slower than the target rate allows, the rate drops towards `min_fps` instead of ticks
+    piling up, and recovers once frames are cheap again. No frame is drawn while the
+    window is minimized, withdrawn or fully obscured.
+    """
+
+    def __init__(self, root, draw, widget=None, target_fps=10.0, min_fps=0.5, budget=0.5):
+        self.root = root
+        self.draw = draw
+        self.widget = widget if widget is not None else root
+        self.target_fps = target_fps
+        self.min_fps = min_fps
+        self.budget = budget  # Fraction of the wall time the plots may take
+        self.dirty = False
+        self.obscured = False
+        self.frame_cost = 0.0  # Smoothed draw time [s]
+        self.interval = 1.0 / target_fps
+        self.frames = 0
+        self.skipped = 0  # Frames not drawn because the window was hidden
+        self.fps = 0.0  # Measured over the last second
+        self.window_start = time.perf_counter()
+        self.window_frames = 0
+        self.after_id = None
+        self.widget.bind("<Visibility>", self.on_visibility, add="+")
+
+    def set_widget(self, widget):
+        """Follow another plot widget, e.g. after swapping the live view backend."""
+        self.widget = widget
+        self.obscured = False
+        self.widget.bind("<Visibility>", self.on_visibility, add="+")
+        self.dirty = True
+
+    def on_visibility(self, event):
+        # Only reported by window managers that track occlusion; minimizing is checked directly
+        self.obscured = event.state == "VisibilityFullyObscured"
+
+    def set_target_fps(self, fps):
+        if fps <= 0:
+            raise ValueError("Frame rate must be positive.")
+        self.target_fps = fps
+        self.min_fps = min(self.min_fps, fps)
+        self.adapt()
+
+    def mark_dirty(self):
+        self.dirty = True
+
+    def is_visible(self):
+        try:
+            return (not self.obscured and self.root.state() not in ("iconic", "withdrawn")
+                    and bool(self.widget.winfo_viewable()))
+        except Exception:
+            return False
+
+    def adapt(self):
+        # Slowest of: the target rate, the rate the frame budget allows, the floor rate
+        wanted = max(1.0 / self.target_fps, self.frame_cost / self.budget)
+        self.interval = min(wanted, 1.0 / self.min_fps)
+
+    def start(self, delay=None):
+        if self.after_id is None:
+            delay = self.interval if delay is None else delay
+            self.after_id = self.root.after(max(int(delay * 1000), 1), self.frame)
+
+    def stop(self):
+        if self.after_id is not None:
+            self.root.after_cancel(self.after_id)
+            self.after_id = None
+
+    def frame(self):
+        self.after_id = None
+        frame_start = time.perf_counter()
+        if self.dirty:
+            if self.is_visible():
+                self.dirty = False
+                try:
+                    self.draw()
+                except Exception as e:
+                    print(f"[Error] Plot refresh failed: {e}")
+                cost = time.perf_counter() - frame_start
+                self.frame_cost = cost if self.frames == 0 else 0.8 * self.frame_cost + 0.2 * cost
+                self.frames += 1
+                self.window_frames += 1
+                self.adapt()
+            else:
+                # Stays dirty, so the first frame after restoring the window shows everything
+                self.skipped += 1
+
+        now = time.perf_counter()
+        if now - self.window_start >= 1.0:
+            self.fps = self.window_frames / (now - self.window_start)
+            self.window_start, self.window_frames = now, 0
+        # Frame-to-frame period is the interval, not interval plus draw time
+        self.start(self.interval - (now - frame_start))
+
+    def status_text(self):
+        return f"{self.fps:.1f} fps, {self.frame_cost * 1000:.0f} ms/frame, max {1.0 / self.interval:.1f} fps"
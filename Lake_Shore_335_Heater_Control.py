@@ -1,7 +1,17 @@
 import pyvisa
 import traceback
+import json
+import math
+import threading
+import time
 import tkinter as tk
-from tkinter import messagebox
+from tkinter import messagebox, filedialog
+
+from Lake_Shore_335_Simulation import (DEFAULT_ZONES, DEFAULT_STEPS, RANGE_CODES, HEATER_RANGE_WATTS, benchmark_zones,
+                                       format_benchmark)
+from Lake_Shore_335_Shared_Memory import SharedSeriesReader
+
+MAX_ZONES = 10  # The 335 stores up to 10 zones per output
 
 
 class LakeShoreController:
@@ -14,6 +24,10 @@ class LakeShoreController:
         self.heater_range = "Low"  # Default range
         self.selected_heater = 2  # Default to Heater 2
         self.pid_params = {"P": 50.0, "I": 10.0, "D": 0.0}  # Default PID values
+        self.zones = [dict(zone) for zone in DEFAULT_ZONES]  # Zone table, sorted by upper boundary
+        self.feed = None  # Live feed of the monitoring GUI, saves our own HTR? polling while it runs
+        self.feed_seq = None
+        self.feed_changed = 0.0
 
     def connect(self):
         try:
@@ -75,6 +89,43 @@ class LakeShoreController:
             traceback.print_exc()
             messagebox.showerror("Start Error", str(e))
 
+    def upload_zones(self, zones):
+        if self.inst is None:
+            self.connect()
+        if self.inst is None:
+            return False
+        try:
+            zones = sorted(zones, key=lambda z: z["upper"])[:MAX_ZONES]
+            for index in range(MAX_ZONES):
+                if index < len(zones):
+                    z = zones[index]
+                    # ZONE <output>,<zone>,<upper bound>,<P>,<I>,<D>,<mout>,<range>,<input>,<rate>
+                    self.inst.write(f"ZONE {self.selected_heater},{index + 1},{z['upper']},{z['P']},{z['I']},{z['D']},"
+                                    f"0,{RANGE_CODES[z['range']]},1,{z['ramp']}")
+                else:
+                    # Clear unused zones so stale entries from an older table cannot apply
+                    self.inst.write(f"ZONE {self.selected_heater},{index + 1},0,0,0,0,0,0,0,0")
+            self.zones = zones
+            print(f"[Info] Uploaded {len(zones)} zones to Heater {self.selected_heater}.")
+            return True
+        except Exception as e:
+            print(f"[Error] Zone upload failed: {e}")
+            traceback.print_exc()
+            messagebox.showerror("Zone Error", str(e))
+            return False
+
+    def start_zone_heating(self):
+        if not self.upload_zones(self.zones):
+            return
+        try:
+            self.inst.write(f"OUTMODE {self.selected_heater},2,A")  # Zone mode using sensor A
+            self.inst.write(f"SETP {self.selected_heater},{self.setpoint}")
+            print(f"[Info] Zone heating started for Heater {self.selected_heater}.")
+        except Exception as e:
+            print(f"[Error] Zone start failed: {e}")
+            traceback.print_exc()
+            messagebox.showerror("Start Error", str(e))
+
     def stop_heating(self):
         if self.inst is None:
             print("[Warning] Not connected.")
@@ -87,25 +138,45 @@ class LakeShoreController:
             traceback.print_exc()
             messagebox.showerror("Stop Error", str(e))
 
+    def read_heater_from_feed(self):
+        # Heater output [%] published by the monitoring GUI, None if it is not running or stale
+        try:
+            if self.feed is None:
+                self.feed = SharedSeriesReader()
+            columns, seq = self.feed.latest(1)
+        except (FileNotFoundError, ValueError):
+            self.feed = None
+            return None
+        now = time.monotonic()
+        if seq != self.feed_seq:
+            self.feed_seq, self.feed_changed = seq, now
+        elif now - self.feed_changed > 5.0:
+            # Publisher stopped or exited; attach again on a later call
+            del columns
+            self.feed.close()
+            self.feed = None
+            return None
+        if len(columns["heater"]) == 0:
+            return None
+        heater = float(columns["heater"][0])
+        if math.isnan(heater) or int(columns["output"][0]) != self.selected_heater:
+            return None
+        return heater
+
     def get_heater_power(self):
-        if self.inst is None:
+        raw_level = self.read_heater_from_feed()
+        if raw_level is None and self.inst is None:
             return "N/A"
         try:
-            # Query for the raw heater output level (0.0 to 1.0) for the selected heater
-            raw_level = float(self.inst.query(f"HTR? {self.selected_heater}").strip())
+            if raw_level is None:
+                # Query for the raw heater output level (0.0 to 1.0) for the selected heater
+                raw_level = float(self.inst.query(f"HTR? {self.selected_heater}").strip())
 
             # Convert the raw level from the range 0-100% to a fraction (0.0 to 1.0)
             fraction = raw_level / 100.0  # Convert to 0.0 - 1.0 range
 
-            # Set the maximum power based on the selected range
-            if self.heater_range == "Low":
-                max_power = 0.25  # Low range: 0.25 W
-            elif self.heater_range == "Med":
-                max_power = 2.5  # Medium range: 2.5 W
-            elif self.heater_range == "High":
-                max_power = 25  # High range: 25 W
-            else:
-                max_power = 0.25  # Default to Low if range is not recognized
+            # Maximum power of the selected output and range
+            max_power = HEATER_RANGE_WATTS[self.selected_heater][RANGE_CODES[self.heater_range]]
 
             # Calculate the actual power output in watts using the fraction (0.0 - 1.0)
             watts = fraction * max_power
@@ -143,6 +214,114 @@ class LakeShoreController:
             messagebox.showerror("PID Error", str(e))
 
 
+def open_zone_editor(root, controller):
+    editor = tk.Toplevel(root)
+    editor.title("Zone Table")
+
+    headers = ["Zone", "Upper [K]", "P", "I", "D", "Range", "Ramp [K/min]"]
+    for col, text in enumerate(headers):
+        tk.Label(editor, text=text, font=("Helvetica", 10, "bold")).grid(row=0, column=col, padx=3, pady=2)
+
+    rows = []
+    for index in range(MAX_ZONES):
+        tk.Label(editor, text=str(index + 1)).grid(row=index + 1, column=0, padx=3)
+        entries = {}
+        for col, key in enumerate(["upper", "P", "I", "D"], start=1):
+            entry = tk.Entry(editor, width=8, justify='center')
+            entry.grid(row=index + 1, column=col, padx=2, pady=1)
+            entries[key] = entry
+        range_var = tk.StringVar(value="Low")
+        tk.OptionMenu(editor, range_var, "Off", "Low", "Med", "High").grid(row=index + 1, column=5, padx=2)
+        entries["range"] = range_var
+        ramp_entry = tk.Entry(editor, width=8, justify='center')
+        ramp_entry.grid(row=index + 1, column=6, padx=2, pady=1)
+        entries["ramp"] = ramp_entry
+        rows.append(entries)
+
+    def fill(zones):
+        for index, entries in enumerate(rows):
+            zone = zones[index] if index < len(zones) else None
+            for key in ("upper", "P", "I", "D", "ramp"):
+                entries[key].delete(0, tk.END)
+                if zone:
+                    entries[key].insert(0, str(zone[key]))
+            entries["range"].set(zone["range"] if zone else "Low")
+
+    def read_table():
+        # Rows with an empty upper boundary are unused
+        zones = []
+        for index, entries in enumerate(rows):
+            if not entries["upper"].get().strip():
+                continue
+            try:
+                zones.append({
+                    "upper": float(entries["upper"].get()),
+                    "P": float(entries["P"].get()),
+                    "I": float(entries["I"].get()),
+                    "D": float(entries["D"].get() or 0.0),
+                    "range": entries["range"].get(),
+                    "ramp": float(entries["ramp"].get() or 0.0),
+                })
+            except ValueError:
+                messagebox.showerror("Input Error", f"Invalid value in zone {index + 1}.", parent=editor)
+                return None
+        return sorted(zones, key=lambda z: z["upper"])
+
+    def save():
+        zones = read_table()
+        if zones is None:
+            return
+        file_path = filedialog.asksaveasfilename(parent=editor, defaultextension=".json",
+                                                 filetypes=[("Zone Tables", "*.json")])
+        if file_path:
+            with open(file_path, "w") as f:
+                json.dump(zones, f, indent=2)
+            print(f"[Info] Zone table saved to {file_path}")
+
+    def load():
+        file_path = filedialog.askopenfilename(parent=editor, filetypes=[("Zone Tables", "*.json")])
+        if file_path:
+            try:
+                with open(file_path) as f:
+                    fill(json.load(f))
+            except (OSError, ValueError, KeyError) as e:
+                messagebox.showerror("Load Error", str(e), parent=editor)
+
+    def upload():
+        zones = read_table()
+        if zones is not None and controller.upload_zones(zones):
+            messagebox.showinfo("Zones", f"Uploaded {len(zones)} zones.", parent=editor)
+
+    def benchmark():
+        zones = read_table()
+        if not zones:
+            return
+        benchmark_button.config(state=tk.DISABLED, text="Running...")
+
+        def run():
+            # Simulation takes a few seconds, keep it off the Tk thread
+            # The current PID in every fixed range, so the table is compared with the best of them
+            rows_out = benchmark_zones(zones, controller.pid_params, controller.ramp_rate, DEFAULT_STEPS)
+            editor.after(0, lambda: show(format_benchmark(rows_out)))
+
+        def show(text):
+            benchmark_button.config(state=tk.NORMAL, text="Benchmark")
+            print(text)
+            messagebox.showinfo("Settling-Time Benchmark (simulated plant)", text, parent=editor)
+
+        threading.Thread(target=run, daemon=True).start()
+
+    buttons = tk.Frame(editor)
+    buttons.grid(row=MAX_ZONES + 1, column=0, columnspan=len(headers), pady=5)
+    tk.Button(buttons, text="Load", command=load).pack(side=tk.LEFT, padx=3)
+    tk.Button(buttons, text="Save", command=save).pack(side=tk.LEFT, padx=3)
+    tk.Button(buttons, text="Upload", command=upload, bg="blue", fg="white").pack(side=tk.LEFT, padx=3)
+    benchmark_button = tk.Button(buttons, text="Benchmark", command=benchmark)
+    benchmark_button.pack(side=tk.LEFT, padx=3)
+
+    fill(controller.zones)
+
+
 def main():
     controller = LakeShoreController()
     controller.connect()
@@ -234,6 +413,14 @@ def main():
     stop_button = tk.Button(root, text="Stop Heating", width=20, command=controller.stop_heating, bg="red", fg="white")
     stop_button.pack(pady=5)
 
+    # ---- Zone Heating ----
+    zone_frame = tk.Frame(root)
+    zone_frame.pack(pady=5)
+    tk.Button(zone_frame, text="Zone Table...", command=lambda: open_zone_editor(root, controller)).grid(row=0, column=0,
+                                                                                                       padx=5)
+    tk.Button(zone_frame, text="Start Zone Heating", command=controller.start_zone_heating, bg="green",
+              fg="white").grid(row=0, column=1, padx=5)
+
     def on_close():
         controller.close()
         root.destroy()
@@ -0,0 +1,330 @@
+import os
+import tempfile
+
+import numpy as np
+
+
+class SampleHistory:
+    """
+    Append-only sample store with a fixed RAM budget.
+
+    Rows (one float64 per field) are kept in a preallocated in-memory block. When the
+    block is full its older half is appended to a spill file, which is read back through
+    a read-only memory map, so nothing is ever dropped and the resident size stays bounded.
+    The first field must be the (monotonic) time, which allows O(log n) lookups by time.
+    """
+
+    def __init__(self, fields=("time", "A", "B", "diff"), ram_budget_mb=256.0, spill_dir=None):
+        self.fields = tuple(fields)
+        self.index = {name: i for i, name in enumerate(self.fields)}
+        self.row_bytes = 8 * len(self.fields)
+        self.ram_rows = max(1024, int(ram_budget_mb * 1024 * 1024 / self.row_bytes))
+        self.ram = np.empty((self.ram_rows, len(self.fields)))
+        self.spill_dir = spill_dir
+        self.spill_path = None
+        self.spill_file = None
+        self.disk_map = None
+        self.clear()
+
+    def clear(self):
+        self.ram_len = 0
+        self.spilled = 0
+        self.disk_map = None
+        if self.spill_file is not None:
+            self.spill_file.close()
+            os.remove(self.spill_path)
+            self.spill_file = None
+            self.spill_path = None
+
+    def close(self):
+        self.clear()
+
+    def __len__(self):
+        return self.spilled + self.ram_len
+
+    def append(self, row):
+        if self.ram_len == self.ram_rows:
+            self.spill(self.ram_rows // 2)
+        self.ram[self.ram_len] = row
+        self.ram_len += 1
+
+    def open_spill(self):
+        if self.spill_file is None:
+            handle, self.spill_path = tempfile.mkstemp(prefix="lakeshore335_history_", suffix=".bin",
+                                                       dir=self.spill_dir)
+            self.spill_file = os.fdopen(handle, "wb")
+
+    def load(self, rows, chunk_rows=1 << 18):
+        """
+        Replace the contents with `rows` (e.g. a memory-mapped snapshot). The newest half
+        of the RAM block is filled directly, older rows are streamed into the spill file.
+        """
+        self.clear()
+        n = len(rows)
+        keep = min(n, self.ram_rows // 2)
+        head = n - keep
+        if head:
+            self.open_spill()
+            for start in range(0, head, chunk_rows):
+                np.ascontiguousarray(rows[start:min(start + chunk_rows, head)], dtype=np.float64).tofile(self.spill_file)
+            self.spill_file.flush()
+            self.spilled = head
+        self.ram[:keep] = rows[head:]
+        self.ram_len = keep
+
+    def spill(self, n):
+        self.open_spill()
+        self.ram[:n].tofile(self.spill_file)
+        self.spill_file.flush()
+        # Shift the newer half down; happens once per ram_rows / 2 appends, so O(1) amortised
+        self.ram[:self.ram_len - n] = self.ram[n:self.ram_len]
+        self.ram_len -= n
+        self.spilled += n
+        self.disk_map = None
+
+    def disk(self):
+        if self.disk_map is None and self.spilled:
+            self.disk_map = np.memmap(self.spill_path, dtype=np.float64, mode="r",
+                                      shape=(self.spilled, len(self.fields)))
+        return self.disk_map
+
+    def time_at(self, i):
+        if i < self.spilled:
+            return self.disk()[i, 0]
+        return self.ram[i - self.spilled, 0]
+
+    def bisect(self, t):
+        """First index whose time is >= t (binary search over disk and RAM)."""
+        lo, hi = 0, len(self)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.time_at(mid) < t:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def rows(self, start=0, stop=None, step=1):
+        """
+        Rows start, start + step, ... below stop as one array; zero-copy when the range lies
+        entirely in RAM. With a step only the touched pages of the spill file are read.
+        """
+        n = len(self)
+        stop = n if stop is None else min(stop, n)
+        start = max(0, min(start, stop))
+        if start >= self.spilled:
+            return self.ram[start - self.spilled:stop - self.spilled:step]
+        disk_part = self.disk()[start:min(stop, self.spilled):step]
+        if stop <= self.spilled:
+            return np.asarray(disk_part)
+        # First index of the progression that lies in RAM
+        first_ram = start + -(-(self.spilled - start) // step) * step
+        return np.concatenate([disk_part, self.ram[first_ram - self.spilled:stop - self.spilled:step]])
+
+    def window(self, t0, t1, pad=0, max_points=None):
+        """
+        Rows with t0 <= time <= t1, plus `pad` rows before for derivative seeds. With
+        `max_points` a long interval is decimated to every k-th row, so the cost depends on
+        the number of points drawn, not on the length of the interval.
+        """
+        start = self.bisect(t0)
+        stop = self.bisect(np.nextafter(t1, np.inf))
+        step = 1
+        if max_points and stop - start > max_points:
+            step = -(-(stop - start) // max_points)
+        return self.rows(max(start - pad * step, 0), stop, step)
+
+    def column(self, name, start=0, stop=None):
+        return self.rows(start, stop)[:, self.index[name]]
+
+    def last(self):
+        return self.ram[self.ram_len - 1] if self.ram_len else None
+
+    def resident_bytes(self):
+        return self.ram.nbytes
+
+
+class HistoryView:
+    """Sliceable view of a history for `load`, so re-encoding never materialises all rows at once."""
+
+    def __init__(self, history):
+        self.history = history
+
+    def __len__(self):
+        return len(self.history)
+
+    def __getitem__(self, key):
+        start, stop, step = key.indices(len(self.history))
+        return self.history.rows(start, stop, step)
+
+
+class QuantizedChunk:
+    """
+    A full block of rows, stored column by column at a fixed resolution. Each column is kept
+    as integer offsets from the block minimum in units of its quantum, in the narrowest of
+    int16/int32 that holds the block's range; the minimum value of the type marks NaN.
+    Columns without a quantum are stored as float32.
+    """
+
+    def __init__(self, rows, quanta):
+        self.n = len(rows)
+        self.columns = []  # (base, quantum, array)
+        for i, quantum in enumerate(quanta):
+            values = rows[:, i]
+            if quantum is None:
+                self.columns.append((0.0, None, values.astype(np.float32)))
+                continue
+            finite = np.isfinite(values)
+            steps = np.round(values / quantum)
+            base = float(steps[finite].min()) if finite.any() else 0.0
+            offsets = steps - base
+            span = float(offsets[finite].max()) if finite.any() else 0.0
+            for dtype in (np.int16, np.int32):
+                if span < np.iinfo(dtype).max:
+                    data = np.where(finite, offsets, np.iinfo(dtype).min).astype(dtype)
+                    break
+            else:
+                data = values.copy()  # Range too wide for integers at this resolution
+            self.columns.append((base, quantum, data))
+        self.first_time = float(self.decode(0, 1)[0, 0])  # As stored, so it compares like the rows
+
+    def decode(self, start, stop, step=1):
+        out = np.empty((len(range(start, stop, step)), len(self.columns)))
+        for i, (base, quantum, data) in enumerate(self.columns):
+            part = data[start:stop:step]
+            if quantum is None or part.dtype == np.float64:
+                out[:, i] = part
+                continue
+            column = out[:, i]
+            np.add(part, base, out=column, dtype=np.float64)
+            column *= quantum
+            column[part == np.iinfo(part.dtype).min] = np.nan
+        return out
+
+    def column(self, i):
+        base, quantum, data = self.columns[i]
+        if quantum is None or data.dtype == np.float64:
+            return data.astype(np.float64)
+        return (data + base) * quantum
+
+    def search(self, t, side="left"):
+        """searchsorted of t in the time column, with t rounded to the column's resolution first."""
+        _, quantum, data = self.columns[0]
+        if quantum is not None and data.dtype != np.float64:
+            t = np.round(t / quantum) * quantum  # Bit-identical to a decoded time at the same step
+        return int(np.searchsorted(self.column(0), t, side=side))
+
+    @property
+    def nbytes(self):
+        return sum(data.nbytes for _, _, data in self.columns)
+
+
+class CompactHistory:
+    """
+    Drop-in alternative to SampleHistory that keeps everything in RAM at instrument
+    resolution instead of float64: rows are collected in a small float64 block and, once
+    `chunk_rows` are full, quantized into a QuantizedChunk (times as offsets, temperatures
+    as scaled integers). A calm chunk costs 2 bytes per temperature and 4 per time stamp.
+    Only the chunks overlapping a requested range are decoded, vectorized.
+    """
+
+    def __init__(self, fields=("time", "A", "B", "diff"), quanta=None, chunk_rows=16384):
+        self.fields = tuple(fields)
+        self.index = {name: i for i, name in enumerate(self.fields)}
+        quanta = quanta or {}
+        # Default resolution: 0.1 ms for time, 0.1 mK / 0.01 % for everything else
+        self.quanta = [quanta.get(name, 1e-4 if name != "heater" else 1e-2) for name in self.fields]
+        self.chunk_rows = chunk_rows
+        self.active = np.empty((chunk_rows, len(self.fields)))
+        self.clear()
+
+    def clear(self):
+        self.chunks = []
+        self.chunk_times = []  # First time of each chunk, for bisecting
+        self.active_len = 0
+        self.frozen = 0  # Rows held in chunks
+
+    def close(self):
+        self.clear()
+
+    def __len__(self):
+        return self.frozen + self.active_len
+
+    def append(self, row):
+        self.active[self.active_len] = row
+        self.active_len += 1
+        if self.active_len == self.chunk_rows:
+            self.freeze(self.active)
+            self.active_len = 0
+
+    def freeze(self, rows):
+        chunk = QuantizedChunk(rows, self.quanta)
+        self.chunks.append(chunk)
+        self.chunk_times.append(chunk.first_time)
+        self.frozen += chunk.n
+
+    def load(self, rows):
+        self.clear()
+        n = len(rows)
+        full = n - n % self.chunk_rows
+        for start in range(0, full, self.chunk_rows):
+            self.freeze(np.asarray(rows[start:start + self.chunk_rows], dtype=np.float64))
+        self.active[:n - full] = rows[full:]
+        self.active_len = n - full
+
+    def bisect(self, t, side="left"):
+        """
+        First index whose time is >= t (> t with side="right"): bisect the chunk start times,
+        then one chunk. Frozen times are compared at their 0.1 ms resolution, so a row logged
+        at exactly t is found although its stored time is rounded.
+        """
+        quantum = self.quanta[0]
+        t_stored = t if quantum is None else np.round(t / quantum) * quantum
+        k = int(np.searchsorted(self.chunk_times, t_stored, side=side)) - 1
+        if k < 0 and self.chunks:
+            return 0
+        if k >= 0:
+            i = self.chunks[k].search(t, side)
+            if i < self.chunks[k].n:
+                return k * self.chunk_rows + i
+            if k + 1 < len(self.chunks):
+                return (k + 1) * self.chunk_rows
+        return self.frozen + int(np.searchsorted(self.active[:self.active_len, 0], t, side=side))
+
+    def rows(self, start=0, stop=None, step=1):
+        """Rows start, start + step, ... below stop, decoding only the chunks they touch."""
+        n = len(self)
+        stop = n if stop is None else min(stop, n)
+        start = max(0, min(start, stop))
+        parts = []
+        i = start
+        while i < min(stop, self.frozen):
+            k = i // self.chunk_rows
+            chunk_start = k * self.chunk_rows
+            chunk_stop = min(stop, chunk_start + self.chunk_rows)
+            parts.append(self.chunks[k].decode(i - chunk_start, chunk_stop - chunk_start, step))
+            i += -(-(chunk_stop - i) // step) * step
+        if i < stop:
+            parts.append(self.active[i - self.frozen:stop - self.frozen:step])
+        if not parts:
+            return np.empty((0, len(self.fields)))
+        return parts[0] if len(parts) == 1 else np.concatenate(parts)
+
+    def window(self, t0, t1, pad=0, max_points=None):
+        start = self.bisect(t0)
+        stop = self.bisect(t1, side="right")
+        step = 1
+        if max_points and stop - start > max_points:
+            step = -(-(stop - start) // max_points)
+        return self.rows(max(start - pad * step, 0), stop, step)
+
+    def column(self, name, start=0, stop=None):
+        return self.rows(start, stop)[:, self.index[name]]
+
+    def last(self):
+        if self.active_len:
+            return self.active[self.active_len - 1]
+        return self.rows(len(self) - 1)[0] if len(self) else None
+
+    def resident_bytes(self):
+        return self.active.nbytes + sum(chunk.nbytes for chunk in self.chunks)
@@ -0,0 +1,317 @@
+import argparse
+import csv
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from Lake_Shore_335_Log_Compression import resample
+
+
+# Columns of the CSV written by toggle_csv_logging: Time (s), Channel A (K), Channel B (K), Abs Diff (K), ...
+USECOLS = (0, 1, 2, 3)
+SERIES = ("A", "B", "diff")
+
+
+class SegmentAccumulator:
+    """
+    Mergeable per-segment statistics.
+
+    Counts, sums and extrema combine directly. Spread is kept as sums of squared deviations
+    from the partial's own mean (M2, and the time/temperature co-moment for the slope) and
+    merged with the pairwise update of Chan et al., so partial results from different chunks
+    or worker processes combine without the cancellation of sum(x²) - n·mean² at 300 K.
+    Times are taken relative to the segment start.
+    """
+
+    def __init__(self):
+        self.n = 0
+        self.sum = np.zeros(3)
+        self.m2 = np.zeros(3)  # Sum of squared deviations from the mean
+        self.min = np.full(3, np.inf)
+        self.max = np.full(3, -np.inf)
+        self.sum_t = 0.0
+        self.m2_t = 0.0
+        self.c_tx = np.zeros(2)  # Co-moment of time with A, B
+        self.max_rate = np.zeros(2)  # max |dT/dt| [K/min] for A, B
+        self.max_accel = np.zeros(2)  # max |d²T/dt²| [K/s²] for A, B
+
+    def merge(self, other):
+        if other.n:
+            n = self.n + other.n
+            weight = self.n * other.n / n
+            delta = other.sum / other.n - (self.sum / self.n if self.n else 0.0)
+            delta_t = other.sum_t / other.n - (self.sum_t / self.n if self.n else 0.0)
+            self.m2 += other.m2 + delta ** 2 * weight
+            self.m2_t += other.m2_t + delta_t ** 2 * weight
+            self.c_tx += other.c_tx + delta_t * delta[:2] * weight
+            self.n = n
+        self.sum += other.sum
+        self.min = np.minimum(self.min, other.min)
+        self.max = np.maximum(self.max, other.max)
+        self.sum_t += other.sum_t
+        self.max_rate = np.maximum(self.max_rate, other.max_rate)
+        self.max_accel = np.maximum(self.max_accel, other.max_accel)
+        return self
+
+    def slope(self):
+        """Least-squares dT/dt over the segment [K/min] for A and B."""
+        if self.n < 2 or self.m2_t <= 0:
+            return np.zeros(2)
+        return self.c_tx / self.m2_t * 60.0
+
+    def row(self, segment_start):
+        mean = self.sum / self.n
+        std = np.sqrt(np.maximum(self.m2 / self.n, 0.0))
+        values = [segment_start, self.n]
+        for i in range(3):
+            values += [mean[i], std[i], self.min[i], self.max[i]]
+        values += list(self.slope()) + list(self.max_rate) + list(self.max_accel)
+        return values
+
+
+ROW_HEADER = (["Segment Start (s)", "Samples"]
+              + [f"{stat} {name}" for name in SERIES for stat in ("Mean", "Std", "Min", "Max")]
+              + ["Slope A (K/min)", "Slope B (K/min)", "Max |dT/dt| A (K/min)", "Max |dT/dt| B (K/min)",
+                 "Max |d2T/dt2| A (K/s2)", "Max |d2T/dt2| B (K/s2)"])
+
+
+def read_blocks(path, start, end, chunk_bytes):
+    """Yield text blocks of whole lines covering the byte range [start, end)."""
+    with open(path, "rb") as f:
+        f.seek(start)
+        position = start
+        tail = b""
+        while position < end:
+            block = f.read(min(chunk_bytes, end - position))
+            if not block:
+                break
+            position += len(block)
+            block = tail + block
+            cut = block.rfind(b"\n") + 1
+            tail = block[cut:]
+            if cut:
+                yield block[:cut].decode()
+        # Ranges end on line boundaries, so a leftover is only an unterminated last line at EOF
+        if tail.strip():
+            yield tail.decode()
+
+
+def parse_block(text):
+    lines = [line for line in text.splitlines() if line and not line.startswith("Time")]  # Skip the header row
+    if not lines:
+        return np.empty((0, 4))
+    return np.loadtxt(lines, delimiter=",", usecols=USECOLS, ndmin=2)
+
+
+def seed_rows(path, start):
+    """The two data rows before `start`, so derivatives continue across range boundaries."""
+    if start == 0:
+        return np.empty((0, 4))
+    with open(path, "rb") as f:
+        f.seek(max(0, start - 4096))
+        text = f.read(start - max(0, start - 4096)).decode(errors="ignore")
+    lines = text.splitlines()[1:]  # First line may be cut
+    rows = parse_block("\n".join(lines[-2:]))
+    return rows[-2:]
+
+
+def aligned_ranges(path, workers):
+    """Split the file into `workers` byte ranges that start at line boundaries."""
+    size = os.path.getsize(path)
+    offsets = [0]
+    with open(path, "rb") as f:
+        for k in range(1, workers):
+            f.seek(size * k // workers)
+            f.readline()
+            offsets.append(min(f.tell(), size))
+    offsets.append(size)
+    return [(a, b) for a, b in zip(offsets, offsets[1:]) if b > a]
+
+
+def accumulate_chunk(rows, carry, segment, segments, on_closed=None):
+    """
+    Fold one parsed chunk into `segments` (dict of segment index -> SegmentAccumulator).
+
+    `carry` holds the last two rows of the previous chunk. Returns the new carry.
+    When `on_closed` is given, segments older than the current one are handed over and dropped.
+    """
+    if len(rows) == 0:
+        return carry
+    full = np.vstack([carry, rows])
+    offset = len(carry)
+    t = full[:, 0]
+    temps = full[:, 1:3]
+    dt = np.diff(t)
+    dt[dt == 0] = np.nan
+    rate = np.full((len(full), 2), np.nan)
+    accel = np.full((len(full), 2), np.nan)
+    rate[1:] = np.diff(temps, axis=0) / dt[:, None] * 60.0
+    accel[2:] = (temps[2:] - 2 * temps[1:-1] + temps[:-2]) / dt[1:, None] ** 2
+    rate, accel = np.abs(rate[offset:]), np.abs(accel[offset:])
+
+    t = rows[:, 0]
+    values = rows[:, 1:4]
+    seg = np.floor(t / segment).astype(np.int64)
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(seg)) + 1))
+    rel_t = t - seg * segment
+    sums = np.add.reduceat(values, starts)
+    mins = np.minimum.reduceat(values, starts)
+    maxs = np.maximum.reduceat(values, starts)
+    counts = np.diff(np.append(starts, len(rows)))
+    sum_t = np.add.reduceat(rel_t, starts)
+    # Deviations from each segment's own mean, so M2 never subtracts two large sums
+    dev = values - np.repeat(sums / counts[:, None], counts, axis=0)
+    dev_t = rel_t - np.repeat(sum_t / counts, counts)
+    m2 = np.add.reduceat(dev ** 2, starts)
+    m2_t = np.add.reduceat(dev_t ** 2, starts)
+    c_tx = np.add.reduceat(dev_t[:, None] * dev[:, :2], starts)
+    max_rate = np.fmax.reduceat(np.nan_to_num(rate, nan=0.0), starts)
+    max_accel = np.fmax.reduceat(np.nan_to_num(accel, nan=0.0), starts)
+
+    for k, index in enumerate(seg[starts]):
+        part = SegmentAccumulator()
+        part.n = int(counts[k])
+        part.sum, part.m2, part.min, part.max = sums[k], m2[k], mins[k], maxs[k]
+        part.sum_t, part.m2_t, part.c_tx = float(sum_t[k]), float(m2_t[k]), c_tx[k]
+        part.max_rate, part.max_accel = max_rate[k], max_accel[k]
+        if index in segments:
+            segments[index].merge(part)
+        else:
+            segments[index] = part
+
+    if on_closed is not None:
+        current = seg[-1]
+        for index in sorted(k for k in segments if k < current):
+            on_closed(index, segments.pop(index))
+    return full[-2:]
+
+
+def analyze_range(path, start, end, segment, chunk_bytes, step=None):
+    """Worker entry point: statistics for one byte range, returned as (segments, rows)."""
+    segments = {}
+    carry = seed_rows(path, start)
+    previous = carry[-1] if len(carry) else None
+    if step and len(carry):
+        carry = resample(carry, step)[-2:]
+    rows_total = 0
+    for text in read_blocks(path, start, end, chunk_bytes):
+        rows = parse_block(text)
+        rows_total += len(rows)
+        if step:
+            rows, previous = resample(rows, step, previous), rows[-1] if len(rows) else previous
+        carry = accumulate_chunk(rows, carry, segment, segments)
+    return segments, rows_total
+
+
+class RampHoldDetector:
+    """Run-length classification of consecutive segments into holds and ramps by their slope."""
+
+    def __init__(self, hold_rate, segment):
+        self.hold_rate = hold_rate
+        self.segment = segment
+        self.current = None
+        self.runs = []
+
+    def add(self, index, acc):
+        slope = acc.slope()[0]  # Channel A, the control sensor
+        kind = "hold" if abs(slope) < self.hold_rate else ("ramp up" if slope > 0 else "ramp down")
+        start = index * self.segment
+        mean = acc.sum[0] / acc.n
+        if self.current and self.current["kind"] == kind and self.current["end"] == start:
+            self.current["end"] = start + self.segment
+            self.current["t_end"] = mean
+            self.current["slopes"] += slope
+            self.current["count"] += 1
+        else:
+            self.flush()
+            self.current = {"kind": kind, "start": start, "end": start + self.segment, "t_start": mean,
+                            "t_end": mean, "slopes": slope, "count": 1}
+
+    def flush(self):
+        if self.current:
+            self.runs.append(self.current)
+            self.current = None
+
+
+def format_runs(runs):
+    lines = [f"{'Kind':>9} {'Start (s)':>12} {'End (s)':>12} {'Dur (s)':>9} {'T start':>9} {'T end':>9} {'K/min':>8}"]
+    for run in runs:
+        lines.append(f"{run['kind']:>9} {run['start']:12.0f} {run['end']:12.0f} {run['end'] - run['start']:9.0f} "
+                     f"{run['t_start']:9.3f} {run['t_end']:9.3f} {run['slopes'] / run['count']:8.3f}")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream a Lakeshore 335 CSV log in fixed-size chunks: per-segment "
+                                                 "statistics, dT/dt and d²T/dt², ramps and holds.")
+    parser.add_argument("log", help="CSV written by the monitoring GUI")
+    parser.add_argument("--segment", type=float, default=60.0, help="Segment length [s] (default 60)")
+    parser.add_argument("--chunk-mb", type=float, default=16.0, help="Read chunk size [MB] (default 16)")
+    parser.add_argument("--hold-rate", type=float, default=0.01,
+                        help="|dT/dt| of channel A below which a segment counts as a hold [K/min]")
+    parser.add_argument("--workers", type=int, default=1, help="Split the file into ranges over a process pool")
+    parser.add_argument("--out", help="Write the per-segment statistics to this CSV")
+    parser.add_argument("--resample", type=float, metavar="STEP",
+                        help="Reconstruct a compressed log on a STEP-second grid (linear interpolation) before "
+                             "the statistics, which otherwise weight sparse rows like dense ones")
+    args = parser.parse_args()
+
+    chunk_bytes = int(args.chunk_mb * 1024 * 1024)
+    started = time.perf_counter()
+    out_file = open(args.out, "w", newline="") if args.out else None
+    writer = csv.writer(out_file) if out_file else None
+    if writer:
+        writer.writerow(ROW_HEADER)
+    detector = RampHoldDetector(args.hold_rate, args.segment)
+
+    def emit(index, acc):
+        if writer:
+            writer.writerow([f"{v:.6g}" for v in acc.row(index * args.segment)])
+        detector.add(index, acc)
+
+    rows_total = 0
+    if args.workers > 1:
+        # Ranges finish out of order, so every segment is held here until the merge: memory grows
+        # with the number of segments rather than staying constant as in the single pass
+        segments = {}
+        ranges = aligned_ranges(args.log, args.workers)
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            futures = [pool.submit(analyze_range, args.log, a, b, args.segment, chunk_bytes, args.resample)
+                       for a, b in ranges]
+            for future in futures:
+                part, rows = future.result()
+                rows_total += rows
+                for index, acc in part.items():
+                    if index in segments:
+                        segments[index].merge(acc)
+                    else:
+                        segments[index] = acc
+        for index in sorted(segments):
+            emit(index, segments[index])
+    else:
+        # Single pass: finished segments are written out and dropped, memory stays constant
+        segments = {}
+        carry = np.empty((0, 4))
+        previous = None
+        for text in read_blocks(args.log, 0, os.path.getsize(args.log), chunk_bytes):
+            rows = parse_block(text)
+            rows_total += len(rows)
+            if args.resample:
+                rows, previous = resample(rows, args.resample, previous), rows[-1] if len(rows) else previous
+            carry = accumulate_chunk(rows, carry, args.segment, segments, on_closed=emit)
+        for index in sorted(segments):
+            emit(index, segments.pop(index))
+    detector.flush()
+    if out_file:
+        out_file.close()
+
+    elapsed = time.perf_counter() - started
+    print(format_runs(detector.runs))
+    print(f"\n{rows_total} rows in {elapsed:.2f} s ({rows_total / max(elapsed, 1e-9):,.0f} rows/s)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
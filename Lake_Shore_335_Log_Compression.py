@@ -0,0 +1,115 @@
+import numpy as np
+
+
+class SwingingDoorCompressor:
+    """
+    Swinging-door style compression of multi-channel rows in front of the CSV writer.
+
+    A row is dropped when the straight line between the two kept rows around it passes
+    within the channel's deviation of it, for every channel. For each channel the slopes
+    from the last kept row that stay within the deviation of every dropped row form a
+    corridor (the "doors"). It narrows with each new row, so the check is O(1) per row.
+    When a row does not fit the corridor, the previous row is kept and becomes the new
+    pivot. Linear interpolation between kept rows therefore reconstructs every dropped
+    value to within its deviation: that is the error bound.
+
+    A row is always kept when `force` is set (e.g. it carries an event), when a channel
+    changes between a number and NaN, or when `max_interval` seconds passed since the
+    last kept row.
+    """
+
+    def __init__(self, deviations, max_interval=600.0):
+        self.deviations = np.asarray(deviations, dtype=float)
+        self.max_interval = max_interval
+        self.reset()
+
+    def reset(self):
+        self.anchor = None  # (t, values) of the last kept row
+        self.candidate = None  # (t, values, row) of the newest row, not yet decided
+        self.low = np.full(len(self.deviations), -np.inf)  # Slope corridor over the dropped rows
+        self.high = np.full(len(self.deviations), np.inf)
+        self.pushed = 0
+        self.kept = 0
+
+    def keep(self, t, values, row):
+        self.anchor = (t, values)
+        self.low[:] = -np.inf
+        self.high[:] = np.inf
+        self.kept += 1
+        return row
+
+    def push(self, t, values, row, force=False):
+        """Offer one row; returns the rows to write now (zero, one or two, in time order)."""
+        values = np.asarray(values, dtype=float)
+        self.pushed += 1
+        if self.anchor is None:
+            return [self.keep(t, values, row)]
+        out = []
+        if self.candidate is not None:
+            if self.fits(t, values):
+                self.candidate = (t, values, row)
+                if not force:
+                    return out
+                self.candidate = None
+                return [self.keep(t, values, row)]
+            t_kept, values_kept, row_kept = self.candidate
+            out.append(self.keep(t_kept, values_kept, row_kept))
+        t0, values0 = self.anchor
+        if force or t - t0 > self.max_interval or np.any(np.isnan(values) != np.isnan(values0)):
+            self.candidate = None
+            out.append(self.keep(t, values, row))
+        else:
+            self.candidate = (t, values, row)
+        return out
+
+    def fits(self, t, values):
+        """Whether the line from the anchor to (t, values) passes within the deviations of all dropped rows."""
+        t0, values0 = self.anchor
+        tc, values_c, _ = self.candidate
+        if t - t0 > self.max_interval or tc <= t0 or t <= tc:
+            return False
+        if np.any(np.isnan(values) != np.isnan(values0)):
+            return False
+        # The current candidate would become a dropped row: narrow the corridor by it
+        with np.errstate(invalid="ignore"):
+            low = np.fmax(self.low, (values_c - self.deviations - values0) / (tc - t0))
+            high = np.fmin(self.high, (values_c + self.deviations - values0) / (tc - t0))
+            slope = (values - values0) / (t - t0)
+            inside = (slope >= low) & (slope <= high)
+        if not np.all(inside | np.isnan(slope)):
+            return False
+        self.low, self.high = low, high
+        return True
+
+    def flush(self):
+        """Rows still pending, e.g. when logging stops."""
+        if self.candidate is None:
+            return []
+        t, values, row = self.candidate
+        self.candidate = None
+        return [self.keep(t, values, row)]
+
+    def ratio(self):
+        return self.pushed / self.kept if self.kept else 1.0
+
+
+def resample(rows, step, previous=None):
+    """
+    Reconstruct compressed (time, A, B, |A-B|) rows on a uniform grid of `step` seconds by
+    linear interpolation, the inverse of SwingingDoorCompressor. `previous` is the last row
+    before `rows` (None at the start of a log); grid points in (previous time, last time] are
+    returned, so consecutive chunks join seamlessly. |A-B| is recomputed from A and B.
+    """
+    if previous is not None:
+        rows = np.vstack([previous[None, :], rows])
+    if len(rows) == 0:
+        return rows
+    t = rows[:, 0]
+    first = np.floor(t[0] / step) + 1 if previous is not None else np.ceil(t[0] / step)
+    grid = np.arange(first, np.floor(t[-1] / step) + 1) * step
+    out = np.empty((len(grid), 4))
+    out[:, 0] = grid
+    for i in (1, 2):
+        out[:, i] = np.interp(grid, t, rows[:, i])
+    out[:, 3] = np.abs(out[:, 1] - out[:, 2])
+    return out
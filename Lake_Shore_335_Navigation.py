@@ -0,0 +1,113 @@
+class TimeNavigator:
+    """
+    Shared time view of the live plots: either following the newest samples or parked on a
+    fixed interval chosen by panning and zooming. Acquisition is unaffected either way;
+    only the interval that is read from the history changes.
+    """
+
+    def __init__(self, min_span=1.0, lead=0.0):
+        self.follow_live = True
+        self.view = None  # (t0, t1) while browsing
+        self.min_span = min_span  # Narrowest zoom [s]
+        self.lead = lead  # Share of the live view kept free right of the newest sample (forecast band)
+        self.listeners = []
+
+    def add_listener(self, listener):
+        # listener(follow_live), e.g. to keep a "Follow Live" checkbox in sync
+        self.listeners.append(listener)
+
+    def notify(self):
+        for listener in self.listeners:
+            listener(self.follow_live)
+
+    def current(self, now, time_range):
+        """
+        The (t0, t1) to display at run time `now`. The live view starts at 0 s and, once the
+        samples reach the last `lead` of the span, moves so that share stays free on the right.
+        Panning and zooming start from this same interval, so leaving live view never jumps.
+        """
+        if not self.follow_live and self.view is not None:
+            return self.view
+        t1 = max(float(time_range), now + self.lead * time_range)
+        return t1 - time_range, t1
+
+    def follow(self):
+        self.follow_live = True
+        self.view = None
+        self.notify()
+
+    def browse(self, t0, t1):
+        span = max(t1 - t0, self.min_span)
+        center = (t0 + t1) / 2
+        self.view = (center - span / 2, center + span / 2)
+        if self.follow_live:
+            self.follow_live = False
+            self.notify()
+
+    def zoom(self, center, factor, now, time_range):
+        """Scale the visible span by `factor` (< 1 zooms in) keeping `center` fixed on screen."""
+        t0, t1 = self.current(now, time_range)
+        if center is None:
+            center = (t0 + t1) / 2
+        factor = max(factor, self.min_span / (t1 - t0))
+        self.browse(center - (center - t0) * factor, center + (t1 - center) * factor)
+
+    def pan(self, start_view, shift):
+        t0, t1 = start_view
+        self.browse(t0 + shift, t1 + shift)
+
+
+class PlotNavigation:
+    """
+    Mouse bindings of one matplotlib canvas onto a TimeNavigator: the wheel zooms around the
+    cursor, dragging pans. A press and release without movement is passed to `on_click`.
+    Matplotlib only keeps weak references to the bound handlers, so keep the instance alive.
+    """
+
+    DRAG_THRESHOLD = 5  # Pixels before a press counts as a drag
+
+    def __init__(self, canvas, navigator, get_time, on_change, on_click=None):
+        self.navigator = navigator
+        self.get_time = get_time  # () -> (now, time_range)
+        self.on_change = on_change
+        self.on_click = on_click
+        self.press = None  # (x pixel, axes, view at press, press event)
+        self.dragging = False
+        canvas.mpl_connect("scroll_event", self.scrolled)
+        canvas.mpl_connect("button_press_event", self.pressed)
+        canvas.mpl_connect("motion_notify_event", self.moved)
+        canvas.mpl_connect("button_release_event", self.released)
+
+    def scrolled(self, event):
+        if event.inaxes is None:
+            return
+        now, time_range = self.get_time()
+        self.navigator.zoom(event.xdata, 0.8 if event.button == "up" else 1.25, now, time_range)
+        self.on_change()
+
+    def pressed(self, event):
+        if event.inaxes is None or event.button != 1:
+            return
+        now, time_range = self.get_time()
+        self.press = (event.x, event.inaxes, self.navigator.current(now, time_range), event)
+        self.dragging = False
+
+    def moved(self, event):
+        if self.press is None or event.x is None:
+            return
+        x0, axes, view, _ = self.press
+        if not self.dragging and abs(event.x - x0) < self.DRAG_THRESHOLD:
+            return
+        self.dragging = True
+        seconds_per_pixel = (view[1] - view[0]) / axes.bbox.width
+        self.navigator.pan(view, -(event.x - x0) * seconds_per_pixel)
+        self.on_change()
+
+    def released(self, event):
+        if self.press is None:
+            return
+        press_event = self.press[3]
+        self.press = None
+        if not self.dragging and self.on_click is not None:
+            self.on_click(press_event)
+        self.dragging = False
@@ -0,0 +1,178 @@
+import collections
+import math
+
+import numpy as np
+
+
+class ApproachPredictor:
+    """
+    Predicts when the temperature reaches the setpoint band and settles.
+
+    The approach is modelled as first order, T(t) = T_inf + (T0 - T_inf) * exp(-t / tau).
+    For samples `lag` seconds apart this is the linear relation T(t + lag) = c + phi * T(t)
+    with phi = exp(-lag / tau) and T_inf = c / (1 - phi), so the model is an ordinary least
+    squares fit of sample pairs. The lag (a tenth of the window) keeps sensor noise small
+    against the change between the two samples of a pair. The fit is kept over a sliding
+    time window with Welford-style add/remove updates of the means and co-moments, which
+    makes each sample O(1). A time constant much longer than the window (a linear ramp or
+    drift) falls back to extrapolating the slope, assuming the controller then holds.
+
+    The confidence band comes from the standard error of phi: the model is re-evaluated
+    with phi +/- `sigmas` standard errors, pivoting around the mean of the fitted pairs.
+    """
+
+    def __init__(self, window=600.0, min_points=10, sigmas=2.0):
+        self.window = window  # [s]
+        self.lag = window / 10.0
+        self.min_points = min_points
+        self.sigmas = sigmas
+        self.reset()
+
+    def reset(self):
+        self.pairs = collections.deque()  # (t, x, y, dt): T(t - dt), T(t) and their spacing
+        self.recent = collections.deque()  # Samples of the last lag seconds, (t, T)
+        self.last = None  # (t, T) of the newest sample
+        self.n = 0
+        self.mean_x = self.mean_y = self.mean_dt = 0.0
+        self.sxx = self.syy = self.sxy = 0.0
+
+    def update(self, t, temp):
+        if self.last is not None and t <= self.last[0]:
+            return
+        # Pair with the newest sample that is at least `lag` older
+        while len(self.recent) > 1 and t - self.recent[1][0] >= self.lag:
+            self.recent.popleft()
+        if self.recent and t - self.recent[0][0] >= self.lag:
+            t_old, temp_old = self.recent[0]
+            self.add_pair(t, temp_old, temp, t - t_old)
+        self.recent.append((t, temp))
+        self.last = (t, temp)
+        while self.pairs and t - self.pairs[0][0] > self.window:
+            self.remove_pair(*self.pairs.popleft())
+
+    def add_pair(self, t, x, y, dt):
+        self.pairs.append((t, x, y, dt))
+        self.n += 1
+        dx = x - self.mean_x
+        dy = y - self.mean_y
+        self.mean_x += dx / self.n
+        self.mean_y += dy / self.n
+        self.mean_dt += (dt - self.mean_dt) / self.n
+        self.sxx += dx * (x - self.mean_x)
+        self.syy += dy * (y - self.mean_y)
+        self.sxy += dx * (y - self.mean_y)
+
+    def remove_pair(self, t, x, y, dt):
+        self.n -= 1
+        if self.n == 0:
+            self.mean_x = self.mean_y = self.mean_dt = self.sxx = self.syy = self.sxy = 0.0
+            return
+        old_x, old_y = self.mean_x, self.mean_y
+        self.mean_x -= (x - self.mean_x) / self.n
+        self.mean_y -= (y - self.mean_y) / self.n
+        self.mean_dt -= (dt - self.mean_dt) / self.n
+        self.sxx -= (x - self.mean_x) * (x - old_x)
+        self.syy -= (y - self.mean_y) * (y - old_y)
+        self.sxy -= (x - self.mean_x) * (y - old_y)
+
+    def fit(self):
+        """(phi, sigma_phi), or None while the window holds too little or flat data."""
+        if self.n < self.min_points or self.sxx <= 1e-12:
+            return None
+        phi = self.sxy / self.sxx
+        residual = max(self.syy - phi * self.sxy, 0.0) / max(self.n - 2, 1)
+        return phi, math.sqrt(residual / self.sxx)
+
+    def model(self, phi):
+        """(T_inf, tau) for a given phi, or (None, slope per second) when not converging."""
+        c = self.mean_y - phi * self.mean_x
+        if 0.0 < phi < 1.0 - 1e-9:
+            tau = -self.mean_dt / math.log(phi)
+            if tau <= 10.0 * self.window:
+                return c / (1.0 - phi), tau
+        return None, (c + (phi - 1.0) * self.last[1]) / self.mean_dt
+
+    def time_to(self, phi, target):
+        """Seconds from the newest sample until the model crosses `target` (None if never)."""
+        temp = self.last[1]
+        if temp == target:
+            return 0.0
+        t_inf, tau = self.model(phi)
+        if t_inf is None:
+            slope = tau
+            if slope == 0 or (target - temp) / slope < 0:
+                return None
+            return (target - temp) / slope
+        ratio = (temp - t_inf) / (target - t_inf) if target != t_inf else math.inf
+        if ratio <= 1.0:
+            return None  # Target lies at or beyond the asymptote
+        return tau * math.log(ratio)
+
+    def predict(self, setpoint, tolerance, rate_threshold, dwell):
+        """
+        ETAs [s] from the newest sample as a dict: band and settled, each (estimate, low, high),
+        plus the fitted asymptote and time constant. None while there is no usable fit.
+        """
+        fitted = self.fit()
+        if fitted is None:
+            return None
+        phi, sigma = fitted
+        temp = self.last[1]
+        if abs(temp - setpoint) <= tolerance:
+            target = temp
+        else:
+            target = setpoint - tolerance if temp < setpoint else setpoint + tolerance
+        phis = (phi, phi - self.sigmas * sigma, phi + self.sigmas * sigma)
+
+        band, settled = [], []
+        for candidate in phis:
+            eta = self.time_to(candidate, target)
+            band.append(eta)
+            t_inf, tau = self.model(candidate)
+            if eta is None:
+                settled.append(None)
+                continue
+            if t_inf is None:
+                settled.append(eta + dwell)
+                continue
+            # |dT/dt| = |T - T_inf| / tau drops below the rate threshold [K/min] at this distance
+            distance = tau * rate_threshold / 60.0
+            gap = abs(temp - t_inf)
+            slow = tau * math.log(gap / distance) if gap > distance else 0.0
+            settled.append(max(eta, slow) + dwell)
+
+        t_inf, tau = self.model(phi)
+        return {
+            "band": self.spread(band),
+            "settled": self.spread(settled),
+            "t_inf": t_inf,
+            "tau": tau if t_inf is not None else None,
+        }
+
+    @staticmethod
+    def spread(values):
+        estimate = values[0]
+        known = [v for v in values if v is not None]
+        if estimate is None:
+            return None
+        # Unknown bound means the slower edge never converges
+        high = max(known) if len(known) == len(values) else None
+        return estimate, min(known), high
+
+    def curve(self, horizon, points=50):
+        """Forecast (times, estimate, low, high) for `horizon` seconds after the newest sample."""
+        fitted = self.fit()
+        if fitted is None or horizon <= 0:
+            return None
+        phi, sigma = fitted
+        t_last, temp = self.last
+        steps = np.linspace(0.0, horizon, points)
+        curves = []
+        for candidate in (phi, phi - self.sigmas * sigma, phi + self.sigmas * sigma):
+            t_inf, tau = self.model(candidate)
+            if t_inf is None:
+                curves.append(temp + tau * steps)
+            else:
+                curves.append(t_inf + (temp - t_inf) * np.exp(-steps / tau))
+        curves = np.array(curves)
+        return t_last + steps, curves[0], curves.min(axis=0), curves.max(axis=0)
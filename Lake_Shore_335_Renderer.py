@@ -0,0 +1,128 @@
+import multiprocessing
+
+import numpy as np
+
+from Lake_Shore_335_Shared_Memory import SharedSeriesReader
+
+
+# Layout of the settings block the GUI writes into the shared-memory header
+S_TIME_RANGE = 0
+S_Y_A = 1  # lower, upper
+S_Y_DIFF = 3
+S_Y_1ST = 5
+S_Y_2ND = 7
+S_CHANNELS = 9
+S_DERIV_CHANNELS = 10
+S_2ND_DERIV_CHANNELS = 11
+S_INTERVAL = 12
+S_CLOSE = 15
+
+CHANNEL_CODES = {"Both": 0.0, "Channel A": 1.0, "Channel B": 2.0}
+
+
+def split_sign(values):
+    return np.where(values >= 0, values, np.nan), np.where(values < 0, values, np.nan)
+
+
+def run_renderer(shm_name):
+    """Entry point of the renderer process: draws the 2x2 live figure in its own window."""
+    import matplotlib.pyplot as plt
+    import matplotlib.colors as mcolors
+    from matplotlib.ticker import MaxNLocator, FuncFormatter
+
+    reader = SharedSeriesReader(shm_name)
+    fig, axes = plt.subplots(2, 2, figsize=(8, 6), dpi=100)
+    fig.canvas.manager.set_window_title("Lakeshore 335 Live Plots")
+    (ax1, ax2), (ax3, ax4) = axes
+    titles = [(ax1, "A and B Temperature", "Temperature [K]"), (ax2, "|A - B|", "|A - B| [K]"),
+              (ax3, "A and B Rate", "dT/dt [K/s]"), (ax4, "A and B d²T/dt² ", "d²T/dt² [K/s]")]
+    for ax, title, ylabel in titles:
+        ax.set_title(title)
+        ax.set_ylabel(ylabel)
+        ax.set_xlabel("Time [s]")
+        ax.yaxis.set_major_locator(MaxNLocator(nbins=3))
+        ax.xaxis.set_major_locator(MaxNLocator(nbins=5))
+        ax.yaxis.set_major_formatter(FuncFormatter(lambda x, _: f"{x:.1f}"))
+        ax.grid(color='white', linestyle='--', linewidth=0.7)
+        ax.set_facecolor(mcolors.to_rgba('black', alpha=0.3))
+
+    line_a, = ax1.plot([], [], color='tab:red', linestyle="-", alpha=0.9, label="Channel A")
+    line_b, = ax1.plot([], [], color='tab:blue', linestyle='--', alpha=0.9, label="Channel B")
+    line_diff, = ax2.plot([], [], color='black', label="|A - B|")
+    colors = [('purple', "A", "+"), ('magenta', "A", "-"), ('orange', "B", "+"), ('yellow', "B", "-")]
+    deriv_lines = [ax3.plot([], [], color=c, label=f"dT$_{{{ch}}}$/dt ({sign})")[0] for c, ch, sign in colors]
+    deriv2_lines = [ax4.plot([], [], color=c, label=f"d²T$_{{{ch}}}$/dt² ({sign})")[0] for c, ch, sign in colors]
+    for ax in (ax1, ax2, ax3, ax4):
+        ax.legend(loc="upper right", fontsize=9)
+    fig.subplots_adjust(left=0.1, right=0.95, top=0.95, bottom=0.08, hspace=0.3, wspace=0.25)
+    plt.show(block=False)
+
+    def visible(code, channel):
+        return code == 0.0 or (code == 1.0 and channel == "A") or (code == 2.0 and channel == "B")
+
+    while plt.fignum_exists(fig.number) and reader.settings[S_CLOSE] == 0.0:
+        settings = reader.settings.copy()
+        columns, _ = reader.latest()
+        t_all = columns["time"]
+        if len(t_all) >= 3:
+            time_range = settings[S_TIME_RANGE]
+            start = max(int(np.searchsorted(t_all, t_all[-1] - time_range)) - 2, 0)
+            # Copy only the visible window, matplotlib keeps references to the arrays it is given
+            t = np.array(t_all[start:])
+            a = np.array(columns["A"][start:])
+            b = np.array(columns["B"][start:])
+            line_a.set_data(t, a)
+            line_b.set_data(t, b)
+            line_diff.set_data(t, np.array(columns["diff"][start:]))
+
+            dt = np.diff(t)
+            dt[dt == 0] = np.nan
+            for lines, order in ((deriv_lines, 1), (deriv2_lines, 2)):
+                values = []
+                for series in (a, b):
+                    if order == 1:
+                        d = np.concatenate(([0.0], np.diff(series) / dt))
+                    else:
+                        d = np.concatenate(([0.0, 0.0], np.diff(series, 2) / dt[1:] ** 2))
+                    values.extend(split_sign(d))
+                for line, y in zip(lines, values):
+                    line.set_data(t, y)
+
+            line_a.set_visible(visible(settings[S_CHANNELS], "A"))
+            line_b.set_visible(visible(settings[S_CHANNELS], "B"))
+            for line, (_, ch, _) in zip(deriv_lines, colors):
+                line.set_visible(visible(settings[S_DERIV_CHANNELS], ch))
+            for line, (_, ch, _) in zip(deriv2_lines, colors):
+                line.set_visible(visible(settings[S_2ND_DERIV_CHANNELS], ch))
+
+            now = t[-1]
+            xlim = (0, time_range) if now <= time_range else (now - time_range, now)
+            for ax, index in ((ax1, S_Y_A), (ax2, S_Y_DIFF), (ax3, S_Y_1ST), (ax4, S_Y_2ND)):
+                ax.set_xlim(*xlim)
+                ax.set_ylim(settings[index], settings[index + 1])
+            fig.canvas.draw_idle()
+        plt.pause(max(float(settings[S_INTERVAL]), 0.05))
+
+    reader.close()
+    plt.close(fig)
+
+
+class ExternalRenderer:
+    """Runs `run_renderer` in a separate process so Agg drawing never competes with acquisition."""
+
+    def __init__(self, writer):
+        self.writer = writer
+        # Spawn, not fork: a forked child would inherit the parent's Tk state
+        context = multiprocessing.get_context("spawn")
+        self.writer.settings[S_CLOSE] = 0.0
+        self.process = context.Process(target=run_renderer, args=(writer.name,), daemon=True)
+        self.process.start()
+
+    def is_alive(self):
+        return self.process.is_alive()
+
+    def stop(self):
+        self.writer.settings[S_CLOSE] = 1.0
+        self.process.join(timeout=2.0)
+        if self.process.is_alive():
+            self.process.terminate()
@@ -0,0 +1,113 @@
+import collections
+import math
+
+
+class RollingStats:
+    """
+    Mean, standard deviation, min, max and drift of one signal over a sliding time window.
+
+    Every sample costs O(1) amortised, whatever the window length. Mean and variance use
+    Welford's update for samples entering and its inverse for samples leaving the window;
+    the drift is the least-squares slope from the matching co-moment of time and value.
+    Removing samples lets rounding errors accumulate, so the sums are recomputed exactly
+    from the window after every window's worth of removals, which keeps them accurate
+    however long the run is at no extra amortised cost. Min and max come from monotonic
+    deques, whose front is always the extremum of the current window.
+    """
+
+    def __init__(self, window=600.0):
+        self.window = window  # [s]
+        self.reset()
+
+    def reset(self):
+        self.samples = collections.deque()  # (index, t, x)
+        self.min_queue = collections.deque()  # (index, x), x increasing
+        self.max_queue = collections.deque()  # (index, x), x decreasing
+        self.count = 0  # Samples ever added, used as index
+        self.removed = 0  # Samples removed since the sums were last recomputed
+        self.n = 0
+        self.mean = self.mean_t = 0.0
+        self.m2 = self.m2_t = self.c_tx = 0.0
+
+    def set_window(self, window):
+        self.window = window
+        if self.samples:
+            self.expire(self.samples[-1][1])
+
+    def add(self, t, x):
+        index = self.count
+        self.count += 1
+        self.samples.append((index, t, x))
+        self.n += 1
+        dx = x - self.mean
+        self.mean += dx / self.n
+        dt = t - self.mean_t
+        self.mean_t += dt / self.n
+        self.m2 += dx * (x - self.mean)
+        self.m2_t += dt * (t - self.mean_t)
+        self.c_tx += dt * (x - self.mean)
+
+        while self.min_queue and self.min_queue[-1][1] >= x:
+            self.min_queue.pop()
+        self.min_queue.append((index, x))
+        while self.max_queue and self.max_queue[-1][1] <= x:
+            self.max_queue.pop()
+        self.max_queue.append((index, x))
+        self.expire(t)
+
+    def expire(self, now):
+        while self.samples and now - self.samples[0][1] > self.window:
+            index, t, x = self.samples.popleft()
+            self.n -= 1
+            if self.n == 0:
+                self.mean = self.mean_t = self.m2 = self.m2_t = self.c_tx = 0.0
+            else:
+                # Inverse Welford step: new means first, then the sums with old and new means
+                old_mean, old_mean_t = self.mean, self.mean_t
+                self.mean -= (x - self.mean) / self.n
+                self.mean_t -= (t - self.mean_t) / self.n
+                self.m2 -= (x - self.mean) * (x - old_mean)
+                self.m2_t -= (t - self.mean_t) * (t - old_mean_t)
+                self.c_tx -= (t - self.mean_t) * (x - old_mean)
+            self.removed += 1
+            if self.min_queue[0][0] == index:
+                self.min_queue.popleft()
+            if self.max_queue[0][0] == index:
+                self.max_queue.popleft()
+        if self.removed > max(self.n, 100):
+            self.recompute()
+
+    def recompute(self):
+        """Two-pass sums over the current window, discarding accumulated rounding errors."""
+        self.removed = 0
+        self.mean = sum(x for _, _, x in self.samples) / self.n if self.n else 0.0
+        self.mean_t = sum(t for _, t, _ in self.samples) / self.n if self.n else 0.0
+        self.m2 = self.m2_t = self.c_tx = 0.0
+        for _, t, x in self.samples:
+            dx, dt = x - self.mean, t - self.mean_t
+            self.m2 += dx * dx
+            self.m2_t += dt * dt
+            self.c_tx += dt * dx
+
+    @property
+    def std(self):
+        return math.sqrt(max(self.m2, 0.0) / (self.n - 1)) if self.n > 1 else None
+
+    @property
+    def minimum(self):
+        return self.min_queue[0][1] if self.min_queue else None
+
+    @property
+    def maximum(self):
+        return self.max_queue[0][1] if self.max_queue else None
+
+    @property
+    def drift(self):
+        """Least-squares slope over the window [K/min]."""
+        if self.n < 2 or self.m2_t <= 0:
+            return None
+        return self.c_tx / self.m2_t * 60.0
+
+    def span(self):
+        """Time actually covered by the window [s]."""
+        return self.samples[-1][1] - self.samples[0][1] if self.samples else 0.0
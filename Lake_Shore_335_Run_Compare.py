@@ -0,0 +1,147 @@
+import csv
+import io
+import json
+import os
+
+import numpy as np
+
+from Lake_Shore_335_Log_Analyzer import read_blocks
+from Lake_Shore_335_Session import SessionFile, MAGIC
+
+
+ALIGN_MODES = ("Setpoint change", "Ramp start", "Log start")
+CACHE_SUFFIX = ".runcache"  # Raw float64 rows (time, A, B) next to the CSV, plus a JSON list of events
+
+
+class MappedRun:
+    """
+    A saved run opened for comparison: a read-only memory map of rows starting with
+    (time, A, B), plus the logged events. It has the `bisect`/`rows` interface of SampleHistory, so the current
+    session history can be compared the same way.
+    """
+
+    def __init__(self, name, data, events):
+        self.name = name
+        self.data = data
+        self.events = events  # [(time, text)]
+
+    def __len__(self):
+        return len(self.data)
+
+    def bisect(self, t):
+        return int(np.searchsorted(self.data[:, 0], t, side="left"))
+
+    def rows(self, start=0, stop=None, step=1):
+        return self.data[start:stop:step]
+
+
+class HistoryRun:
+    """The session being recorded, with the events logged so far, compared like a saved run."""
+
+    def __init__(self, name, history, events):
+        self.name = name
+        self.history = history
+        self.events = events
+
+    def __len__(self):
+        return len(self.history)
+
+    def bisect(self, t):
+        return self.history.bisect(t)
+
+    def rows(self, start=0, stop=None, step=1):
+        return self.history.rows(start, stop, step)
+
+
+def build_cache(path, cache_path, chunk_bytes=16 * 1024 * 1024):
+    """Stream a CSV log into raw float64 rows and an event list, in fixed-size chunks."""
+    with open(path, newline="") as f:
+        header = next(csv.reader(f))
+    event_column = header.index("Event") if "Event" in header else None
+    events = []
+    with open(cache_path + ".tmp", "wb") as out:
+        for text in read_blocks(path, 0, os.path.getsize(path), chunk_bytes):
+            lines = [line for line in text.splitlines() if line and not line.startswith("Time")]
+            if not lines:
+                continue
+            np.loadtxt(lines, delimiter=",", usecols=(0, 1, 2), ndmin=2).astype("<f8").tofile(out)
+            if event_column is None:
+                continue
+            # Rows without an event end in an empty last field
+            tagged = [line for line in lines if not line.rstrip().endswith(",")]
+            for row in csv.reader(io.StringIO("\n".join(tagged))):
+                if len(row) > event_column and row[event_column]:
+                    events += [(float(row[0]), text) for text in row[event_column].split(";")]
+    with open(cache_path + ".json", "w") as f:
+        json.dump(events, f)
+    os.replace(cache_path + ".tmp", cache_path)
+
+
+def open_run(path):
+    """Open a CSV log (cached as raw rows on first use) or a session snapshot as a MappedRun."""
+    name = os.path.splitext(os.path.basename(path))[0]
+    with open(path, "rb") as f:
+        is_snapshot = f.read(len(MAGIC)) == MAGIC
+    if is_snapshot:
+        meta, rows = SessionFile(path).load()
+        if meta["fields"][:3] != ["time", "A", "B"]:
+            raise ValueError(f"Unexpected snapshot fields {meta['fields']}")
+        return MappedRun(name, rows, [])  # Extra columns are ignored, nothing is copied
+
+    cache_path = path + CACHE_SUFFIX
+    if not os.path.exists(cache_path) or os.path.getmtime(cache_path) < os.path.getmtime(path):
+        build_cache(path, cache_path)
+    with open(cache_path + ".json") as f:
+        events = [tuple(event) for event in json.load(f)]
+    if os.path.getsize(cache_path) == 0:
+        return MappedRun(name, np.empty((0, 3)), events)
+    return MappedRun(name, np.memmap(cache_path, dtype="<f8", mode="r").reshape(-1, 3), events)
+
+
+def coarse(run, max_points=20000):
+    """Every k-th row of a whole run, enough to find events on the minute scale."""
+    step = max(1, -(-len(run) // max_points))
+    return np.asarray(run.rows(0, len(run), step))
+
+
+def find_alignment(run, mode, occurrence=1, ramp_threshold=0.05, smoothing=60.0):
+    """
+    Run time of the `occurrence`-th alignment event, or None if the run has none:
+    a logged setpoint change, the start of a ramp (|dT_A/dt| rising above `ramp_threshold`
+    K/min, with the rate taken over `smoothing` seconds) or the first sample.
+    """
+    if not len(run):
+        return None
+    if mode == "Log start":
+        return float(run.rows(0, 1)[0, 0])
+    if mode == "Setpoint change":
+        # Manual changes log "setpoint X K", sequence steps "step i/n start setpoint=X"
+        times = [t for t, text in run.events if "setpoint" in text.lower()]
+    else:
+        rows = coarse(run)
+        grid = np.arange(rows[0, 0], rows[-1, 0], smoothing / 2)
+        if len(grid) < 3:
+            return None
+        rate = np.abs(np.gradient(np.interp(grid, rows[:, 0], rows[:, 1]), grid)) * 60.0
+        moving = rate > ramp_threshold
+        times = list(grid[1:][moving[1:] & ~moving[:-1]])
+    return float(times[occurrence - 1]) if len(times) >= occurrence else None
+
+
+def overlay_series(run, t_align, x_lower, x_upper, max_points=2000):
+    """
+    (time since the event, A, dT_A/dt [K/min]) of one run over [x_lower, x_upper], read with
+    a stride so at most about `max_points` rows are touched however long the run is. The rate
+    comes from the strided rows, which smooths it to the displayed resolution.
+    """
+    start = run.bisect(t_align + x_lower)
+    stop = run.bisect(np.nextafter(t_align + x_upper, np.inf))
+    step = max(1, -(-(stop - start) // max_points))
+    rows = np.array(run.rows(start, stop, step))
+    if len(rows) < 2:
+        return None
+    t = rows[:, 0] - t_align
+    dt = np.diff(t)
+    dt[dt <= 0] = np.nan
+    rate = np.concatenate(([np.nan], np.diff(rows[:, 1]) / dt * 60.0))
+    return t, rows[:, 1], rate
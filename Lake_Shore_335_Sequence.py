@@ -0,0 +1,168 @@
+import csv
+import json
+import os
+import threading
+import time
+
+
+# Step keys, anything missing falls back to the values currently set in the GUI
+STEP_FIELDS = ("setpoint", "ramp", "range", "P", "I", "D", "dwell", "tolerance", "rate", "settle_time", "timeout")
+
+# Instrument events (see ServiceRequestMonitor) after which a sequence must not continue unattended
+FAULT_EVENTS = ("sensor_overload", "heater_fault", "calibration_error", "power_on")
+
+
+def load_steps(file_path):
+    """
+    Read a step list from a .json file (list of objects) or a .csv file with a header row.
+
+    Only `setpoint` is required per step.
+    """
+    if file_path.lower().endswith(".json"):
+        with open(file_path) as f:
+            raw_steps = json.load(f)
+    else:
+        with open(file_path, newline='') as f:
+            raw_steps = [row for row in csv.DictReader(f)]
+
+    steps = []
+    for number, raw in enumerate(raw_steps, start=1):
+        step = {}
+        for key in STEP_FIELDS:
+            value = raw.get(key)
+            if value is None or value == "":
+                continue
+            step[key] = value if key == "range" else float(value)
+        if "setpoint" not in step:
+            raise ValueError(f"Step {number} has no setpoint")
+        if step.get("range", "Low") not in ("Off", "Low", "Med", "High"):
+            raise ValueError(f"Step {number} has an invalid range: {step['range']}")
+        steps.append(step)
+    return steps
+
+
+class SequenceRunner:
+    """
+    Runs a setpoint sequence on a background thread.
+
+    For each step `apply_step(step)` writes the heater settings, then the runner waits for
+    the "settled" event from the settle detector (forwarded through `notify`) and holds for
+    the step's dwell time. Progress is saved next to the sequence file after every step
+    boundary so an interrupted run can resume.
+    """
+
+    def __init__(self, file_path, steps, apply_step, log_event, start_index=0):
+        self.file_path = file_path
+        self.state_path = file_path + ".state.json"
+        self.steps = steps
+        self.apply_step = apply_step
+        self.log_event = log_event  # Called from the runner thread with a short text
+        self.index = start_index
+        self.settled_event = threading.Event()
+        self.unsettled_event = threading.Event()
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.status = "Idle"
+
+    @staticmethod
+    def saved_index(file_path):
+        """Step index to resume from, or None if the sequence has no saved progress."""
+        try:
+            with open(file_path + ".state.json") as f:
+                state = json.load(f)
+            return int(state["step"])
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def save_state(self):
+        with open(self.state_path, "w") as f:
+            json.dump({"sequence": os.path.abspath(self.file_path), "step": self.index, "saved": time.time()}, f)
+
+    def clear_state(self):
+        if os.path.exists(self.state_path):
+            os.remove(self.state_path)
+
+    def start(self):
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        self.settled_event.set()  # Wake the waits so the thread exits promptly
+        self.unsettled_event.set()
+
+    def is_running(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def notify(self, event, event_time=None, detector=None):
+        # Settle detector and instrument event listener, may be called from any thread
+        if event == "settled":
+            self.unsettled_event.clear()
+            self.settled_event.set()
+        elif event == "unsettled":
+            self.settled_event.clear()
+            self.unsettled_event.set()
+        elif event in FAULT_EVENTS and self.is_running():
+            # Instrument fault reported through the status byte
+            self.log_event(f"{event} reported by the instrument, stopping")
+            self.stop()
+
+    def run(self):
+        total = len(self.steps)
+        while self.index < total and not self.stop_event.is_set():
+            step = self.steps[self.index]
+            label = f"step {self.index + 1}/{total}"
+            self.save_state()
+            if not self.apply_with_retry(step, label):
+                break
+            self.log_event(f"{label} start setpoint={step['setpoint']}")
+            if not self.wait_settled_and_dwell(step, label):
+                break
+            self.log_event(f"{label} end")
+            self.index += 1
+
+        if self.stop_event.is_set():
+            self.status = f"Stopped at step {self.index + 1}/{total}"
+            self.log_event(f"sequence stopped at step {self.index + 1}/{total}")
+        else:
+            self.status = "Finished"
+            self.clear_state()
+            self.log_event("sequence finished")
+
+    def apply_with_retry(self, step, label):
+        # A reconnecting instrument raises ConnectionError; keep the step until the bus is back
+        while not self.stop_event.is_set():
+            try:
+                self.settled_event.clear()
+                self.unsettled_event.clear()
+                self.apply_step(step)
+                return True
+            except Exception as e:
+                self.status = f"{label}: waiting for instrument"
+                print(f"[Warning] Sequence {label} could not be applied, retrying: {e}")
+                self.stop_event.wait(5.0)
+        return False
+
+    def wait_settled_and_dwell(self, step, label):
+        timeout = step.get("timeout")
+        started = time.monotonic()
+        dwell = step.get("dwell", 0.0)
+        while not self.stop_event.is_set():
+            self.status = f"{label}: approaching {step['setpoint']} K"
+            while not self.settled_event.wait(1.0):
+                if self.stop_event.is_set():
+                    return False
+                if timeout and time.monotonic() - started > timeout:
+                    self.log_event(f"{label} timeout")
+                    return True
+            if self.stop_event.is_set():
+                return False
+            # Settled: hold for the dwell time, start over if the detector reports unsettled
+            self.status = f"{label}: settled, dwell {dwell:.0f} s"
+            if not self.unsettled_event.wait(dwell):
+                return True
+            if self.stop_event.is_set():
+                return False
+            self.log_event(f"{label} unsettled during dwell")
+        return False
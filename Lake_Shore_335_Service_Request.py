@@ -0,0 +1,186 @@
+import threading
+import time
+
+import pyvisa
+from pyvisa import constants
+
+
+# Status byte (serial poll) summary bits
+STB_ESB = 0x20  # Standard event status summary
+STB_RQS = 0x40  # Request service
+STB_OSB = 0x80  # Operation event summary
+
+# Operation event register (OPST?/OPSTR?/OPSTE) of the 335
+OPERATION_EVENTS = {
+    0: "alarm",
+    1: "sensor_overload",
+    2: "ramp_done_2",
+    3: "ramp_done_1",
+    4: "new_reading",
+    5: "autotune_done",
+    6: "calibration_error",
+    7: "communication_error",
+}
+
+# Standard event status register (*ESR?)
+STANDARD_EVENTS = {
+    0: "operation_complete",
+    2: "query_error",
+    4: "execution_error",
+    5: "command_error",
+    7: "power_on",
+}
+
+HEATER_FAULTS = {1: "open load", 2: "short"}  # HTRST? codes
+
+# Everything except the new-reading bit, which would fire on every conversion
+DEFAULT_OPERATION_MASK = sum(1 << bit for bit, name in OPERATION_EVENTS.items() if name != "new_reading")
+DEFAULT_STANDARD_MASK = sum(1 << bit for bit in STANDARD_EVENTS if bit != 0)
+
+
+class ServiceRequestMonitor:
+    """
+    Turns the 335's status reporting into callbacks.
+
+    The enable registers route the chosen operation and standard events into the status
+    byte, and the status byte raises SRQ. If the VISA library supports it, a service-request
+    event handler wakes the monitor thread; otherwise the thread does a serial poll
+    (a bus-level status byte read, not a command the instrument has to parse) every
+    `poll_interval` seconds. Only when a summary bit is set are the event registers read,
+    which also clears them. The heater status is not part of the status system, so HTRST?
+    is read for both outputs after every service request and every `heater_check_interval`.
+
+    Listeners are called from the monitor thread as listener(event, time, detail).
+    """
+
+    def __init__(self, link, operation_mask=DEFAULT_OPERATION_MASK, standard_mask=DEFAULT_STANDARD_MASK,
+                 poll_interval=0.5, heater_check_interval=10.0):
+        self.link = link
+        self.operation_mask = operation_mask
+        self.standard_mask = standard_mask
+        self.poll_interval = poll_interval
+        self.heater_check_interval = heater_check_interval
+        self.listeners = []
+        self.mode = "Off"  # "SRQ handler", "Serial poll" or "Off"
+        self.heater_state = {1: 0, 2: 0}
+        self.configured_resource = None
+        self.handler = None
+        self.wake = threading.Event()
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.last_heater_check = 0.0
+
+    def add_listener(self, listener):
+        self.listeners.append(listener)
+
+    def emit(self, event, detail=""):
+        t = time.time()
+        for listener in self.listeners:
+            try:
+                listener(event, t, detail)
+            except Exception as e:
+                print(f"[Error] Service request listener failed: {e}")
+
+    def start(self):
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        self.wake.set()
+        if self.thread is not None:
+            self.thread.join(timeout=2.0)
+        self.remove_handler()
+
+    def configure(self):
+        """Program the enable registers and hook SRQ on the current resource (again after a reconnect)."""
+        self.remove_handler()
+        resource = self.link.resource
+        # Reading the event registers clears anything latched before we started listening
+        self.link.query("OPSTR?")
+        self.link.query("*ESR?")
+        self.link.write(f"OPSTE {self.operation_mask}")
+        self.link.write(f"*ESE {self.standard_mask}")
+        self.link.write(f"*SRE {STB_OSB | STB_ESB}")
+        try:
+            self.handler = resource.wrap_handler(self.on_visa_event)
+            resource.install_handler(constants.EventType.service_request, self.handler)
+            resource.enable_event(constants.EventType.service_request, constants.EventMechanism.handler)
+            self.mode = "SRQ handler"
+        except (pyvisa.VisaIOError, NotImplementedError, AttributeError) as e:
+            self.handler = None
+            self.mode = "Serial poll"
+            print(f"[Info] VISA service-request events unavailable ({e}); falling back to serial polling.")
+        self.configured_resource = resource
+
+    def remove_handler(self):
+        resource, handler = self.configured_resource, self.handler
+        self.handler = None
+        if resource is None or handler is None:
+            return
+        try:
+            resource.disable_event(constants.EventType.service_request, constants.EventMechanism.handler)
+            resource.uninstall_handler(constants.EventType.service_request, handler)
+        except Exception:
+            pass  # Resource already closed by a reconnect
+
+    def on_visa_event(self, resource, event, user_handle):
+        # VISA callback thread: only wake the monitor, which owns all bus traffic of this class
+        self.wake.set()
+
+    def run(self):
+        while not self.stop_event.is_set():
+            try:
+                if self.link.state != "Connected":
+                    self.mode = "Off"
+                    self.stop_event.wait(1.0)
+                    continue
+                if self.link.resource is not self.configured_resource:
+                    self.configure()
+
+                if self.mode == "SRQ handler":
+                    # The timeout only paces the heater check and reconnect detection
+                    woke = self.wake.wait(min(self.heater_check_interval, 5.0))
+                    self.wake.clear()
+                    if woke and not self.stop_event.is_set():
+                        self.service()
+                else:
+                    self.stop_event.wait(self.poll_interval)
+                    self.service()
+
+                if time.monotonic() - self.last_heater_check >= self.heater_check_interval:
+                    self.check_heaters()
+            except ConnectionError:
+                # InstrumentLink is reconnecting; configure again once it is back
+                self.configured_resource = None
+                self.stop_event.wait(1.0)
+            except Exception as e:
+                print(f"[Error] Service request monitor: {e}")
+                self.stop_event.wait(1.0)
+
+    def service(self):
+        stb = self.link.run("SPOLL", lambda res: res.read_stb())
+        if not stb & (STB_OSB | STB_ESB):
+            return
+        if stb & STB_OSB:
+            self.emit_bits(int(self.link.query("OPSTR?").strip()), OPERATION_EVENTS)
+        if stb & STB_ESB:
+            self.emit_bits(int(self.link.query("*ESR?").strip()), STANDARD_EVENTS)
+        self.check_heaters()
+
+    def emit_bits(self, register, names):
+        for bit, name in names.items():
+            if register & (1 << bit):
+                self.emit(name)
+
+    def check_heaters(self):
+        self.last_heater_check = time.monotonic()
+        for output in (1, 2):
+            code = int(self.link.query(f"HTRST? {output}").strip())
+            if code != self.heater_state[output]:
+                self.heater_state[output] = code
+                if code:
+                    self.emit("heater_fault", f"heater {output}: {HEATER_FAULTS.get(code, code)}")
+                else:
+                    self.emit("heater_ok", f"heater {output}")
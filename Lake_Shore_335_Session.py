@@ -0,0 +1,109 @@
+import json
+import os
+import struct
+
+import numpy as np
+
+
+MAGIC = b"LS335SES"
+VERSION = 1
+HEADER_BYTES = 4096  # Fixed, so the header can be rewritten in place
+PREFIX = struct.Struct("<8sIII")  # magic, version, JSON length, number of fields
+WRITE_CHUNK_ROWS = 1 << 18
+
+
+class SessionFile:
+    """
+    Compact binary session snapshot: a fixed-size header (magic, version and a JSON block
+    with the row count, field names, time base and GUI settings) followed by the history
+    as raw little-endian float64 rows.
+
+    Saving is append-only: `save` writes only the rows added since the previous save, then
+    rewrites the header. A crash between the two leaves the old row count, so the file is
+    always consistent. Loading memory-maps the rows instead of parsing them, so restoring
+    millions of samples takes about as long as copying them once.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.saved_rows = None  # Rows known to be in the file, None until first save/load
+        self.fields = None
+
+    @staticmethod
+    def read_header(f):
+        prefix = f.read(PREFIX.size)
+        if len(prefix) < PREFIX.size:
+            raise ValueError("File is too short to be a session snapshot")
+        magic, version, length, n_fields = PREFIX.unpack(prefix)
+        if magic != MAGIC:
+            raise ValueError("Not a Lakeshore 335 session snapshot")
+        if version != VERSION:
+            raise ValueError(f"Unsupported session snapshot version {version}")
+        meta = json.loads(f.read(length).decode())
+        if len(meta["fields"]) != n_fields:
+            raise ValueError("Corrupt session snapshot header")
+        return meta
+
+    def write_header(self, f, meta):
+        block = json.dumps(meta, separators=(",", ":")).encode()
+        if PREFIX.size + len(block) > HEADER_BYTES:
+            raise ValueError("Session settings do not fit in the snapshot header")
+        f.seek(0)
+        f.write(PREFIX.pack(MAGIC, VERSION, len(block), len(meta["fields"])))
+        f.write(block.ljust(HEADER_BYTES - PREFIX.size, b" "))
+
+    def save(self, history, meta):
+        """Write `history` (a SampleHistory) and `meta` (JSON-serialisable settings)."""
+        n = len(history)
+        meta = dict(meta, fields=list(history.fields), rows=n)
+        fresh = (self.saved_rows is None or self.fields != history.fields or n < self.saved_rows
+                 or not os.path.exists(self.path))
+        if fresh:
+            # Full rewrite into a temporary file, then an atomic replace
+            temp_path = self.path + ".tmp"
+            with open(temp_path, "wb") as f:
+                self.write_header(f, meta)
+                self.write_rows(f, history, 0, n)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.path)
+        else:
+            with open(self.path, "r+b") as f:
+                f.seek(HEADER_BYTES + self.saved_rows * 8 * len(history.fields))
+                self.write_rows(f, history, self.saved_rows, n)
+                f.truncate()
+                f.flush()
+                os.fsync(f.fileno())
+                self.write_header(f, meta)
+        self.saved_rows = n
+        self.fields = history.fields
+
+    @staticmethod
+    def write_rows(f, history, start, stop):
+        for chunk_start in range(start, stop, WRITE_CHUNK_ROWS):
+            rows = history.rows(chunk_start, min(chunk_start + WRITE_CHUNK_ROWS, stop))
+            f.write(np.ascontiguousarray(rows, dtype="<f8").tobytes())
+
+    def load(self):
+        """Return (meta, rows) with rows a read-only memory map of shape (n, fields)."""
+        with open(self.path, "rb") as f:
+            meta = self.read_header(f)
+        n, n_fields = int(meta["rows"]), len(meta["fields"])
+        # A crash during an append can leave rows beyond the header's count; they are ignored
+        if os.path.getsize(self.path) < HEADER_BYTES + n * n_fields * 8:
+            raise ValueError("Session snapshot is truncated")
+        if n:
+            rows = np.memmap(self.path, dtype="<f8", mode="r", offset=HEADER_BYTES, shape=(n, n_fields))
+        else:
+            rows = np.empty((0, n_fields))
+        self.saved_rows = n
+        self.fields = tuple(meta["fields"])
+        return meta, rows
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def remove(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        self.saved_rows = None
@@ -0,0 +1,135 @@
+import collections
+
+
+class SettleDetector:
+    """
+    Incremental setpoint-reached / settled detector.
+
+    Each sample costs O(1): the slope over the rate window is a least-squares fit kept as
+    means and the co-moment of time and temperature, with Welford updates for samples
+    entering the window and their inverse for samples leaving it (as in RollingStats), so
+    its accuracy does not depend on how long the run has been going. A run is settled once
+    the temperature has been inside +/- `tolerance` of the setpoint with |dT/dt| below
+    `rate_threshold` continuously for `dwell` seconds.
+
+    Listeners are called as listener(event, time, detector) with event one of
+    "reached", "settled" or "unsettled".
+    """
+
+    def __init__(self, setpoint=310.0, tolerance=0.1, rate_threshold=0.01, dwell=120.0, rate_window=60.0):
+        self.setpoint = setpoint
+        self.tolerance = tolerance  # Band half-width [K]
+        self.rate_threshold = rate_threshold  # Max |dT/dt| [K/min]
+        self.dwell = dwell  # Required time inside the criteria [s]
+        self.rate_window = rate_window  # Slope window [s]
+        self.listeners = []
+        self.reset()
+
+    def reset(self):
+        self.window = collections.deque()  # (t, T)
+        self.n = 0
+        self.removed = 0  # Samples removed since the sums were last recomputed
+        self.mean_t = self.mean_y = self.m2_t = self.c_ty = 0.0
+        self.rate = None  # K/min
+        self.in_band = False
+        self.reached = False
+        self.settled = False
+        self.ok_since = None
+        self.last_event = None  # (event, time)
+
+    def set_setpoint(self, setpoint):
+        # A new target restarts the reached/settled cycle but keeps the rate window
+        self.setpoint = setpoint
+        self.in_band = False
+        self.reached = False
+        self.ok_since = None
+        if self.settled:
+            self.settled = False
+            self.emit("unsettled", self.window[-1][0] if self.window else 0.0)
+
+    def set_criteria(self, tolerance, rate_threshold, dwell):
+        self.tolerance = tolerance
+        self.rate_threshold = rate_threshold
+        self.dwell = dwell
+        self.ok_since = None
+
+    def add_listener(self, listener):
+        self.listeners.append(listener)
+
+    def emit(self, event, t):
+        self.last_event = (event, t)
+        for listener in self.listeners:
+            listener(event, t, self)
+
+    def update_rate(self, t, temp):
+        self.window.append((t, temp))
+        self.n += 1
+        dt = t - self.mean_t
+        self.mean_t += dt / self.n
+        self.mean_y += (temp - self.mean_y) / self.n
+        self.m2_t += dt * (t - self.mean_t)
+        self.c_ty += dt * (temp - self.mean_y)
+        while t - self.window[0][0] > self.rate_window:
+            old_t, old_y = self.window.popleft()
+            self.n -= 1
+            self.removed += 1
+            # Inverse Welford step: new means first, then the sums with old and new means
+            previous_t, previous_y = self.mean_t, self.mean_y
+            self.mean_t -= (old_t - self.mean_t) / self.n
+            self.mean_y -= (old_y - self.mean_y) / self.n
+            self.m2_t -= (old_t - self.mean_t) * (old_t - previous_t)
+            self.c_ty -= (old_t - self.mean_t) * (old_y - previous_y)
+        if self.removed > max(self.n, 100):
+            self.recompute()
+        if self.n >= 2 and self.m2_t > 0:
+            self.rate = self.c_ty / self.m2_t * 60.0
+        else:
+            self.rate = None
+
+    def recompute(self):
+        """Two-pass sums over the current window, discarding accumulated rounding errors."""
+        self.removed = 0
+        self.mean_t = sum(t for t, _ in self.window) / self.n
+        self.mean_y = sum(y for _, y in self.window) / self.n
+        self.m2_t = self.c_ty = 0.0
+        for t, y in self.window:
+            dt = t - self.mean_t
+            self.m2_t += dt * dt
+            self.c_ty += dt * (y - self.mean_y)
+
+    def update(self, t, temp):
+        """Feed one sample; returns the event fired by this sample or None."""
+        self.update_rate(t, temp)
+        self.in_band = abs(temp - self.setpoint) <= self.tolerance
+        event = None
+
+        if self.in_band and not self.reached:
+            self.reached = True
+            event = "reached"
+            self.emit(event, t)
+
+        ok = self.in_band and self.rate is not None and abs(self.rate) <= self.rate_threshold
+        if ok:
+            if self.ok_since is None:
+                self.ok_since = t
+            if not self.settled and t - self.ok_since >= self.dwell:
+                self.settled = True
+                event = "settled"
+                self.emit(event, t)
+        else:
+            self.ok_since = None
+            if self.settled:
+                self.settled = False
+                event = "unsettled"
+                self.emit(event, t)
+        return event
+
+    def status_text(self):
+        if self.settled:
+            return "Settled"
+        if self.ok_since is not None and self.window:
+            remaining = self.dwell - (self.window[-1][0] - self.ok_since)
+            return f"Dwell ({max(remaining, 0.0):.0f} s left)"
+        if self.in_band:
+            return "In band, rate too high"
+        return "Out of band" if self.reached else "Approaching"
@@ -0,0 +1,217 @@
+import os
+import sys
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+
+MAGIC = 0x4C53333335  # "LS335"
+VERSION = 2
+MAX_FIELDS = 16
+NAME_BYTES = 16
+SETTINGS_LEN = 16
+HEADER_INTS = 8  # magic, version, capacity, n_fields, seq, owner pid, reserved...
+SEQ_INDEX = 4
+OWNER_INDEX = 5
+HEADER_BYTES = HEADER_INTS * 8 + MAX_FIELDS * NAME_BYTES + SETTINGS_LEN * 8
+
+# Segment published by the monitoring GUI: run time [s], temperatures [K], |A-B| [K],
+# rates [K/min], heater output [%] (NaN until the first HTR? reading) and heater number
+FEED_NAME = "lakeshore335_live"
+LIVE_FIELDS = ("time", "A", "B", "diff", "rate_a", "rate_b", "heater", "output")
+
+
+class SharedSeriesWriter:
+    """
+    Ring buffer of float64 sample rows in a named shared-memory segment.
+
+    Every sample is written twice, at slot i and at slot i + capacity, so the latest N
+    samples (N <= capacity) are always one contiguous slice and readers can take NumPy
+    views without copying. The sequence number in the header counts samples written and
+    is bumped after the data, so readers can tell whether a view was overwritten.
+    """
+
+    def __init__(self, name, fields, capacity=360000):
+        if len(fields) > MAX_FIELDS:
+            raise ValueError(f"At most {MAX_FIELDS} fields are supported")
+        self.fields = tuple(fields)
+        self.capacity = capacity
+        size = HEADER_BYTES + len(fields) * 2 * capacity * 8
+        try:
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            remove_stale(name)
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        self.name = self.shm.name
+        self.header, self.settings, self.data = map_segment(self.shm.buf, len(fields), capacity)
+        for index, field in enumerate(self.fields):
+            encoded = field.encode()[:NAME_BYTES].ljust(NAME_BYTES, b"\0")
+            offset = HEADER_INTS * 8 + index * NAME_BYTES
+            self.shm.buf[offset:offset + NAME_BYTES] = encoded
+        self.header[:] = 0
+        self.header[1:4] = (VERSION, capacity, len(fields))
+        self.header[SEQ_INDEX] = 0
+        self.header[OWNER_INDEX] = os.getpid()
+        self.header[0] = MAGIC  # Written last: readers wait for a complete header
+
+    @property
+    def seq(self):
+        return int(self.header[SEQ_INDEX])
+
+    def append(self, row):
+        seq = int(self.header[SEQ_INDEX])
+        slot = seq % self.capacity
+        self.data[:, slot] = row
+        self.data[:, slot + self.capacity] = row
+        self.header[SEQ_INDEX] = seq + 1
+
+    def reset(self):
+        # Start a new time base, e.g. after Reset Time; old samples become unreachable
+        self.header[SEQ_INDEX] = 0
+
+    def extend(self, columns):
+        """Bulk-append equal-length columns (one per field), e.g. to backfill existing history."""
+        block = np.array([np.asarray(col, dtype=float)[-self.capacity:] for col in columns])
+        seq = int(self.header[SEQ_INDEX])
+        slots = (seq + np.arange(block.shape[1])) % self.capacity
+        self.data[:, slots] = block
+        self.data[:, slots + self.capacity] = block
+        self.header[SEQ_INDEX] = seq + block.shape[1]
+
+    def set_settings(self, values):
+        values = np.asarray(values, dtype=float)[:SETTINGS_LEN]
+        self.settings[:len(values)] = values
+
+    def close(self):
+        # Drop our NumPy views before releasing the mapping
+        self.header = self.settings = self.data = None
+        self.shm.close()
+        self.shm.unlink()
+
+
+class SharedSeriesReader:
+    """
+    Attach to a SharedSeriesWriter segment from any local process.
+
+        reader = SharedSeriesReader()
+        columns, seq = reader.latest(600)
+        mean_a = columns["A"].mean()
+        if not reader.is_intact(seq, 600):
+            ...  # Window was overwritten while in use, read again
+    """
+
+    def __init__(self, name=FEED_NAME):
+        self.shm = attach(name)
+        n_fields = int(np.frombuffer(self.shm.buf, dtype=np.int64, count=HEADER_INTS)[3])
+        capacity = int(np.frombuffer(self.shm.buf, dtype=np.int64, count=HEADER_INTS)[2])
+        self.capacity = capacity
+        self.header, self.settings, self.data = map_segment(self.shm.buf, n_fields, capacity)
+        if int(self.header[0]) != MAGIC:
+            raise ValueError(f"Shared memory segment {name!r} is not a Lakeshore 335 feed")
+        self.fields = []
+        for index in range(n_fields):
+            offset = HEADER_INTS * 8 + index * NAME_BYTES
+            self.fields.append(bytes(self.shm.buf[offset:offset + NAME_BYTES]).rstrip(b"\0").decode())
+
+    @property
+    def seq(self):
+        return int(self.header[SEQ_INDEX])
+
+    def latest(self, n=None):
+        """
+        Return ({field: view}, seq) for the latest `n` samples (all available if None).
+
+        The arrays are views into shared memory; call `is_intact(seq, n)` after using them
+        to check the writer has not lapped the window in the meantime.
+        """
+        seq = self.seq
+        available = min(seq, self.capacity)
+        n = available if n is None else min(n, available)
+        if n == 0:
+            return {field: self.data[i, :0] for i, field in enumerate(self.fields)}, seq
+        end = (seq - 1) % self.capacity + self.capacity + 1
+        return {field: self.data[i, end - n:end] for i, field in enumerate(self.fields)}, seq
+
+    def is_intact(self, seq, n):
+        # The oldest sample of the window is overwritten once the writer gets capacity - n samples further
+        return self.seq - seq <= self.capacity - n
+
+    def close(self):
+        self.header = self.settings = self.data = None
+        self.shm.close()
+
+
+def attach(name):
+    # Before Python 3.13 an attaching process registers the segment with its resource tracker,
+    # which unlinks it when that process exits and pulls the feed from under the writer
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    shm = shared_memory.SharedMemory(name=name)
+    resource_tracker.unregister(shm._name, "shared_memory")
+    return shm
+
+
+def remove_stale(name):
+    """
+    Unlink a segment left over from a monitor that crashed. A segment whose owner is still
+    running, or that cannot be identified as a feed, is left alone and FileExistsError raised.
+    """
+    existing = attach(name)
+    header = np.frombuffer(existing.buf, dtype=np.int64, count=HEADER_INTS)
+    magic, version, owner = int(header[0]), int(header[1]), int(header[OWNER_INDEX])
+    del header
+    existing.close()
+    if magic != MAGIC or version != VERSION:
+        raise FileExistsError(f"Shared memory segment {name!r} exists but is not a Lakeshore 335 feed of this "
+                              f"version; close the program using it or remove it")
+    if process_alive(owner):
+        raise FileExistsError(f"Shared memory segment {name!r} is in use by process {owner}, "
+                              f"is another monitor running?")
+    stale = shared_memory.SharedMemory(name=name)
+    stale.close()
+    stale.unlink()
+
+
+def process_alive(pid):
+    if pid <= 0:
+        return False
+    if sys.platform == "win32":
+        # Windows frees a segment with its last handle, so one that still exists is in use
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True  # Exists, owned by another user
+    return True
+
+
+def map_segment(buf, n_fields, capacity):
+    header = np.ndarray((HEADER_INTS,), dtype=np.int64, buffer=buf, offset=0)
+    settings = np.ndarray((SETTINGS_LEN,), dtype=np.float64, buffer=buf,
+                          offset=HEADER_INTS * 8 + MAX_FIELDS * NAME_BYTES)
+    data = np.ndarray((n_fields, 2 * capacity), dtype=np.float64, buffer=buf, offset=HEADER_BYTES)
+    return header, settings, data
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Print the latest samples of the Lakeshore 335 live feed.")
+    parser.add_argument("n", type=int, nargs="?", default=10, help="Number of samples")
+    parser.add_argument("--name", default=FEED_NAME, help="Shared-memory segment name")
+    args = parser.parse_args()
+
+    reader = SharedSeriesReader(args.name)
+    columns, seq = reader.latest(args.n)
+    print("  ".join(f"{field:>10}" for field in reader.fields))
+    for row in zip(*(columns[field] for field in reader.fields)):
+        print("  ".join(f"{value:10.3f}" for value in row))
+    print(f"seq = {seq}, intact = {reader.is_intact(seq, len(columns['time']))}")
+    del columns
+    reader.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+import argparse
+import json
+
+
+# Full-scale power [W] per output and range code. The 335 ranges are decades of the output's
+# maximum power (Low = 1 %, Med = 10 %, High = 100 %). Both GUIs and the simulation use this table.
+HEATER_RANGE_WATTS = {
+    1: {0: 0.0, 1: 0.5, 2: 5.0, 3: 50.0},
+    2: {0: 0.0, 1: 0.25, 2: 2.5, 3: 25.0},
+}
+RANGE_CODES = {"Off": 0, "Low": 1, "Med": 2, "High": 3}
+SIMULATED_OUTPUT = 2  # The GUIs' default heater
+RANGE_WATTS = HEATER_RANGE_WATTS[SIMULATED_OUTPUT]
+
+
+class ThermalPlant:
+    """
+    Lumped model of a sample stage on a cold bath.
+
+    The heat capacity follows a Debye-like T^3 law with a floor, so the stage is
+    fast and easy to overshoot at low temperature and sluggish near room temperature.
+    The sensor reads the stage through a first-order thermal lag.
+    """
+
+    def __init__(self, t_bath=4.2, t_start=None, c_room=40.0, c_floor=0.05, conductance=0.02, sensor_tau=5.0):
+        self.t_bath = t_bath
+        self.c_room = c_room  # Heat capacity at 300 K [J/K]
+        self.c_floor = c_floor  # Residual heat capacity near the bath [J/K]
+        self.conductance = conductance  # Link to the bath [W/K]
+        self.sensor_tau = sensor_tau  # Sensor lag [s]
+        self.stage = t_bath if t_start is None else t_start
+        self.sensor = self.stage
+
+    def heat_capacity(self, temperature):
+        return self.c_floor + self.c_room * (max(temperature, 0.0) / 300.0) ** 3
+
+    def step(self, power, dt):
+        # Sub-step so the cold, low heat capacity regime stays numerically stable
+        n = max(1, int(dt / 0.05))
+        h = dt / n
+        for _ in range(n):
+            flow = power - self.conductance * (self.stage - self.t_bath)
+            self.stage += flow / self.heat_capacity(self.stage) * h
+            self.sensor += (self.stage - self.sensor) / self.sensor_tau * h
+        return self.sensor
+
+
+class Lakeshore335PID:
+    """
+    Discrete form of the 335 control loop.
+
+    Output [%] = P * (e + I/1000 * integral(e dt) + D/100 * Ti/4 * de/dt), with Ti = 1000 / I,
+    clamped to 0..100 % with integrator anti-windup, as described in the 335 manual.
+    """
+
+    def __init__(self, P=50.0, I=10.0, D=0.0):
+        self.set_pid(P, I, D)
+        self.integral = 0.0
+        self.prev_error = None
+
+    def set_pid(self, P, I, D):
+        self.P, self.I, self.D = P, I, D
+
+    def update(self, setpoint, measured, dt):
+        error = setpoint - measured
+        derivative = 0.0 if self.prev_error is None or dt <= 0 else (error - self.prev_error) / dt
+        self.prev_error = error
+        ti = 1000.0 / self.I if self.I > 0 else 0.0
+        candidate = self.integral + error * dt
+        out = self.P * (error + self.I / 1000.0 * candidate + self.D / 100.0 * ti / 4.0 * derivative)
+        if 0.0 <= out <= 100.0:
+            self.integral = candidate  # Only integrate while unsaturated (anti-windup)
+        return min(max(out, 0.0), 100.0)
+
+
+def zone_for(zones, setpoint):
+    """Return the first zone whose upper boundary is at or above the setpoint, like the 335 does."""
+    for zone in sorted(zones, key=lambda z: z["upper"]):
+        if setpoint <= zone["upper"]:
+            return zone
+    return zones[-1] if zones else None
+
+
+def simulate(setpoint, pid=None, range_name="Low", ramp=0.0, zones=None, plant=None, duration=7200.0, dt=0.5):
+    """
+    Run the closed loop from the plant's current temperature to `setpoint`.
+
+    Either a fixed `pid` dict with `range_name`/`ramp`, or a `zones` table is used.
+    Returns (time, sensor temperature, heater %) lists sampled every `dt` seconds.
+    """
+    plant = plant or ThermalPlant()
+    controller = Lakeshore335PID(**(pid or {"P": 50.0, "I": 10.0, "D": 0.0}))
+    ramped = plant.sensor
+    times, temps, outputs = [], [], []
+    t = 0.0
+    while t <= duration:
+        active_zone = zone_for(zones, ramped) if zones else None
+        if active_zone:
+            controller.set_pid(active_zone["P"], active_zone["I"], active_zone["D"])
+            range_code = RANGE_CODES.get(active_zone["range"], 1)
+            rate = active_zone.get("ramp", 0.0)
+        else:
+            range_code = RANGE_CODES.get(range_name, 1)
+            rate = ramp
+        # Setpoint ramp in K/min, 0 disables ramping like RAMP n,0
+        if rate > 0:
+            step = rate / 60.0 * dt
+            ramped = min(setpoint, ramped + step) if setpoint > ramped else max(setpoint, ramped - step)
+        else:
+            ramped = setpoint
+        out = controller.update(ramped, plant.sensor, dt)
+        plant.step(out / 100.0 * RANGE_WATTS[range_code], dt)
+        times.append(t)
+        temps.append(plant.sensor)
+        outputs.append(out)
+        t += dt
+    return times, temps, outputs
+
+
+def settling_metrics(times, temps, setpoint, tolerance=0.1):
+    """
+    Rise time (10 -> 90 % of the step), overshoot [K] and settling time into +/- `tolerance`.
+
+    Settling time is None when the response never stays inside the band until the end.
+    """
+    if not temps:
+        return {"rise_time": None, "overshoot": None, "settling_time": None}
+    start = temps[0]
+    span = setpoint - start
+    rise_time = None
+    if span != 0:
+        t10 = t90 = None
+        for t, temp in zip(times, temps):
+            frac = (temp - start) / span
+            if t10 is None and frac >= 0.1:
+                t10 = t
+            if t90 is None and frac >= 0.9:
+                t90 = t
+                break
+        if t10 is not None and t90 is not None:
+            rise_time = t90 - t10
+    if span >= 0:
+        overshoot = max(0.0, max(temps) - setpoint)
+    else:
+        overshoot = max(0.0, setpoint - min(temps))
+    settling_time = None
+    for i in range(len(temps) - 1, -1, -1):
+        if abs(temps[i] - setpoint) > tolerance:
+            settling_time = times[i + 1] if i + 1 < len(times) else None
+            break
+    else:
+        settling_time = times[0]
+    return {"rise_time": rise_time, "overshoot": overshoot, "settling_time": settling_time}
+
+
+def benchmark_zones(zones, pid, ramp, steps, ranges=("Low", "Med", "High"), tolerance=0.1, duration=7200.0):
+    """
+    Compare a fixed PID in each of `ranges` against a zone table on a list of (start, setpoint) steps.
+
+    Returns one row per step with the metrics of every strategy, keyed by range name or "Zones".
+    """
+    rows = []
+    for start, setpoint in steps:
+        metrics = {}
+        for range_name in ranges:
+            fixed = simulate(setpoint, pid=pid, range_name=range_name, ramp=ramp,
+                             plant=ThermalPlant(t_start=start), duration=duration)
+            metrics[range_name] = settling_metrics(fixed[0], fixed[1], setpoint, tolerance)
+        zoned = simulate(setpoint, zones=zones, plant=ThermalPlant(t_start=start), duration=duration)
+        metrics["Zones"] = settling_metrics(zoned[0], zoned[1], setpoint, tolerance)
+        rows.append({"start": start, "setpoint": setpoint, "metrics": metrics})
+    return rows
+
+
+def summarize(rows, strategy):
+    """(steps settled, total settling time [s] of those, worst overshoot [K]) of one strategy."""
+    results = [row["metrics"][strategy] for row in rows]
+    settled = [m["settling_time"] for m in results if m["settling_time"] is not None]
+    return len(settled), sum(settled), max(m["overshoot"] for m in results)
+
+
+def best_fixed_range(rows):
+    """The fixed range that settles the most steps, then in the least total time."""
+    ranges = [name for name in rows[0]["metrics"] if name != "Zones"]
+    return max(ranges, key=lambda name: (summarize(rows, name)[0], -summarize(rows, name)[1]))
+
+
+def format_benchmark(rows):
+    def fmt(m):
+        settle = "n/a" if m["settling_time"] is None else f"{m['settling_time']:.0f}"
+        return f"{settle:>6} {m['overshoot']:6.2f}"
+
+    strategies = list(rows[0]["metrics"])
+    names = [f"fixed {name}" if name != "Zones" else "zones" for name in strategies]
+    lines = [f"{'Step [K]':>14} | " + " | ".join(f"{name:>13}" for name in names),
+             f"{'':>14} | " + " | ".join(f"{'settle':>6} {'over':>6}" for _ in names)]
+    for row in rows:
+        lines.append(f"{row['start']:6.1f}->{row['setpoint']:6.1f} | "
+                     + " | ".join(fmt(row["metrics"][name]) for name in strategies))
+    lines.append("Settling [s] and overshoot [K]; n/a = not within the band at the end.")
+    best = best_fixed_range(rows)
+    for name, label in ((best, f"Best fixed range ({best})"), ("Zones", "Zone table")):
+        settled, total, overshoot = summarize(rows, name)
+        lines.append(f"{label}: {settled}/{len(rows)} steps settled in {total:.0f} s total, "
+                     f"worst overshoot {overshoot:.2f} K")
+    return "\n".join(lines)
+
+
+# Zone table tuned for ThermalPlant, also the editor's starting point
+DEFAULT_ZONES = [
+    {"upper": 14.0, "P": 150.0, "I": 40.0, "D": 30.0, "range": "Low", "ramp": 0.0},
+    {"upper": 100.0, "P": 20.0, "I": 40.0, "D": 30.0, "range": "Med", "ramp": 0.0},
+    {"upper": 200.0, "P": 40.0, "I": 20.0, "D": 30.0, "range": "High", "ramp": 0.0},
+    {"upper": 400.0, "P": 80.0, "I": 20.0, "D": 30.0, "range": "High", "ramp": 0.0},
+]
+
+DEFAULT_STEPS = [(5.0, 10.0), (10.0, 50.0), (50.0, 150.0), (150.0, 300.0)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Settling-time benchmark: fixed PID vs. zone table on a simulated plant.")
+    parser.add_argument("--zones", help="Zone table JSON saved by the zone editor (default: built-in table)")
+    parser.add_argument("--P", type=float, default=50.0)
+    parser.add_argument("--I", type=float, default=10.0)
+    parser.add_argument("--D", type=float, default=0.0)
+    parser.add_argument("--range", nargs="+", default=["Low", "Med", "High"], choices=["Low", "Med", "High"],
+                        help="Fixed ranges to compare against the zone table (default: all)")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="Settling band [K]")
+    parser.add_argument("--duration", type=float, default=7200.0, help="Simulated time per step [s]")
+    args = parser.parse_args()
+
+    zones = DEFAULT_ZONES
+    if args.zones:
+        with open(args.zones) as f:
+            zones = json.load(f)
+    rows = benchmark_zones(zones, {"P": args.P, "I": args.I, "D": args.D}, 0.0, DEFAULT_STEPS, args.range,
+                           args.tolerance, args.duration)
+    print(format_benchmark(rows))
+
+
+if __name__ == "__main__":
+    main()
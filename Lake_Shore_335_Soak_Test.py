@@ -0,0 +1,390 @@
+import argparse
+import csv
+import gc
+import os
+import random
+import re
+import resource
+import tempfile
+import threading
+import time
+import tkinter as tk
+from unittest import mock
+
+import numpy as np
+
+from Lake_Shore_335_Simulation import ThermalPlant, Lakeshore335PID, HEATER_RANGE_WATTS
+
+
+class SimulatedClock:
+    """Wall clock of the soak test; advanced explicitly, so simulated days pass in minutes."""
+
+    def __init__(self, start=None):
+        self.start = time.time() if start is None else start
+        self.monotonic_start = time.monotonic()  # Jobs scheduled before the switch keep their deadlines
+        self.elapsed = 0.0
+
+    def advance(self, dt):
+        self.elapsed += dt
+
+    def time(self):
+        return self.start + self.elapsed
+
+    def monotonic(self):
+        return self.monotonic_start + self.elapsed
+
+
+class ClockedTime:
+    """Stand-in for the `time` module of the app: wall and monotonic time follow the clock."""
+
+    def __init__(self, clock):
+        self.clock = clock
+
+    def time(self):
+        return self.clock.time()
+
+    def monotonic(self):
+        return self.clock.monotonic()
+
+    def __getattr__(self, name):
+        return getattr(time, name)  # perf_counter, sleep, ... stay real
+
+
+class SimulatedLink:
+    """
+    Drop-in for InstrumentLink backed by the thermal plant of Lake_Shore_335_Simulation.
+
+    Sensor A reads the stage, sensor B a further lagged point with a small offset, both with
+    measurement noise at the 335's display resolution. The plant is advanced to the clock
+    on every query, with the heater driven by the 335 PID on the setpoint last written.
+    Only the commands the GUI and the service monitor use are understood.
+    """
+
+    clock = None  # Set on a subclass by the harness
+    state = "Connected"
+
+    def __init__(self, rm=None, address="SIM::335", noise=0.002, b_offset=0.05, b_tau=20.0):
+        self.address = address
+        self.noise = noise
+        self.b_offset = b_offset
+        self.b_tau = b_tau
+        self.plant = ThermalPlant(t_start=300.0)
+        self.sensor_b = self.plant.sensor
+        self.pid = Lakeshore335PID()
+        self.setpoint = {1: 300.0, 2: 300.0}
+        self.range_code = {1: 3, 2: 3}  # High, so the whole 10-300 K setpoint cycle is reachable
+        self.output = {1: 0.0, 2: 0.0}
+        self.last_step = None
+        self.lock = threading.Lock()  # The service monitor queries from its own thread
+        self.resource = None
+
+    @staticmethod
+    def worst_case_latency(*commands):
+        return 0.0
+
+    def open(self):
+        self.state = "Connected"
+        self.resource = self
+        self.last_step = self.clock.monotonic()
+
+    def close(self):
+        self.state = "Disconnected"
+        self.resource = None
+
+    def advance(self):
+        now = self.clock.monotonic()
+        dt = now - self.last_step
+        self.last_step = now
+        while dt > 0:
+            h = min(dt, 1.0)
+            dt -= h
+            self.output[2] = self.pid.update(self.setpoint[2], self.plant.sensor, h)
+            power = self.output[2] / 100.0 * HEATER_RANGE_WATTS[2].get(self.range_code[2], 0.0)
+            self.plant.step(power, h)
+            self.sensor_b += (self.plant.sensor - self.sensor_b) / self.b_tau * h
+
+    def reading(self, value):
+        return f"{round(value + random.gauss(0.0, self.noise), 3):+.3f}"
+
+    def query(self, command):
+        with self.lock:
+            self.advance()
+            name, _, args = command.strip().partition(" ")
+            if name == "KRDG?":
+                return self.reading(self.plant.sensor if args == "A" else self.sensor_b + self.b_offset)
+            if name == "HTR?":
+                return f"{self.output.get(int(args), 0.0):.1f}"
+            if name == "RANGE?":
+                return str(self.range_code.get(int(args), 0))
+            if name == "SETP?":
+                return f"{self.setpoint.get(int(args), 0.0):.3f}"
+            if name == "*IDN?":
+                return "LSCI,MODEL335,SIMULATED,1.0"
+            return "0"  # HTRST?, OPSTR?, *ESR? and anything else: no events, no faults
+
+    def write(self, command):
+        with self.lock:
+            self.advance()
+            name, _, args = command.strip().partition(" ")
+            values = [v for v in re.split(r"[,\s]+", args) if v]
+            if name == "SETP" and len(values) == 2:
+                self.setpoint[int(values[0])] = float(values[1])
+            elif name == "RANGE" and len(values) == 2:
+                self.range_code[int(values[0])] = int(values[1])
+            elif name == "PID" and len(values) == 4:
+                self.pid.set_pid(*map(float, values[1:]))
+
+    def run(self, name, operation):
+        with self.lock:
+            return operation(self)
+
+    def read_stb(self):
+        return 0
+
+    def wrap_handler(self, callback):
+        raise NotImplementedError("Simulated instrument has no VISA events")
+
+
+def resident_mb():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except OSError:
+        # Peak instead of current resident size, still fine for trend detection
+        scale = 1 if os.uname().sysname == "Darwin" else 1024
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale / 2 ** 20
+
+
+# Metric -> (allowed relative growth, allowed absolute growth) over the measured part of the run
+DEFAULT_THRESHOLDS = {
+    "rss_mb": (0.10, 5.0),
+    "tick_ms_p99": (0.50, 1.0),
+    "draw_ms": (0.50, 20.0),
+    "objects": (0.05, 2000.0),
+    "figures": (0.0, 0.5),
+    "toplevels": (0.0, 0.5),
+    "pending_after": (0.0, 5.0),
+    "threads": (0.0, 0.5),
+}
+
+
+def check_trends(samples, thresholds=DEFAULT_THRESHOLDS, warmup=0.2):
+    """
+    Fit a line to each metric over the samples after `warmup` (a fraction of the run) and
+    return a failure message for every metric whose fitted growth exceeds its threshold,
+    relative to its level at the start of the measured part.
+    """
+    failures = []
+    samples = samples[int(len(samples) * warmup):]
+    if len(samples) < 4:
+        return ["Too few samples after warm-up to judge trends"]
+    days = np.array([s["sim_days"] for s in samples])
+    for name, (relative, absolute) in thresholds.items():
+        values = np.array([s[name] for s in samples], dtype=float)
+        if not np.all(np.isfinite(values)):
+            continue
+        slope = np.polyfit(days, values, 1)[0]
+        growth = slope * (days[-1] - days[0])
+        baseline = float(np.median(values[:max(2, len(values) // 4)]))
+        limit = relative * abs(baseline) + absolute
+        if growth > limit:
+            failures.append(f"{name} grows by {growth:.3g} ({slope:.3g}/day) from {baseline:.3g}, "
+                            f"limit {limit:.3g}")
+    return failures
+
+
+class SoakTest:
+    """
+    Runs the monitoring GUI against a simulated instrument on an accelerated clock.
+
+    The harness advances the clock one reading interval at a time and lets the app's own
+    deadline scheduler run whatever is due, so acquisition, heater readout, autosave and
+    popup refreshes go through their normal code paths; only the plot frame rate is
+    reduced (one redraw per `draw_every` simulated seconds). Along the way it cycles the
+    setpoint, opens and closes the plot popups and toggles CSV logging, and every
+    `sample_every` simulated seconds it records resident memory, tick latency, Python
+    object count, open figures, Toplevels, pending Tk timers and threads.
+    """
+
+    def __init__(self, days=5.0, rate=10.0, draw_every=60.0, sample_every=3600.0, popup_every=6 * 3600.0,
+                 popup_lifetime=600.0, logging_every=12 * 3600.0, setpoint_every=8 * 3600.0,
+                 ram_budget_mb=8.0, workdir=None):
+        self.days = days
+        self.rate = rate  # Readings per simulated second
+        self.draw_every = draw_every
+        self.sample_every = sample_every
+        self.popup_every = popup_every
+        self.popup_lifetime = popup_lifetime
+        self.logging_every = logging_every
+        self.setpoint_every = setpoint_every
+        self.ram_budget_mb = ram_budget_mb
+        self.workdir = workdir or tempfile.mkdtemp(prefix="lakeshore335_soak_")
+        self.setpoints = [300.0, 77.0, 10.0, 200.0]
+        self.samples = []
+        self.tick_times = []
+        self.draw_times = []
+        self.errors = []
+
+    def timed(self, callback, sink):
+        def run():
+            started = time.perf_counter()
+            callback()
+            sink.append(time.perf_counter() - started)
+        return run
+
+    def run(self, out=None):
+        # Imported here: the app module opens VISA at import time in a normal install
+        import Lake_Shore_335_Temperature_Monitoring as monitoring
+        from Lake_Shore_335_History import SampleHistory
+
+        clock = SimulatedClock()
+        link_class = type("ClockedLink", (SimulatedLink,), {"clock": clock})
+        os.chdir(self.workdir)  # Autosave snapshot and CSV logs stay in the scratch directory
+        patches = [
+            mock.patch.object(monitoring, "time", ClockedTime(clock)),
+            mock.patch.object(monitoring, "InstrumentLink", link_class),
+            mock.patch.object(monitoring.pyvisa, "ResourceManager", lambda *args: None),
+            mock.patch.object(monitoring.messagebox, "showerror", lambda title, text: self.errors.append(text)),
+            mock.patch.object(monitoring.messagebox, "askyesno", lambda *args: False),
+            mock.patch.object(monitoring.filedialog, "asksaveasfilename",
+                              lambda **kwargs: os.path.join(self.workdir, "soak_log.csv")),
+        ]
+        for patch in patches:
+            patch.start()
+        root = tk.Tk()
+        root.withdraw()
+        app = None
+        try:
+            app = monitoring.Lakeshore335App(root)
+            app.scheduler.clock = clock.monotonic
+            app.frame_scheduler.stop()  # Redraws are driven below at a reduced rate
+            app.history.close()
+            app.history = SampleHistory(app.history.fields, ram_budget_mb=self.ram_budget_mb, spill_dir=self.workdir)
+            app.reading_interval = 1.0 / self.rate
+            app.toggle_reading()
+            app.acquisition_job.callback = self.timed(app.acquisition_job.callback, self.tick_times)
+            self.loop(app, root, clock, out)
+        finally:
+            for patch in patches:
+                patch.stop()
+            if app is not None:
+                app.on_close()
+        return check_trends(self.samples) + [f"GUI error: {text}" for text in self.errors[:5]]
+
+    def loop(self, app, root, clock, out):
+        dt = 1.0 / self.rate
+        end = self.days * 86400.0
+        next_draw = next_sample = self.draw_every
+        next_popup, next_logging, next_setpoint = self.popup_every, self.logging_every, self.setpoint_every
+        popups = []  # (close time, Toplevel)
+        setpoint_index = 0
+        writer = None
+        if out:
+            out_file = open(out, "w", newline="")
+            writer = csv.writer(out_file)
+        started = time.perf_counter()
+        try:
+            while clock.elapsed < end:
+                clock.advance(dt)
+                app.scheduler.fire()
+                now = clock.elapsed
+                if now >= next_draw:
+                    next_draw += self.draw_every
+                    self.timed(app.draw_frame, self.draw_times)()
+                    root.update()
+                if now >= next_setpoint:
+                    next_setpoint += self.setpoint_every
+                    setpoint_index = (setpoint_index + 1) % len(self.setpoints)
+                    app.set_setpoint(self.setpoints[setpoint_index])
+                if now >= next_popup:
+                    next_popup += self.popup_every
+                    popups += [(now + self.popup_lifetime, popup) for popup in self.open_popups(app, root)]
+                for close_time, popup in [p for p in popups if p[0] <= now]:
+                    self.close_popup(root, popup)
+                popups = [p for p in popups if p[0] > now]
+                if now >= next_logging:
+                    next_logging += self.logging_every
+                    app.toggle_csv_logging()
+                if now >= next_sample:
+                    next_sample += self.sample_every
+                    sample = self.sample(app, root, now)
+                    self.samples.append(sample)
+                    if writer is not None:
+                        if len(self.samples) == 1:
+                            writer.writerow(sample)
+                        writer.writerow(sample.values())
+                        out_file.flush()
+                    print(f"[Soak] day {sample['sim_days']:.2f}: RSS {sample['rss_mb']:.1f} MB, "
+                          f"tick p99 {sample['tick_ms_p99']:.2f} ms, draw {sample['draw_ms']:.0f} ms, "
+                          f"{sample['objects']} objects, {sample['figures']} figures, "
+                          f"{time.perf_counter() - started:.0f} s elapsed")
+        finally:
+            if writer is not None:
+                out_file.close()
+
+    def open_popups(self, app, root):
+        before = set(root.winfo_children())
+        for axis in (app.ax1, app.ax2, app.ax3):
+            app.open_axis_popup(axis)
+        app.open_spectrum_window()
+        return [w for w in root.winfo_children() if w not in before and isinstance(w, tk.Toplevel)]
+
+    @staticmethod
+    def close_popup(root, popup):
+        if not popup.winfo_exists():
+            return
+        # Close the way the window manager would, through the popup's own handler if it has one
+        handler = popup.protocol("WM_DELETE_WINDOW")
+        if handler:
+            root.tk.call(handler)
+        else:
+            popup.destroy()
+
+    def sample(self, app, root, now):
+        import matplotlib.pyplot as plt
+
+        gc.collect()
+        ticks = np.array(self.tick_times or [np.nan]) * 1000
+        draws = np.array(self.draw_times or [np.nan]) * 1000
+        self.tick_times.clear()
+        self.draw_times.clear()
+        return {
+            "sim_days": now / 86400.0,
+            "rows": len(app.history),
+            "rss_mb": resident_mb(),
+            "tick_ms_mean": float(np.mean(ticks)),
+            "tick_ms_p99": float(np.percentile(ticks, 99)),
+            "draw_ms": float(np.mean(draws)),
+            "objects": len(gc.get_objects()),
+            "figures": len(plt.get_fignums()),
+            "toplevels": sum(isinstance(w, tk.Toplevel) for w in root.winfo_children()),
+            "pending_after": len(root.tk.splitlist(root.tk.call("after", "info"))),
+            "threads": threading.active_count(),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Soak test of the monitoring GUI on a simulated instrument and "
+                                                 "accelerated clock. Needs a display; on a headless machine run it "
+                                                 "under xvfb-run.")
+    parser.add_argument("--days", type=float, default=5.0, help="Simulated duration [days]")
+    parser.add_argument("--rate", type=float, default=10.0, help="Readings per simulated second")
+    parser.add_argument("--draw-every", type=float, default=60.0, help="Simulated seconds between plot redraws")
+    parser.add_argument("--sample-every", type=float, default=3600.0, help="Simulated seconds between metric samples")
+    parser.add_argument("--ram-budget-mb", type=float, default=8.0, help="History RAM budget, small so spilling is exercised")
+    parser.add_argument("--out", default="soak_metrics.csv", help="CSV of the metric samples")
+    args = parser.parse_args()
+
+    soak = SoakTest(days=args.days, rate=args.rate, draw_every=args.draw_every, sample_every=args.sample_every,
+                    ram_budget_mb=args.ram_budget_mb)
+    failures = soak.run(out=os.path.abspath(args.out))
+    if failures:
+        print("[Soak] FAILED:")
+        for failure in failures:
+            print(f"  {failure}")
+        raise SystemExit(1)
+    print("[Soak] Passed: no metric trends upward beyond its threshold.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+import threading
+
+import numpy as np
+
+
+# Rows read from the history per update. Longer windows are decimated to this many rows; the
+# segments still hold thousands of points, so periods well below the window length stay resolved.
+MAX_POINTS = 1 << 16
+
+class IncrementalWelch:
+    """
+    Welch power spectral density over a sliding time window, updated incrementally.
+
+    Samples are resampled onto a grid of absolute times (multiples of `dt`) and split into
+    Hann-windowed, linearly detrended segments at fixed grid positions with 50 % overlap.
+    Because a segment's position never moves, its periodogram is computed once and cached:
+    when the window slides only the segments that became complete are transformed (all of
+    them in one vectorized FFT) and the ones that fell out are dropped.
+    """
+
+    def __init__(self, segments=8):
+        self.segments = segments  # Target number of segments in the window
+        self.dt = None
+        self.nperseg = None
+        self.cache = {}  # Segment index -> one-sided periodogram
+
+    def configure(self, dt, window_samples):
+        nperseg = int(2 ** max(4, np.floor(np.log2(max(window_samples * 2 / (self.segments + 1), 16)))))
+        if self.dt is None or abs(dt - self.dt) > 0.01 * self.dt or nperseg != self.nperseg:
+            self.dt, self.nperseg = dt, nperseg
+            self.cache.clear()
+
+    def update(self, t, y, t0, t1):
+        """Spectrum of y(t) over [t0, t1]: returns (freqs [Hz], psd [unit²/Hz], segments used)."""
+        finite = np.isfinite(y)
+        t, y = t[finite], y[finite]
+        if len(t) < 16:
+            return None
+        dt = float(np.median(np.diff(t)))
+        if dt <= 0:
+            return None
+        self.configure(dt, (t1 - t0) / dt)
+        hop = self.nperseg // 2
+        first = int(np.ceil(t0 / self.dt / hop))
+        last = int(np.floor((min(t1, t[-1]) / self.dt - self.nperseg) / hop))
+        if last < first:
+            return None
+        wanted = range(first, last + 1)
+        for k in [k for k in self.cache if k < first or k > last]:
+            del self.cache[k]
+
+        missing = np.array([k for k in wanted if k not in self.cache], dtype=np.int64)
+        if len(missing):
+            grid = (missing[:, None] * hop + np.arange(self.nperseg)[None, :]) * self.dt
+            segments = np.interp(grid, t, y)
+            # Linear detrend per segment (least squares against a centred ramp)
+            ramp = np.arange(self.nperseg) - (self.nperseg - 1) / 2
+            segments -= segments.mean(axis=1, keepdims=True)
+            segments -= np.outer(segments @ ramp / (ramp @ ramp), ramp)
+            window = np.hanning(self.nperseg)
+            spectra = np.abs(np.fft.rfft(segments * window, axis=1)) ** 2 * 2 * self.dt / (window @ window)
+            spectra[:, 0] /= 2
+            if self.nperseg % 2 == 0:
+                spectra[:, -1] /= 2
+            for k, spectrum in zip(missing, spectra):
+                self.cache[int(k)] = spectrum
+
+        psd = np.mean([self.cache[k] for k in wanted], axis=0)
+        freqs = np.fft.rfftfreq(self.nperseg, self.dt)
+        return freqs, psd, len(wanted)
+
+
+def dominant_period(freqs, psd):
+    """Period [s] of the strongest non-DC peak, refined by parabolic interpolation of log power."""
+    if freqs is None or len(psd) < 4:
+        return None
+    i = int(np.argmax(psd[1:])) + 1
+    f = freqs[i]
+    if 1 <= i < len(psd) - 1 and np.all(psd[i - 1:i + 2] > 0):
+        a, b, c = np.log(psd[i - 1:i + 2])
+        denom = a - 2 * b + c
+        if denom < 0:
+            f += 0.5 * (a - c) / denom * (freqs[1] - freqs[0])
+    return 1.0 / f if f > 0 else None
+
+
+class SpectrumWorker:
+    """
+    Computes spectra on a background thread. The GUI submits the newest window with
+    `submit` (replacing any job not started yet) and picks up `result` when it polls.
+    """
+
+    def __init__(self):
+        self.welch = IncrementalWelch()
+        self.job = None
+        self.result = None  # (tag, freqs, psd, segments, period)
+        self.lock = threading.Lock()
+        self.wake = threading.Event()
+        self.stopped = False
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def submit(self, t, y, t0, t1, reset=False, tag=None):
+        with self.lock:
+            self.job = (t, y, t0, t1, reset, tag)
+        self.wake.set()
+
+    def run(self):
+        while not self.stopped:
+            self.wake.wait()
+            self.wake.clear()
+            with self.lock:
+                job, self.job = self.job, None
+            if job is None:
+                continue
+            t, y, t0, t1, reset, tag = job
+            if reset:
+                self.welch.cache.clear()
+            try:
+                spectrum = self.welch.update(t, y, t0, t1)
+            except Exception as e:
+                print(f"[Error] Spectrum computation failed: {e}")
+                spectrum = None
+            if spectrum is None:
+                self.result = None
+            else:
+                freqs, psd, segments = spectrum
+                self.result = (tag, freqs, psd, segments, dominant_period(freqs, psd))
+
+    def stop(self):
+        self.stopped = True
+        self.wake.set()
@@ -1,4 +1,5 @@
 import pyvisa
+import collections
 import tkinter as tk
 import traceback
 from tkinter import messagebox, filedialog,ttk,PhotoImage
@@ -6,9 +7,49 @@ import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from matplotlib.ticker import MaxNLocator, FuncFormatter,FormatStrFormatter
 import matplotlib.colors as mcolors
+import numpy as np
 import time
-import collections
 import csv
+import threading
+
+from Lake_Shore_335_Connection import InstrumentLink
+from Lake_Shore_335_Autotune import StepTestAutotuner, predict_metrics
+from Lake_Shore_335_Simulation import HEATER_RANGE_WATTS
+from Lake_Shore_335_Settling import SettleDetector
+from Lake_Shore_335_Sequence import SequenceRunner, load_steps
+from Lake_Shore_335_Alarms import AlarmEngine, load_rules
+from Lake_Shore_335_Shared_Memory import SharedSeriesWriter, FEED_NAME, LIVE_FIELDS
+from Lake_Shore_335_History import SampleHistory, CompactHistory, HistoryView
+from Lake_Shore_335_Frame_Scheduler import FrameScheduler
+from Lake_Shore_335_Canvas_Plot import StripChart
+from Lake_Shore_335_Web_Dashboard import WebDashboard, DEFAULT_PORT
+from Lake_Shore_335_Rolling_Stats import RollingStats
+from Lake_Shore_335_Spectrum import SpectrumWorker, MAX_POINTS as SPECTRUM_MAX_POINTS
+from Lake_Shore_335_Thermal_Lag import LagWorker, lag_corrected_difference
+from Lake_Shore_335_Service_Request import ServiceRequestMonitor
+from Lake_Shore_335_Navigation import TimeNavigator, PlotNavigation
+from Lake_Shore_335_Prediction import ApproachPredictor
+from Lake_Shore_335_Session import SessionFile
+from Lake_Shore_335_Deadline_Scheduler import DeadlineScheduler
+from Lake_Shore_335_Log_Compression import SwingingDoorCompressor
+from Lake_Shore_335_Run_Compare import ALIGN_MODES, HistoryRun, open_run, find_alignment, overlay_series
+from Lake_Shore_335_Renderer import (ExternalRenderer, split_sign, CHANNEL_CODES, S_TIME_RANGE, S_Y_A, S_Y_DIFF, S_Y_1ST, S_Y_2ND,
+                                     S_CHANNELS, S_DERIV_CHANNELS, S_2ND_DERIV_CHANNELS, S_INTERVAL)
+
+
+def format_eta(eta):
+    """'estimate (low-high)' for an (estimate, low, high) tuple of seconds; high may be None."""
+    def fmt(seconds):
+        if seconds < 120:
+            return f"{seconds:.0f} s"
+        if seconds < 7200:
+            return f"{seconds / 60:.0f} min"
+        return f"{seconds / 3600:.1f} h"
+
+    if eta is None:
+        return "N/A"
+    estimate, low, high = eta
+    return f"{fmt(estimate)} ({fmt(low)}-{fmt(high) if high is not None else '?'})"
 
 
 class Lakeshore335App:
@@ -17,6 +58,9 @@ class Lakeshore335App:
         self.root.title("Lakeshore 335 Temperature Controller")
         self.root.geometry("1500x900-50+50")
         self.rm = pyvisa.ResourceManager()
+        # Periodic jobs run on absolute deadlines, so their period does not stretch with the work they do
+        self.scheduler = DeadlineScheduler(self.root)
+        self.acquisition_job = None
 
         self.instrument = None
         self.is_running = False
@@ -25,6 +69,10 @@ class Lakeshore335App:
         self.csv_logging = False
         self.csv_file = None
         self.csv_writer = None
+        # Optional swinging-door compression of the CSV log: deviations of A, B [K] and heater [%], max gap [s]
+        self.log_compressor = None
+        self.log_deviations = (0.005, 0.005, 1.0)
+        self.log_max_interval = 600.0
 
         self.time_range = 300  # Plot time range in seconds
         self.y_scale_a_lower = 0.0
@@ -43,13 +91,54 @@ class Lakeshore335App:
         self.heater_range = "Low"  # Default range
         self.selected_heater = 2  # Default to Heater 2
         self.pid_params = {"P": 50.0, "I": 10.0, "D": 0.0}  # Default PID values
-        self.update_heating_power()
+        self.autotuner = None  # Active StepTestAutotuner, fed from update_display_and_plot
+        self.autotune_status_var = None
+        self.autotune_result_var = None
+        # Settled detection on sensor A; events are printed, shown and written to the CSV "Event" column
+        self.settle_detector = SettleDetector(setpoint=self.setpoint)
+        self.settle_detector.add_listener(self.on_settle_event)
+        self.pending_events = collections.deque()  # Appended by the GUI, sequencer and service threads
+        self.run_events = []  # (time, text) of this run's events, for aligning it in Compare Runs
+        self.settle_lock = threading.Lock()  # Detector is fed by the GUI tick and reconfigured by the sequencer
+        self.sequence_runner = None
+        self.heater_percent = None  # Last HTR? reading, also fed to the alarm engine
+        self.service_monitor = None  # Status byte / SRQ events from the instrument
+        # First-order approach fit on sensor A for the setpoint and settled ETAs
+        self.eta_predictor = ApproachPredictor(window=600.0)
+        self.eta_setpoint = self.setpoint  # Setpoint the current fit belongs to
+        self.forecast_fraction = 0.25  # Share of the live view kept free for the forecast band
+        self.forecast_band = None
+        self.last_instrument_event = None  # (event, run time, detail), shown by the tick
+        # A -> B thermal lag from the cross-correlation of the visible window, computed off the GUI thread
+        self.lag_worker = LagWorker()
+        self.alarm_engine = AlarmEngine()
+        self.alarm_engine.add_listener(self.on_alarm_transition)
+        self.alarm_batch_interval = 1.0  # Alarm rules are evaluated on batches spanning this many seconds
+        self.last_alarm_evaluation = None
+        self.series_writer = None  # Shared-memory live feed for the renderer and other local processes
+        self.external_renderer = None
+        self.web_dashboard = None  # Browser dashboard process, serves the shared-memory feed
+        self.dashboard_host = "127.0.0.1"  # This PC only, unless "Allow LAN Viewers" is ticked
+        self.dashboard_port = DEFAULT_PORT
+        self.open_live_feed()
+        self.scheduler.add("heater power", self.update_heating_power, 1.0)
         self.gpib_address = 'GPIB::5::INSTR'
 
-        self.temp_a_history = collections.deque(maxlen=45000000)
-        self.temp_b_history = collections.deque(maxlen=45000000)
-        self.abs_diff_history = collections.deque(maxlen=45000000)
-        self.time_history = collections.deque(maxlen=45000000)
+        # Time, A, B, |A-B| and heater output rows; beyond the RAM budget older rows spill to a memory-mapped file
+        self.history_ram_budget_mb = 256.0
+        self.history = SampleHistory(("time", "A", "B", "diff", "heater"), ram_budget_mb=self.history_ram_budget_mb)
+        self.last_sample_time = None  # Time of the newest sample, drawn by the next plot frame
+        # Rolling hold statistics shown beside the temperature readouts, O(1) per sample
+        self.stats_window = 600.0
+        self.rolling_stats = {key: RollingStats(self.stats_window) for key in ("A", "B", "diff")}
+        self.max_plot_fps = 10.0
+        # Pan/zoom over the whole history; long intervals are decimated to at most this many rows
+        self.navigator = TimeNavigator(lead=self.forecast_fraction)
+        self.max_plot_points = 4000
+        # Binary session snapshot, appended to periodically so a restart can pick up the run
+        self.session_file = SessionFile("lakeshore335_session.bin")
+        self.session_autosave_interval = 60.0  # [s]
+        self.resume_session = False  # Keep a restored history on the next connect
 
         self.start_time = time.time()
 
@@ -76,6 +165,11 @@ class Lakeshore335App:
         self.heating_rate_b = 0.0
         #self.canvas.mpl_connect("button_press_event", self.on_plot_click)
 
+        self.scheduler.add("autosave", self.autosave_session, self.session_autosave_interval,
+                           delay=self.session_autosave_interval)
+        if self.session_file.exists():
+            self.root.after_idle(self.offer_session_restore)
+
     def create_widgets(self):
         main_frame = tk.Frame(self.root)
         main_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
@@ -112,6 +206,35 @@ class Lakeshore335App:
         self.heating_rate_display_b = tk.Label(left_frame, text="N/A", font=("Helvetica", 10))
         self.heating_rate_display_b.grid(row=4, column=1, sticky="w", padx=2)
 
+        # Predicted arrival at the setpoint band and settled state (sensor A)
+        tk.Label(left_frame, text="ETA Band / Settled:", font=("Helvetica", 10)).grid(row=3, column=2, sticky="w",
+                                                                                     padx=2)
+        self.eta_display = tk.Label(left_frame, text="N/A", font=("Helvetica", 10))
+        self.eta_display.grid(row=4, column=2, sticky="w", padx=2)
+
+        # Rolling statistics over the stats window
+        stats_frame = tk.LabelFrame(left_frame, text="Stability", font=("Helvetica", 10, "bold"))
+        stats_frame.grid(row=0, column=3, rowspan=5, sticky="nw", padx=(10, 2))
+        for column, heading in enumerate(("", "Mean", "Std", "Min", "Max", "Drift/min")):
+            tk.Label(stats_frame, text=heading, font=("Helvetica", 9, "bold")).grid(row=0, column=column, padx=2)
+        self.stats_labels = {}
+        for row, (key, name) in enumerate((("A", "A"), ("B", "B"), ("diff", "|A-B|")), start=1):
+            tk.Label(stats_frame, text=name, font=("Helvetica", 9)).grid(row=row, column=0, sticky="w", padx=2)
+            self.stats_labels[key] = []
+            for column in range(1, 6):
+                label = tk.Label(stats_frame, text="N/A", font=("Helvetica", 9))
+                label.grid(row=row, column=column, sticky="e", padx=2)
+                self.stats_labels[key].append(label)
+        tk.Label(stats_frame, text="Window [s]:", font=("Helvetica", 9)).grid(row=4, column=0, columnspan=2,
+                                                                              sticky="w", padx=2)
+        self.stats_window_entry = tk.Entry(stats_frame, font=("Helvetica", 9), width=8, justify='center')
+        self.stats_window_entry.insert(0, str(self.stats_window))
+        self.stats_window_entry.grid(row=4, column=2, columnspan=2, sticky="w", padx=2)
+        tk.Button(stats_frame, text="Set", font=("Helvetica", 9), command=self.set_stats_window).grid(
+            row=4, column=4, sticky="w", padx=2)
+        self.stats_span_display = tk.Label(stats_frame, text="", font=("Helvetica", 9))
+        self.stats_span_display.grid(row=4, column=5, sticky="w", padx=2)
+
         # Frequency
         tk.Label(left_frame, text="Reading Freq [s]:", font=("Helvetica", 10)).grid(row=5, column=0, sticky="w", padx=2)
         self.freq_entry = tk.Entry(left_frame, font=("Helvetica", 10), width=8, justify='center')
@@ -275,12 +398,113 @@ class Lakeshore335App:
             float(pid_p_entry.get()), float(pid_i_entry.get()), float(pid_d_entry.get())),
                                 bg="blue", fg="white")
         set_pid_btn.grid(row=23, column=0, sticky="w", pady=2)
+        tk.Button(left_frame, text="Autotune...", font=("Helvetica", 10), command=self.open_autotune_window).grid(
+            row=23, column=1, sticky="w", pady=2)
+        tk.Button(left_frame, text="Spectrum...", font=("Helvetica", 10), command=self.open_spectrum_window).grid(
+            row=23, column=2, sticky="w", pady=2)
+        tk.Button(left_frame, text="Compare Runs...", font=("Helvetica", 10), command=self.open_compare_window).grid(
+            row=24, column=2, sticky="w", pady=2)
         # Start/Stop Heating Buttons
 
         tk.Button(left_frame, text="Start Heating", font=("Helvetica", 10), bg="lightgreen",
                   command=self.start_heating).grid(row=24, column=0, sticky="w", padx=2)
         tk.Button(left_frame, text="Stop Heating", font=("Helvetica", 10), bg="lightcoral",
                   command=self.stop_heating).grid(row=24, column=1, sticky="w", padx=2)
+
+        # ---- Settle Criteria: band [K], |dT/dt| [K/min], dwell [s] ----
+        tk.Label(left_frame, text="Settle ±K, K/min, s:", font=("Helvetica", 10)).grid(row=25, column=0, sticky="w",
+                                                                                       pady=2)
+        self.settle_tolerance_entry = tk.Entry(left_frame, width=8, justify='center')
+        self.settle_tolerance_entry.insert(0, str(self.settle_detector.tolerance))
+        self.settle_tolerance_entry.grid(row=25, column=1, sticky="w", padx=2)
+        self.settle_rate_entry = tk.Entry(left_frame, width=8, justify='center')
+        self.settle_rate_entry.insert(0, str(self.settle_detector.rate_threshold))
+        self.settle_rate_entry.grid(row=25, column=2, sticky="w", padx=2)
+        self.settle_dwell_entry = tk.Entry(left_frame, width=8, justify='center')
+        self.settle_dwell_entry.insert(0, str(self.settle_detector.dwell))
+        self.settle_dwell_entry.grid(row=25, column=3, sticky="w", padx=2)
+        tk.Button(left_frame, text="Set", font=("Helvetica", 10), command=self.set_settle_criteria).grid(
+            row=26, column=0, sticky="w", padx=2)
+        self.settle_display = tk.Label(left_frame, text="Settle: N/A", font=("Helvetica", 10, "bold"))
+        self.settle_display.grid(row=26, column=1, columnspan=3, sticky="w", padx=2)
+
+        # ---- Setpoint Sequence ----
+        tk.Button(left_frame, text="Load Sequence...", font=("Helvetica", 10), command=self.load_sequence).grid(
+            row=27, column=0, sticky="w", pady=2)
+        self.sequence_button = tk.Button(left_frame, text="Stop Sequence", font=("Helvetica", 10),
+                                         command=self.stop_sequence, state=tk.DISABLED)
+        self.sequence_button.grid(row=27, column=1, sticky="w", pady=2)
+        self.sequence_display = tk.Label(left_frame, text="Sequence: Idle", font=("Helvetica", 10))
+        self.sequence_display.grid(row=28, column=0, columnspan=4, sticky="w", padx=2)
+
+        # ---- Alarms ----
+        tk.Button(left_frame, text="Load Alarms...", font=("Helvetica", 10), command=self.load_alarm_rules).grid(
+            row=29, column=0, sticky="w", pady=2)
+
+        # ---- Out-of-process plotting ----
+        self.external_render_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(left_frame, text="External Plot Window", font=("Helvetica", 10),
+                       variable=self.external_render_var, command=self.toggle_external_renderer).grid(
+            row=29, column=1, columnspan=2, sticky="w", pady=2)
+
+        # ---- Plot frame rate (independent of the reading frequency) ----
+        tk.Label(left_frame, text="Max Plot FPS:", font=("Helvetica", 10)).grid(row=30, column=0, sticky="w", padx=2)
+        self.plot_fps_entry = tk.Entry(left_frame, font=("Helvetica", 10), width=8, justify='center')
+        self.plot_fps_entry.insert(0, str(self.max_plot_fps))
+        self.plot_fps_entry.grid(row=30, column=1, sticky="w", padx=2)
+        tk.Button(left_frame, text="Set", font=("Helvetica", 10), command=self.set_max_plot_fps).grid(
+            row=30, column=2, sticky="w", padx=2)
+        self.frame_rate_display = tk.Label(left_frame, text="Plots: N/A", font=("Helvetica", 10))
+        self.frame_rate_display.grid(row=31, column=0, columnspan=4, sticky="w", padx=2)
+        self.timing_display = tk.Label(left_frame, text="Timing: N/A", font=("Helvetica", 10))
+        self.timing_display.grid(row=36, column=0, columnspan=4, sticky="w", padx=2)
+        self.compact_history_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(left_frame, text="Compact History (in RAM, 0.1 mK resolution)", font=("Helvetica", 10),
+                       variable=self.compact_history_var, command=self.toggle_compact_history).grid(
+            row=37, column=0, columnspan=3, sticky="w", pady=2)
+
+        tk.Label(left_frame, text="A→B Lag:", font=("Helvetica", 10)).grid(row=40, column=0, sticky="w", padx=2)
+        self.lag_display = tk.Label(left_frame, text="N/A", font=("Helvetica", 10))
+        self.lag_display.grid(row=40, column=1, columnspan=3, sticky="w", padx=2)
+
+        # ---- CSV log compression ----
+        self.compress_log_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(left_frame, text="Compress CSV Log (swinging door)", font=("Helvetica", 10),
+                       variable=self.compress_log_var).grid(row=38, column=0, columnspan=3, sticky="w", pady=2)
+        tk.Label(left_frame, text="±A,B [K] / ±Htr [%] / Max [s]:", font=("Helvetica", 10)).grid(
+            row=39, column=0, sticky="w", padx=2)
+        self.log_deadband_entry = tk.Entry(left_frame, font=("Helvetica", 10), width=6, justify='center')
+        self.log_deadband_entry.insert(0, str(self.log_deviations[0]))
+        self.log_deadband_entry.grid(row=39, column=1, sticky="w", padx=2)
+        self.log_heater_deadband_entry = tk.Entry(left_frame, font=("Helvetica", 10), width=6, justify='center')
+        self.log_heater_deadband_entry.insert(0, str(self.log_deviations[2]))
+        self.log_heater_deadband_entry.grid(row=39, column=2, sticky="w", padx=2)
+        self.log_max_interval_entry = tk.Entry(left_frame, font=("Helvetica", 10), width=6, justify='center')
+        self.log_max_interval_entry.insert(0, str(self.log_max_interval))
+        self.log_max_interval_entry.grid(row=39, column=3, sticky="w", padx=2)
+        self.follow_live_var = tk.BooleanVar(value=True)
+        tk.Checkbutton(left_frame, text="Follow Live (wheel zooms, drag pans)", font=("Helvetica", 10),
+                       variable=self.follow_live_var, command=self.toggle_follow_live).grid(
+            row=34, column=0, columnspan=3, sticky="w", pady=2)
+        self.lightweight_plot_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(left_frame, text="Lightweight Plots (Tk canvas)", font=("Helvetica", 10),
+                       variable=self.lightweight_plot_var, command=self.toggle_lightweight_plots).grid(
+            row=32, column=0, columnspan=3, sticky="w", pady=2)
+        self.web_dashboard_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(left_frame, text=f"Web Dashboard (port {self.dashboard_port})", font=("Helvetica", 10),
+                       variable=self.web_dashboard_var, command=self.toggle_web_dashboard).grid(
+            row=33, column=0, columnspan=3, sticky="w", pady=2)
+        # The dashboard has no authentication, so exposing it to the network is an explicit choice
+        self.dashboard_lan_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(left_frame, text="Allow LAN Viewers", font=("Helvetica", 10),
+                       variable=self.dashboard_lan_var, command=self.set_dashboard_host).grid(
+            row=33, column=3, sticky="w", pady=2)
+
+        # ---- Session snapshot ----
+        tk.Button(left_frame, text="Save Session...", font=("Helvetica", 10), command=self.save_session_as).grid(
+            row=35, column=0, sticky="w", pady=2)
+        tk.Button(left_frame, text="Restore Session...", font=("Helvetica", 10), command=self.restore_session_from).grid(
+            row=35, column=1, columnspan=2, sticky="w", pady=2)
         # Heating Power
         self.power_label_var = tk.StringVar()
         self.power_label_var.set("Output 2 Power: N/A")
@@ -291,6 +515,14 @@ class Lakeshore335App:
         # Status label
         self.status_label = tk.Label(self.root, text="Status: Disconnected", fg="red", font=("Helvetica", 14))
         self.status_label.pack(side="top", anchor="w", pady=2)
+
+        # Alarm label
+        self.alarm_label = tk.Label(self.root, text="Alarms: none", fg="green", font=("Helvetica", 14))
+        self.alarm_label.pack(side="top", anchor="w", pady=2)
+
+        # Instrument events (service requests)
+        self.instrument_event_label = tk.Label(self.root, text="Instrument events: off", font=("Helvetica", 12))
+        self.instrument_event_label.pack(side="top", anchor="w", pady=2)
     def set_setpoint(self, value):
         if self.instrument is None and self.connect_to_instrument() is None:
             return
@@ -298,6 +530,9 @@ class Lakeshore335App:
         try:
             self.setpoint = float(value)
             self.instrument.write(f"SETP {self.selected_heater},{self.setpoint}")
+            with self.settle_lock:
+                self.settle_detector.set_setpoint(self.setpoint)
+            self.pending_events.append(f"setpoint {self.setpoint} K")
             print(f"[Info] Setpoint set to {self.setpoint} K")
         except ValueError:
             messagebox.showerror("Input Error", "Invalid setpoint value.")
@@ -328,32 +563,27 @@ class Lakeshore335App:
         if self.instrument is None:
             return
         try:
-            self.instrument.write(f"OUTMODE {self.selected_heater},1,A")  # Closed-loop using sensor A
-            self.instrument.write(f"SETP {self.selected_heater},{self.setpoint}")
-            self.instrument.write(f"RAMP {self.selected_heater},1,{self.ramp_rate}")
-            self.instrument.write(f"RANGE {self.selected_heater},{self.get_range_code()}")  # Set the selected range
-            self.instrument.write(
-                f"PID {self.selected_heater},{self.pid_params['P']},{self.pid_params['I']},{self.pid_params['D']}")
+            self.write_heater_settings()
             print(f"[Info] Heating started for Heater {self.selected_heater}.")
         except Exception as e:
             print(f"[Error] Start failed: {e}")
             traceback.print_exc()
             messagebox.showerror("Start Error", str(e))
 
+    def write_heater_settings(self):
+        # Raises on failure so both the GUI and the sequencer thread can decide how to report it
+        self.instrument.write(f"OUTMODE {self.selected_heater},1,A")  # Closed-loop using sensor A
+        self.instrument.write(f"SETP {self.selected_heater},{self.setpoint}")
+        self.instrument.write(f"RAMP {self.selected_heater},1,{self.ramp_rate}")
+        self.instrument.write(f"RANGE {self.selected_heater},{self.get_range_code()}")  # Set the selected range
+        self.instrument.write(
+            f"PID {self.selected_heater},{self.pid_params['P']},{self.pid_params['I']},{self.pid_params['D']}")
+
     def get_range_watts(self, heater_number):
         try:
             range_code = int(self.instrument.query(f"RANGE? {heater_number}").strip())
 
-            if heater_number == 1:
-                # Heater 1: 50 W max
-                range_map = {0: 0.0, 1: 5.0, 2: 25.0, 3: 50.0}
-            elif heater_number == 2:
-                # Heater 2: 25 W max
-                range_map = {0: 0.0, 1: 2.5, 2: 10.0, 3: 25.0}
-            else:
-                range_map = {}
-
-            return range_map.get(range_code, 0.0)
+            return HEATER_RANGE_WATTS.get(heater_number, {}).get(range_code, 0.0)
 
         except Exception as e:
             print(f"Error reading heater range: {e}")
@@ -365,6 +595,7 @@ class Lakeshore335App:
                 heater_number = self.selected_heater
                 percent_str = self.instrument.query(f"HTR? {heater_number}")
                 percent_val = float(percent_str.strip())
+                self.heater_percent = percent_val
 
                 max_power = self.get_range_watts(heater_number)
                 power_watts = percent_val / 100.0 * max_power
@@ -376,8 +607,6 @@ class Lakeshore335App:
                 self.power_label_var.set(f"Output {heater_number} Power: Error")
                 print("Power read error:", e)
 
-        self.root.after(1000, self.update_heating_power)
-
 
     def update_power(self):
         power = self.get_heater_power()
@@ -406,15 +635,8 @@ class Lakeshore335App:
             # Convert the raw level from the range 0-100% to a fraction (0.0 to 1.0)
             fraction = raw_level / 100.0
 
-            # Set the maximum power based on the selected range
-            if self.heater_range == "Low":
-                max_power = 0.25  # Low range: 0.25 W
-            elif self.heater_range == "Med":
-                max_power = 2.5  # Medium range: 2.5 W
-            elif self.heater_range == "High":
-                max_power = 25  # High range: 25 W
-            else:
-                max_power = 0.25  # Default to Low if range is unrecognized
+            # Maximum power of the selected output and range
+            max_power = HEATER_RANGE_WATTS[self.selected_heater][self.get_range_code()]
 
             # Calculate actual power in watts
             watts = fraction * max_power
@@ -427,14 +649,17 @@ class Lakeshore335App:
             return "Error"
 
     def get_range_code(self):
-        if self.heater_range == "Low":
+        if self.heater_range == "Off":
+            return 0
+        elif self.heater_range == "Low":
             return 1
         elif self.heater_range == "Med":
             return 2
         elif self.heater_range == "High":
             return 3
         else:
-            return 1  # Default to Low if range is not recognized
+            # Never guess a range: a wrong one could switch the heater on
+            raise ValueError(f"Unknown heater range: {self.heater_range}")
 
     def close(self):
         if self.instrument:
@@ -456,6 +681,427 @@ class Lakeshore335App:
             traceback.print_exc()
             messagebox.showerror("PID Error", str(e))
 
+    def set_settle_criteria(self):
+        try:
+            tolerance = float(self.settle_tolerance_entry.get())
+            rate = float(self.settle_rate_entry.get())
+            dwell = float(self.settle_dwell_entry.get())
+            if tolerance > 0 and rate > 0 and dwell >= 0:
+                with self.settle_lock:
+                    self.settle_detector.set_criteria(tolerance, rate, dwell)
+                print(f"Settle criteria set to ±{tolerance} K, {rate} K/min, {dwell} s")
+            else:
+                raise ValueError
+        except ValueError:
+            messagebox.showerror("Invalid Input", "Please enter positive numbers for the settle criteria.")
+
+    def on_settle_event(self, event, event_time, detector):
+        # May run on the sequencer thread, so no Tk calls here
+        print(f"[Info] {event.capitalize()} at t = {event_time:.1f} s (setpoint {detector.setpoint} K)")
+        self.pending_events.append(event)
+        if self.sequence_runner is not None:
+            self.sequence_runner.notify(event, event_time, detector)
+
+    def load_sequence(self):
+        if self.sequence_runner is not None and self.sequence_runner.is_running():
+            messagebox.showerror("Sequence", "A sequence is already running.")
+            return
+        if not self.is_running:
+            messagebox.showerror("Sequence", "Start reading first, steps advance on the live settle detector.")
+            return
+        file_path = filedialog.askopenfilename(filetypes=[("Sequences", "*.json *.csv")])
+        if not file_path:
+            return
+        try:
+            steps = load_steps(file_path)
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Sequence Error", f"Could not load sequence:\n{e}")
+            return
+
+        start_index = 0
+        saved = SequenceRunner.saved_index(file_path)
+        if saved is not None and 0 < saved < len(steps):
+            if messagebox.askyesno("Resume Sequence", f"Resume this sequence at step {saved + 1} of {len(steps)}?"):
+                start_index = saved
+
+        self.sequence_runner = SequenceRunner(file_path, steps, self.apply_sequence_step, self.log_sequence_event,
+                                              start_index)
+        self.sequence_runner.start()
+        self.sequence_button.config(state=tk.NORMAL)
+        print(f"[Info] Sequence {file_path} started at step {start_index + 1} of {len(steps)}.")
+
+    def stop_sequence(self):
+        if self.sequence_runner is not None:
+            self.sequence_runner.stop()
+
+    def apply_sequence_step(self, step):
+        # Runs on the sequencer thread; InstrumentLink serialises bus access with the GUI tick
+        self.setpoint = step["setpoint"]
+        self.ramp_rate = step.get("ramp", self.ramp_rate)
+        self.heater_range = step.get("range", self.heater_range)
+        self.pid_params = {key: step.get(key, self.pid_params[key]) for key in ("P", "I", "D")}
+        self.write_heater_settings()
+        with self.settle_lock:
+            detector = self.settle_detector
+            detector.set_criteria(step.get("tolerance", detector.tolerance), step.get("rate", detector.rate_threshold),
+                                  step.get("settle_time", detector.dwell))
+            detector.set_setpoint(self.setpoint)
+
+    def load_alarm_rules(self):
+        file_path = filedialog.askopenfilename(filetypes=[("Alarm Rules", "*.json")])
+        if not file_path:
+            return
+        try:
+            self.alarm_engine.set_rules(load_rules(file_path))
+            print(f"[Info] Loaded {len(self.alarm_engine.rules)} alarm rules from {file_path}")
+        except (OSError, ValueError, KeyError) as e:
+            messagebox.showerror("Alarm Error", f"Could not load alarm rules:\n{e}")
+
+    def reset_alarms(self):
+        # The run time base starts again, so hold-off timers and the batch clock must too
+        self.alarm_engine.reset()
+        self.last_alarm_evaluation = None
+        self.alarm_label.config(text="Alarms: none", fg="green")
+
+    def on_alarm_transition(self, name, state, event_time, value):
+        print(f"[{'Warning' if state == 'raised' else 'Info'}] Alarm {state}: {name} "
+              f"(value {value:.3f} at t = {event_time:.1f} s)")
+        self.pending_events.append(f"alarm {state}: {name}")
+
+    def on_instrument_event(self, event, event_time, detail):
+        # Called from the service request thread, so no Tk calls here
+        run_time = event_time - self.start_time
+        text = f"{event} ({detail})" if detail else event
+        print(f"[{'Warning' if 'fault' in event or 'error' in event else 'Info'}] Instrument event: {text} "
+              f"at t = {run_time:.1f} s")
+        self.last_instrument_event = (event, run_time, detail)
+        self.pending_events.append(f"instrument: {text}")
+        if self.sequence_runner is not None:
+            self.sequence_runner.notify(event, run_time, detail)
+
+    def start_service_monitor(self):
+        self.service_monitor = ServiceRequestMonitor(self.instrument)
+        self.service_monitor.add_listener(self.on_instrument_event)
+        self.service_monitor.start()
+
+    def stop_service_monitor(self):
+        if self.service_monitor is not None:
+            self.service_monitor.stop()
+            self.service_monitor = None
+            self.instrument_event_label.config(text="Instrument events: off")
+
+    def log_sequence_event(self, text):
+        print(f"[Info] Sequence: {text}")
+        self.pending_events.append(text)
+
+    def open_spectrum_window(self):
+        popup = tk.Toplevel(self.root)
+        popup.title("Oscillation Spectrum")
+        fig, ax = plt.subplots(figsize=(6, 4.5), dpi=100)
+        ax.set_xlabel("Frequency [Hz]")
+        ax.set_ylabel("PSD [unit²/Hz]")
+        ax.grid(True, which='both', color='white', linestyle='--', linewidth=0.5)
+        ax.set_facecolor(mcolors.to_rgba('black', alpha=0.3))
+        psd_line, = ax.loglog([1e-3, 1e-2], [1.0, 1.0], color='tab:red', visible=False)
+        peak_line = ax.axvline(1e-3, color='black', linestyle='--', visible=False)
+
+        controls = tk.Frame(popup)
+        controls.pack(fill=tk.X, padx=10, pady=5)
+        tk.Label(controls, text="Signal:").pack(side=tk.LEFT, padx=(0, 5))
+        columns = {"Channel A": "A", "Channel B": "B", "Heater Output": "heater"}
+        source = tk.StringVar(value="Channel A")
+        ttk.Combobox(controls, values=list(columns), textvariable=source, state="readonly", width=14).pack(
+            side=tk.LEFT)
+        info_var = tk.StringVar(value="Collecting samples...")
+        tk.Label(controls, textvariable=info_var, font=("Helvetica", 10, "bold")).pack(side=tk.LEFT, padx=10)
+
+        canvas = FigureCanvasTkAgg(fig, master=popup)
+        canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+
+        # Spectra are computed on a worker thread; this loop only hands over the visible window
+        worker = SpectrumWorker()
+        state = {"source": None}
+
+        def poll():
+            if not popup.winfo_exists():
+                job.cancel()
+                return
+            name = source.get()
+            t0, t1 = self.ax1.get_xlim()
+            # Decimated read: a window of days must not copy millions of rows on the Tk thread
+            window = np.array(self.history.window(t0, t1, max_points=SPECTRUM_MAX_POINTS))
+            if len(window):
+                column = self.history.index[columns[name]]
+                worker.submit(window[:, 0], window[:, column], t0, t1, reset=name != state["source"], tag=name)
+                state["source"] = name
+
+            result = worker.result
+            if result is not None and result[0] == name:
+                _, freqs, psd, segments, period = result
+                psd_line.set_data(freqs[1:], psd[1:])
+                psd_line.set_visible(True)
+                ax.set_title(f"{name}: Welch PSD, {segments} segments")
+                ax.relim()
+                ax.autoscale_view()
+                if period is not None:
+                    peak_line.set_xdata([1.0 / period, 1.0 / period])
+                    peak_line.set_visible(True)
+                    info_var.set(f"Dominant period: {period:.1f} s ({1.0 / period:.4g} Hz)")
+                canvas.draw_idle()
+
+        def close():
+            job.cancel()
+            worker.stop()
+            plt.close(fig)
+            popup.destroy()
+
+        popup.protocol("WM_DELETE_WINDOW", close)
+        job = self.scheduler.add("spectrum", poll, max(self.reading_interval, 1.0))
+
+    def open_compare_window(self):
+        popup = tk.Toplevel(self.root)
+        popup.title("Compare Runs")
+        runs = []
+
+        controls = tk.Frame(popup)
+        controls.pack(fill=tk.X, padx=10, pady=5)
+        run_list = tk.Listbox(controls, height=5, width=40, selectmode=tk.EXTENDED)
+        run_list.grid(row=0, column=0, rowspan=4, sticky="nsew", padx=(0, 10))
+
+        tk.Label(controls, text="Align on:").grid(row=0, column=3, sticky="w")
+        mode_var = tk.StringVar(value=ALIGN_MODES[0])
+        ttk.Combobox(controls, values=ALIGN_MODES, textvariable=mode_var, state="readonly", width=16).grid(
+            row=0, column=4, sticky="w")
+        tk.Label(controls, text="Occurrence:").grid(row=1, column=3, sticky="w")
+        occurrence_entry = tk.Entry(controls, width=8, justify='center')
+        occurrence_entry.insert(0, "1")
+        occurrence_entry.grid(row=1, column=4, sticky="w")
+        tk.Label(controls, text="Window [s]:").grid(row=2, column=3, sticky="w")
+        window_frame = tk.Frame(controls)
+        window_frame.grid(row=2, column=4, sticky="w")
+        before_entry = tk.Entry(window_frame, width=8, justify='center')
+        before_entry.insert(0, "-3600")
+        before_entry.pack(side=tk.LEFT)
+        after_entry = tk.Entry(window_frame, width=8, justify='center')
+        after_entry.insert(0, "14400")
+        after_entry.pack(side=tk.LEFT, padx=(5, 0))
+        info_var = tk.StringVar(value="Add saved runs (CSV logs or session snapshots) to compare.")
+        tk.Label(controls, textvariable=info_var, font=("Helvetica", 10, "bold")).grid(
+            row=4, column=0, columnspan=5, sticky="w", pady=(5, 0))
+
+        fig, (ax_t, ax_rate) = plt.subplots(2, 1, figsize=(8, 6), dpi=100, sharex=True)
+
+        def style_axes(mode):
+            for ax, label in ((ax_t, "Temperature A [K]"), (ax_rate, "Rate A [K/min]")):
+                ax.set_ylabel(label)
+                ax.grid(True, color='white', linestyle='--', linewidth=0.5)
+                ax.set_facecolor(mcolors.to_rgba('black', alpha=0.3))
+            ax_rate.set_xlabel(f"Time since {mode.lower()} [s]")
+
+        style_axes(mode_var.get())
+        canvas = FigureCanvasTkAgg(fig, master=popup)
+        canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+
+        def redraw():
+            try:
+                occurrence = int(occurrence_entry.get())
+                x_lower, x_upper = float(before_entry.get()), float(after_entry.get())
+                if occurrence < 1 or x_upper <= x_lower:
+                    raise ValueError
+            except ValueError:
+                messagebox.showerror("Invalid Input", "Occurrence must be a positive integer and the window "
+                                                      "start must be before its end.", parent=popup)
+                return
+            started = time.perf_counter()
+            mode = mode_var.get()
+            ax_t.cla()
+            ax_rate.cla()
+            missing = []
+            for k, run in enumerate(runs):
+                if isinstance(run, HistoryRun):
+                    # Reset Time or a history mode switch replaces these
+                    run.history, run.events = self.history, self.run_events
+                # Each run is read with its own stride, so its cost does not grow with its length
+                t_align = find_alignment(run, mode, occurrence)
+                series = overlay_series(run, t_align, x_lower, x_upper) if t_align is not None else None
+                if series is None:
+                    missing.append(run.name)
+                    continue
+                t, temp, rate = series
+                color = plt.cm.tab10(k % 10)
+                ax_t.plot(t, temp, color=color, linewidth=1, label=run.name)
+                ax_rate.plot(t, rate, color=color, linewidth=1)
+            style_axes(mode)
+            for ax in (ax_t, ax_rate):
+                ax.axvline(0.0, color='black', linestyle='--', linewidth=0.8)
+            ax_t.set_xlim(x_lower, x_upper)
+            if len(runs) > len(missing):
+                ax_t.legend(loc="best", fontsize=8)
+            canvas.draw()
+            elapsed = time.perf_counter() - started
+            info = f"{len(runs) - len(missing)} of {len(runs)} runs aligned, drawn in {1000 * elapsed:.0f} ms"
+            info_var.set(info + (f"; no {mode.lower()} in: {', '.join(missing)}" if missing else ""))
+
+        def add_runs():
+            paths = filedialog.askopenfilenames(parent=popup, filetypes=[("Run Logs", "*.csv *.bin"),
+                                                                         ("CSV Files", "*.csv"),
+                                                                         ("Session Snapshots", "*.bin")])
+            for path in paths:
+                try:
+                    # A CSV is converted once to a raw cache next to it; later opens only map it
+                    run = open_run(path)
+                except Exception as e:
+                    print(f"[Error] Could not open run {path}: {e}")
+                    messagebox.showerror("Compare Error", f"{path}:\n{e}", parent=popup)
+                    continue
+                runs.append(run)
+                run_list.insert(tk.END, run.name)
+            redraw()
+
+        def add_current():
+            if not len(self.history):
+                messagebox.showinfo("Compare Runs", "No samples recorded in this session yet.", parent=popup)
+                return
+            runs.append(HistoryRun("Current run", self.history, self.run_events))
+            run_list.insert(tk.END, "Current run")
+            redraw()
+
+        def remove_selected():
+            for index in reversed(run_list.curselection()):
+                run_list.delete(index)
+                del runs[index]
+            redraw()
+
+        tk.Button(controls, text="Add Runs...", command=add_runs).grid(row=0, column=1, sticky="we", padx=2)
+        tk.Button(controls, text="Add Current Run", command=add_current).grid(row=1, column=1, sticky="we", padx=2)
+        tk.Button(controls, text="Remove", command=remove_selected).grid(row=2, column=1, sticky="we", padx=2)
+        tk.Button(controls, text="Redraw", command=redraw).grid(row=3, column=1, sticky="we", padx=2)
+
+        def close():
+            runs.clear()  # Drops the memory maps
+            plt.close(fig)
+            popup.destroy()
+
+        popup.protocol("WM_DELETE_WINDOW", close)
+
+    def open_autotune_window(self):
+        popup = tk.Toplevel(self.root)
+        popup.title(f"PID Autotune - Heater {self.selected_heater}")
+
+        tk.Label(popup, text="Base Output [%]:").grid(row=0, column=0, sticky="w", padx=5, pady=2)
+        base_entry = tk.Entry(popup, width=8, justify='center')
+        base_entry.insert(0, "10.0")
+        base_entry.grid(row=0, column=1, sticky="w", padx=5)
+
+        tk.Label(popup, text="Step [%]:").grid(row=1, column=0, sticky="w", padx=5, pady=2)
+        step_entry = tk.Entry(popup, width=8, justify='center')
+        step_entry.insert(0, "10.0")
+        step_entry.grid(row=1, column=1, sticky="w", padx=5)
+
+        tk.Label(popup, text="Max Phase Time [s]:").grid(row=2, column=0, sticky="w", padx=5, pady=2)
+        duration_entry = tk.Entry(popup, width=8, justify='center')
+        duration_entry.insert(0, "3600")
+        duration_entry.grid(row=2, column=1, sticky="w", padx=5)
+
+        self.autotune_status_var = tk.StringVar(value="Idle")
+        self.autotune_result_var = tk.StringVar(value="")
+        tk.Label(popup, textvariable=self.autotune_status_var, fg="blue").grid(row=3, column=0, columnspan=3,
+                                                                               sticky="w", padx=5, pady=2)
+        tk.Label(popup, textvariable=self.autotune_result_var, justify=tk.LEFT, font=("Courier", 10)).grid(
+            row=4, column=0, columnspan=3, sticky="w", padx=5, pady=2)
+
+        def start():
+            try:
+                base = float(base_entry.get())
+                step = float(step_entry.get())
+                duration = float(duration_entry.get())
+                if not (0.0 <= base <= 100.0 and 0.0 < base + step <= 100.0 and duration > 0):
+                    raise ValueError
+            except ValueError:
+                messagebox.showerror("Invalid Input", "Outputs must stay within 0-100 %.", parent=popup)
+                return
+            if not self.is_running:
+                messagebox.showerror("Autotune", "Start reading first, the test uses the live temperature stream.",
+                                     parent=popup)
+                return
+            self.start_autotune(StepTestAutotuner(base_output=base, step_output=step, max_duration=duration))
+
+        def apply():
+            if self.autotuner is not None and self.autotuner.result:
+                result = self.autotuner.result
+                self.set_pid(result["P"], result["I"], result["D"])
+
+        buttons = tk.Frame(popup)
+        buttons.grid(row=5, column=0, columnspan=3, pady=5)
+        tk.Button(buttons, text="Start Test", bg="lightgreen", command=start).pack(side=tk.LEFT, padx=3)
+        tk.Button(buttons, text="Abort", bg="lightcoral", command=self.abort_autotune).pack(side=tk.LEFT, padx=3)
+        tk.Button(buttons, text="Apply via Set PID", bg="blue", fg="white", command=apply).pack(side=tk.LEFT, padx=3)
+
+    def start_autotune(self, tuner):
+        try:
+            # Open loop on the selected heater, output driven by the tuner through MOUT
+            self.instrument.write(f"OUTMODE {self.selected_heater},3,A")
+            self.instrument.write(f"RANGE {self.selected_heater},{self.get_range_code()}")
+            self.instrument.write(f"MOUT {self.selected_heater},{tuner.output()}")
+        except Exception as e:
+            print(f"[Error] Autotune start failed: {e}")
+            messagebox.showerror("Autotune Error", str(e))
+            return
+        self.autotuner = tuner
+        self.autotune_status_var.set(f"Baseline at {tuner.output():.1f} %, waiting for steady state...")
+        self.autotune_result_var.set("")
+        print(f"[Info] Autotune started on Heater {self.selected_heater}.")
+
+    def abort_autotune(self):
+        if self.autotuner is None:
+            return
+        self.autotuner = None
+        self.stop_heating()
+        if self.autotune_status_var is not None:
+            self.autotune_status_var.set("Aborted, heater off")
+        print("[Info] Autotune aborted.")
+
+    def feed_autotuner(self, current_time, temp_a):
+        tuner = self.autotuner
+        if tuner is None or tuner.state in ("done", "failed") or not tuner.feed(current_time, temp_a):
+            return
+        status = self.autotune_status_var
+        if tuner.state == "step":
+            try:
+                self.instrument.write(f"MOUT {self.selected_heater},{tuner.output()}")
+            except Exception as e:
+                print(f"[Error] Autotune step failed: {e}")
+            if status is not None:
+                status.set(f"Step to {tuner.output():.1f} %, waiting for steady state...")
+            return
+
+        # Test finished: hold the base output until the user applies the result
+        try:
+            self.instrument.write(f"MOUT {self.selected_heater},{tuner.base_output}")
+        except Exception as e:
+            print(f"[Error] Autotune restore failed: {e}")
+        if tuner.state == "failed":
+            print(f"[Warning] Autotune failed: {tuner.error}")
+            if status is not None:
+                status.set(f"Failed: {tuner.error}")
+            return
+
+        r = tuner.result
+        predicted = predict_metrics(r["gain"], r["tau"], r["dead_time"], r["P"], r["I"], r["D"],
+                                    base_output=tuner.base_output)
+
+        def fmt(value, unit):
+            return "n/a" if value is None else f"{value:.1f} {unit}"
+
+        text = (f"Model: K = {r['gain']:.3f} K/%, tau = {r['tau']:.1f} s, L = {r['dead_time']:.1f} s\n"
+                f"Proposed: P = {r['P']}, I = {r['I']}, D = {r['D']}\n"
+                f"Predicted for a 1 K step: rise {fmt(predicted['rise_time'], 's')}, "
+                f"overshoot {fmt(predicted['overshoot'], 'K')}, settling {fmt(predicted['settling_time'], 's')}")
+        print(f"[Info] Autotune result:\n{text}")
+        if status is not None:
+            status.set("Done, heater held at base output until Start Heating")
+            self.autotune_result_var.set(text)
+
     def setup_plot(self):
         # Create subplots: 4 axes in total (2 vertical, 2 horizontal)
         self.fig, axes = plt.subplots(2, 2, figsize=(8, 6), dpi=100)
@@ -491,9 +1137,12 @@ class Lakeshore335App:
         # ax1: channel A and B
         self.line_a, = self.ax1.plot([], [], color='tab:red',linestyle="-",alpha=0.9, label="Channel A")
         self.line_b, = self.ax1.plot([], [], color='tab:blue',linestyle='--',alpha=0.9, label="Channel B")
+        # Forecast of channel A from the ETA model, with its confidence band
+        self.line_forecast, = self.ax1.plot([], [], color='tab:green', linestyle=':', label="Forecast A")
 
-        # ax2: absolute difference over time
+        # ax2: absolute difference over time, and without the part caused by the A -> B lag
         self.line_diff, = self.ax2.plot([], [], color='black', label="|A - B|")
+        self.line_diff_lag, = self.ax2.plot([], [], color='gray', linestyle='--', label="|A(t - lag) - B|")
 
         # ax3: derivative of Temp A and B
 
@@ -521,10 +1170,21 @@ class Lakeshore335App:
 
         # Create the canvas for the Tkinter GUI
         self.canvas = FigureCanvasTkAgg(self.fig, master=self.right_frame)
-        self.canvas.mpl_connect("button_press_event", self.on_plot_click)
+        # Wheel zooms, drag pans, a plain click opens the popup
+        self.plot_navigation = PlotNavigation(self.canvas, self.navigator, self.view_time, self.frame_scheduler_dirty,
+                                              self.on_plot_click)
+        self.navigator.add_listener(lambda follow: self.follow_live_var.set(follow))
         self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
         self.fig.subplots_adjust(left=0.15, right=0.85, top=0.95, bottom=0.05)
 
+        # Plots are redrawn on their own timer; samples only mark them dirty
+        self.frame_scheduler = FrameScheduler(self.root, self.draw_frame, widget=self.canvas.get_tk_widget(),
+                                              target_fps=self.max_plot_fps)
+        self.frame_scheduler.start()
+
+        # Lightweight live view drawn on a plain Tk canvas; packed instead of the figure when selected
+        self.strip_chart = StripChart(self.right_frame, on_click=self.on_strip_chart_click)
+
     def update_display_and_plot(self):
         temp_a, temp_b = self.get_temperature()
         current_time = round(time.time() - self.start_time, 4)
@@ -565,108 +1225,58 @@ class Lakeshore335App:
             # Immediately refresh GUI labels so new values are shown before the next update
             self.root.update_idletasks()
             # Store data for plotting
-            self.temp_a_history.append(temp_a)
-            self.temp_b_history.append(temp_b)
-            self.abs_diff_history.append(abs_diff)
-            self.time_history.append(current_time)
-
-            # Calculate derivative of temperatures (dT/dt) over time
-            if len(self.time_history) >= 2:
-                deriv_a = [0.0] + [
-                    (self.temp_a_history[i] - self.temp_a_history[i - 1]) /
-                    (self.time_history[i] - self.time_history[i - 1])
-                    for i in range(1, len(self.time_history))
-                ]
-                deriv_b = [0.0] + [
-                    (self.temp_b_history[i] - self.temp_b_history[i - 1]) /
-                    (self.time_history[i] - self.time_history[i - 1])
-                    for i in range(1, len(self.time_history))
-                ]
-
-                # Set data to ax4 lines
-
-                # Split into positive and negative parts
-                deriv_a_pos = [val if val >= 0 else None for val in deriv_a]
-                deriv_a_neg = [val if val < 0 else None for val in deriv_a]
-                deriv_b_pos = [val if val >= 0 else None for val in deriv_b]
-                deriv_b_neg = [val if val < 0 else None for val in deriv_b]
-
-                # Assign to lines
-                self.line_deriv_a_pos.set_data(self.time_history, deriv_a_pos)
-                self.line_deriv_a_neg.set_data(self.time_history, deriv_a_neg)
-                self.line_deriv_b_pos.set_data(self.time_history, deriv_b_pos)
-                self.line_deriv_b_neg.set_data(self.time_history, deriv_b_neg)
-
-                # Adjust ax4 limits
-                self.ax3.set_xlim(self.ax1.get_xlim())  # Match time axis
-                self.ax3.relim()
-                self.ax3.autoscale_view()
-
-            # Compute second derivative (d²T/dt²)
-            if len(self.time_history) >= 3:
-                second_deriv_a = [0.0, 0.0] + [
-                    (
-                            (self.temp_a_history[i] - 2 * self.temp_a_history[i - 1] + self.temp_a_history[i - 2]) /
-                            ((self.time_history[i] - self.time_history[i - 1]) ** 2)
-                    )
-                    for i in range(2, len(self.time_history))
-                ]
-
-                second_deriv_b = [0.0, 0.0] + [
-                    (
-                            (self.temp_b_history[i] - 2 * self.temp_b_history[i - 1] + self.temp_b_history[i - 2]) /
-                            ((self.time_history[i] - self.time_history[i - 1]) ** 2)
-                    )
-                    for i in range(2, len(self.time_history))
-                ]
-
-                # Update ax3 (second derivative plot)
-
-                # Split into positive and negative parts
-                second_deriv_a_pos = [val if val >= 0 else None for val in second_deriv_a]
-                second_deriv_a_neg = [val if val < 0 else None for val in second_deriv_a]
-                second_deriv_b_pos = [val if val >= 0 else None for val in second_deriv_b]
-                second_deriv_b_neg = [val if val < 0 else None for val in second_deriv_b]
-
-                # Assign to lines
-                self.line_2nd_deriv_a_pos.set_data(self.time_history, second_deriv_a_pos)
-                self.line_2nd_deriv_a_neg.set_data(self.time_history, second_deriv_a_neg)
-                self.line_2nd_deriv_b_pos.set_data(self.time_history, second_deriv_b_pos)
-                self.line_2nd_deriv_b_neg.set_data(self.time_history, second_deriv_b_neg)
-
-                self.ax4.set_xlim(self.ax1.get_xlim())
-                self.ax4.relim()
-                self.ax4.autoscale_view()
-
-            # Plotting adjustments
-            if current_time <= self.time_range:
-                self.ax1.set_xlim(0, self.time_range)
-                self.ax2.set_xlim(0, self.time_range)
-                self.ax3.set_xlim(0, self.time_range)
-                self.ax4.set_xlim(0, self.time_range)
-            else:
-                self.ax1.set_xlim(current_time - self.time_range, current_time)
-                self.ax2.set_xlim(current_time - self.time_range, current_time)
-                self.ax3.set_xlim(current_time - self.time_range, current_time)
-                self.ax4.set_xlim(current_time - self.time_range, current_time)
-
-            self.ax1.set_ylim(self.y_scale_a_lower, self.y_scale_a_upper)
-            self.ax2.set_ylim(self.y_scale_diff_lower, self.y_scale_diff_upper)
-
-            self.ax3.set_ylim(self.y_scale_1st_derivative_lower, self.y_scale_1st_derivative_upper)
-            self.ax4.set_ylim(self.y_scale_2nd_derivative_lower, self.y_scale_2nd_derivative_upper)
-
-            # Update plot data
-            self.update_plot()
-
-            self.canvas.draw()
-
-            # CSV logging if enabled
+            heater = np.nan if self.heater_percent is None else self.heater_percent
+            self.history.append((current_time, temp_a, temp_b, abs_diff, heater))
+            for key, value in (("A", temp_a), ("B", temp_b), ("diff", abs_diff)):
+                self.rolling_stats[key].add(current_time, value)
+            self.update_stats_display()
+
+            with self.settle_lock:
+                self.settle_detector.update(current_time, temp_a)
+                settle_text = self.settle_detector.status_text()
+                settle_color = "green" if self.settle_detector.settled else "black"
+            self.settle_display.config(text=f"Settle: {settle_text}", fg=settle_color)
+            self.update_eta(current_time, temp_a)
+
+            self.alarm_engine.push(current_time, temp_a, temp_b, abs_diff, self.heating_rate_a, self.heating_rate_b,
+                                   self.heater_percent)
+            if self.last_alarm_evaluation is None or current_time - self.last_alarm_evaluation >= self.alarm_batch_interval:
+                self.last_alarm_evaluation = current_time
+                self.alarm_engine.evaluate()
+                active = self.alarm_engine.active_names()
+                self.alarm_label.config(text=f"Alarms: {', '.join(active) if active else 'none'}",
+                                        fg="red" if active else "green")
+
+            # Autotune fits the response of sensor A, the control input used by OUTMODE
+            if self.autotuner is not None:
+                self.feed_autotuner(current_time, temp_a)
+
+            # The frame scheduler draws the plots unless the external renderer process owns them
+            if self.series_writer is not None:
+                self.publish_sample(current_time, temp_a, temp_b, abs_diff)
+            elif self.external_renderer is not None:
+                self.external_renderer = None
+            self.last_sample_time = current_time
+            if self.external_renderer is None:
+                self.frame_scheduler.mark_dirty()
+            self.frame_rate_display.config(text=f"Plots: {self.frame_scheduler.status_text()}")
+
+            # CSV logging if enabled; drain with popleft, which is atomic against appends from other threads
+            events = []
+            while self.pending_events:
+                events.append(self.pending_events.popleft())
+            self.run_events += [(current_time, text) for text in events]
             if self.csv_logging and self.csv_file:
                 try:
-                    self.csv_writer.writerow(
-                        [f"{current_time:.1f}", f"{temp_a:.3f}", f"{temp_b:.3f}", f"{abs_diff:.3f}",
-                         f"{self.heating_rate_a:.3f}", f"{self.heating_rate_b:.3f}"])
+                    row = [f"{current_time:.1f}", f"{temp_a:.3f}", f"{temp_b:.3f}", f"{abs_diff:.3f}",
+                           f"{self.heating_rate_a:.3f}", f"{self.heating_rate_b:.3f}", f"{heater:.1f}",
+                           ";".join(events)]
+                    if self.log_compressor is None:
+                        self.csv_writer.writerow(row)
+                    else:
+                        # Rows with events are always kept
+                        self.csv_writer.writerows(self.log_compressor.push(current_time, (temp_a, temp_b, heater),
+                                                                           row, force=bool(events)))
 
                 except Exception as e:
                     messagebox.showerror("CSV Write Error", f"Failed to write to CSV:\n{e}")
@@ -676,9 +1286,450 @@ class Lakeshore335App:
             self.temp_b_display.config(text="Error")
             self.abs_diff_display.config(text="Error")
 
-        # Schedule next update if the system is running
-        if self.is_running:
-            self.root.after(int(self.reading_interval * 1000), self.update_display_and_plot)
+        if self.sequence_runner is not None:
+            self.sequence_display.config(text=f"Sequence: {self.sequence_runner.status}")
+            if not self.sequence_runner.is_running():
+                self.sequence_button.config(state=tk.DISABLED)
+
+        # Reflect background reconnects; start_time is untouched so the run keeps its time base
+        if self.instrument is not None:
+            self.update_status(self.instrument.state)
+        if self.service_monitor is not None:
+            text = f"Instrument events: {self.service_monitor.mode}"
+            if self.last_instrument_event is not None:
+                event, event_time, detail = self.last_instrument_event
+                text += f", last: {event} {detail} at {event_time:.0f} s"
+            self.instrument_event_label.config(text=text)
+        if self.acquisition_job is not None:
+            self.timing_display.config(text=f"Timing: {self.acquisition_job.status_text()}")
+
+    def update_eta(self, current_time, temp_a):
+        if self.setpoint != self.eta_setpoint:
+            # A new target means a new approach, the old fit says nothing about it
+            self.eta_predictor.reset()
+            self.eta_setpoint = self.setpoint
+        self.eta_predictor.update(current_time, temp_a)
+        detector = self.settle_detector
+        prediction = self.eta_predictor.predict(self.setpoint, detector.tolerance, detector.rate_threshold,
+                                                detector.dwell)
+        if prediction is None:
+            self.eta_display.config(text="N/A")
+        elif prediction["band"] is None:
+            asymptote = prediction["t_inf"]
+            self.eta_display.config(text="not reached" + (f" (→ {asymptote:.2f} K)" if asymptote is not None else ""))
+        else:
+            self.eta_display.config(text=f"{format_eta(prediction['band'])} / {format_eta(prediction['settled'])}")
+
+    def update_stats_display(self):
+        for key, labels in self.stats_labels.items():
+            stats = self.rolling_stats[key]
+            values = (stats.mean if stats.n else None, stats.std, stats.minimum, stats.maximum, stats.drift)
+            for label, value, fmt in zip(labels, values, (".3f", ".4f", ".3f", ".3f", ".4f")):
+                label.config(text="N/A" if value is None else f"{value:{fmt}}")
+        span = self.rolling_stats["A"].span()
+        # Shows how much of the window is filled yet
+        self.stats_span_display.config(text=f"{span:.0f} s" if span < self.stats_window else "")
+
+    def set_stats_window(self):
+        try:
+            value = float(self.stats_window_entry.get())
+            if value <= 0:
+                raise ValueError
+            self.stats_window = value
+            for stats in self.rolling_stats.values():
+                stats.set_window(value)
+            self.update_stats_display()
+            print(f"Statistics window set to {value} s.")
+        except ValueError:
+            messagebox.showerror("Invalid Input", "Please enter a positive window length in seconds.")
+
+    def draw_frame(self):
+        if self.external_renderer is None and self.last_sample_time is not None:
+            self.refresh_plots(self.last_sample_time)
+
+    def frame_scheduler_dirty(self):
+        self.frame_scheduler.mark_dirty()
+
+    def view_time(self):
+        return (self.last_sample_time or 0.0), self.time_range
+
+    def toggle_follow_live(self):
+        if self.follow_live_var.get():
+            self.navigator.follow()
+        else:
+            # Park on the interval currently shown
+            self.navigator.browse(*self.navigator.current(*self.view_time()))
+        self.frame_scheduler.mark_dirty()
+
+    def set_max_plot_fps(self):
+        try:
+            value = float(self.plot_fps_entry.get())
+            self.frame_scheduler.set_target_fps(value)
+            self.max_plot_fps = value
+            print(f"Plot frame rate limited to {value} fps.")
+        except ValueError:
+            messagebox.showerror("Invalid Input", "Please enter a positive frame rate.")
+
+    def refresh_plots(self, current_time):
+        # Latest time_range seconds with room on the right for the forecast, or the interval the
+        # user panned/zoomed to
+        x_lower, x_upper = self.navigator.current(current_time, self.time_range)
+        self.update_forecast(x_upper)
+
+        # Only the visible window is read from the history (two extra rows seed the derivatives),
+        # decimated when long; copied because the history's RAM block shifts when it spills
+        window = np.array(self.history.window(x_lower, x_upper, pad=2, max_points=self.max_plot_points))
+        t, temp_a, temp_b = window[:, 0], window[:, 1], window[:, 2]
+        self.line_a.set_data(t, temp_a)
+        self.line_b.set_data(t, temp_b)
+        self.line_diff.set_data(t, window[:, 3])
+        diff_lag = self.update_thermal_lag(t, temp_a, temp_b)
+        self.line_diff_lag.set_data(t, diff_lag)
+
+        # Calculate derivative of temperatures (dT/dt) over time
+        dt = np.diff(t)
+        dt[dt == 0] = np.nan
+        nan_pad = np.full(min(len(t), 2), np.nan)
+        deriv_a = np.concatenate((nan_pad[:1], np.diff(temp_a) / dt))
+        deriv_b = np.concatenate((nan_pad[:1], np.diff(temp_b) / dt))
+
+        # Split into positive and negative parts
+        deriv_a_pos, deriv_a_neg = split_sign(deriv_a)
+        deriv_b_pos, deriv_b_neg = split_sign(deriv_b)
+        self.line_deriv_a_pos.set_data(t, deriv_a_pos)
+        self.line_deriv_a_neg.set_data(t, deriv_a_neg)
+        self.line_deriv_b_pos.set_data(t, deriv_b_pos)
+        self.line_deriv_b_neg.set_data(t, deriv_b_neg)
+
+        # Compute second derivative (d²T/dt²)
+        if len(t) >= 3:
+            second_deriv_a = np.concatenate((nan_pad, np.diff(temp_a, 2) / dt[1:] ** 2))
+            second_deriv_b = np.concatenate((nan_pad, np.diff(temp_b, 2) / dt[1:] ** 2))
+        else:
+            second_deriv_a = second_deriv_b = np.full(len(t), np.nan)
+        second_deriv_a_pos, second_deriv_a_neg = split_sign(second_deriv_a)
+        second_deriv_b_pos, second_deriv_b_neg = split_sign(second_deriv_b)
+        self.line_2nd_deriv_a_pos.set_data(t, second_deriv_a_pos)
+        self.line_2nd_deriv_a_neg.set_data(t, second_deriv_a_neg)
+        self.line_2nd_deriv_b_pos.set_data(t, second_deriv_b_pos)
+        self.line_2nd_deriv_b_neg.set_data(t, second_deriv_b_neg)
+
+        for ax in (self.ax1, self.ax2, self.ax3, self.ax4):
+            ax.set_xlim(x_lower, x_upper)
+
+        self.ax1.set_ylim(self.y_scale_a_lower, self.y_scale_a_upper)
+        self.ax2.set_ylim(self.y_scale_diff_lower, self.y_scale_diff_upper)
+
+        self.ax3.set_ylim(self.y_scale_1st_derivative_lower, self.y_scale_1st_derivative_upper)
+        self.ax4.set_ylim(self.y_scale_2nd_derivative_lower, self.y_scale_2nd_derivative_upper)
+
+        if not self.lightweight_plot_var.get():
+            # Update visibility and legends, redraws the canvas
+            self.update_plot()
+            return
+
+        # The figure keeps its data for popups, but only the Tk canvas is drawn
+        channels = self.channel_selection.get()
+        deriv_channels = self.deriv_channel_selection.get()
+        self.strip_chart.draw(x_lower, x_upper, [
+            (self.y_scale_a_lower, self.y_scale_a_upper,
+             [(t, temp_a, channels in ("Channel A", "Both")), (t, temp_b, channels in ("Channel B", "Both"))]),
+            (self.y_scale_diff_lower, self.y_scale_diff_upper, [(t, window[:, 3], True), (t, diff_lag, True)]),
+            (self.y_scale_1st_derivative_lower, self.y_scale_1st_derivative_upper,
+             [(t, deriv_a, deriv_channels in ("Channel A", "Both")),
+              (t, deriv_b, deriv_channels in ("Channel B", "Both"))]),
+        ])
+
+    def update_thermal_lag(self, t, temp_a, temp_b):
+        """Hand the window to the lag worker; returns the lag-corrected |A-B| from its latest result."""
+        self.lag_worker.submit(t, temp_a, temp_b)
+        result = self.lag_worker.result
+        if result is None or len(t) < 2:
+            self.lag_display.config(text="N/A (no ramp in view)" if len(t) >= 2 else "N/A")
+            return np.full(len(t), np.nan)
+        self.lag_display.config(text=f"{result['lag']:+.1f} s, gain {result['gain']:.3f} "
+                                     f"(r = {result['correlation']:.2f})")
+        return lag_corrected_difference(t, temp_a, temp_b, result["lag"])
+
+    def update_forecast(self, x_upper):
+        if self.forecast_band is not None:
+            self.forecast_band.remove()
+            self.forecast_band = None
+        forecast = None
+        if self.eta_predictor.last is not None:
+            forecast = self.eta_predictor.curve(x_upper - self.eta_predictor.last[0])
+        if forecast is None:
+            self.line_forecast.set_data([], [])
+            return
+        times, estimate, low, high = forecast
+        self.line_forecast.set_data(times, estimate)
+        self.forecast_band = self.ax1.fill_between(times, low, high, color='tab:green', alpha=0.2, linewidth=0)
+
+    def toggle_lightweight_plots(self):
+        figure_widget = self.canvas.get_tk_widget()
+        if self.lightweight_plot_var.get():
+            figure_widget.pack_forget()
+            self.strip_chart.widget().pack(fill=tk.BOTH, expand=True)
+            self.frame_scheduler.set_widget(self.strip_chart.widget())
+        else:
+            self.strip_chart.widget().pack_forget()
+            figure_widget.pack(fill=tk.BOTH, expand=True)
+            self.frame_scheduler.set_widget(figure_widget)
+
+    def toggle_compact_history(self):
+        # Re-encode what has been collected so far; the time base and all samples are kept
+        started = time.perf_counter()
+        if self.compact_history_var.get():
+            history = CompactHistory(self.history.fields)
+        else:
+            history = SampleHistory(self.history.fields, ram_budget_mb=self.history_ram_budget_mb)
+        history.load(HistoryView(self.history))
+        self.history.close()
+        self.history = history
+        self.frame_scheduler.mark_dirty()
+        print(f"[Info] History re-encoded in {time.perf_counter() - started:.2f} s, "
+              f"{history.resident_bytes() / 2 ** 20:.1f} MB resident.")
+
+    def on_strip_chart_click(self, index):
+        self.open_axis_popup((self.ax1, self.ax2, self.ax3)[index])
+
+    def open_live_feed(self):
+        try:
+            self.series_writer = SharedSeriesWriter(FEED_NAME, LIVE_FIELDS)
+            print(f"[Info] Live feed published in shared memory as '{self.series_writer.name}'.")
+        except Exception as e:
+            # The feed is optional, acquisition works without it
+            print(f"[Warning] Could not create the shared-memory live feed: {e}")
+            self.series_writer = None
+
+    def publish_sample(self, current_time, temp_a, temp_b, abs_diff):
+        heater = float("nan") if self.heater_percent is None else self.heater_percent
+        self.series_writer.append((current_time, temp_a, temp_b, abs_diff, self.heating_rate_a, self.heating_rate_b,
+                                   heater, self.selected_heater))
+        if self.web_dashboard is not None and not self.web_dashboard.is_alive():
+            print("[Error] Web dashboard process exited, dashboard stopped.")
+            self.web_dashboard = None
+            self.web_dashboard_var.set(False)
+        if self.external_renderer is not None:
+            if not self.external_renderer.is_alive():
+                # Renderer window was closed: fall back to the embedded figure
+                self.external_renderer = None
+                self.external_render_var.set(False)
+                return
+            self.push_render_settings()
+
+    def push_render_settings(self):
+        settings = [0.0] * 16
+        settings[S_TIME_RANGE] = self.time_range
+        settings[S_Y_A:S_Y_A + 2] = (self.y_scale_a_lower, self.y_scale_a_upper)
+        settings[S_Y_DIFF:S_Y_DIFF + 2] = (self.y_scale_diff_lower, self.y_scale_diff_upper)
+        settings[S_Y_1ST:S_Y_1ST + 2] = (self.y_scale_1st_derivative_lower, self.y_scale_1st_derivative_upper)
+        settings[S_Y_2ND:S_Y_2ND + 2] = (self.y_scale_2nd_derivative_lower, self.y_scale_2nd_derivative_upper)
+        settings[S_CHANNELS] = CHANNEL_CODES[self.channel_selection.get()]
+        settings[S_DERIV_CHANNELS] = CHANNEL_CODES[self.deriv_channel_selection.get()]
+        settings[S_2ND_DERIV_CHANNELS] = CHANNEL_CODES[self.second_deriv_channel_selection.get()]
+        settings[S_INTERVAL] = self.reading_interval
+        self.series_writer.set_settings(settings[:S_INTERVAL + 1])
+
+    def toggle_external_renderer(self):
+        if self.external_render_var.get():
+            try:
+                if self.series_writer is None:
+                    raise RuntimeError("The shared-memory live feed is not available.")
+                self.push_render_settings()
+                self.external_renderer = ExternalRenderer(self.series_writer)
+                print("[Info] External renderer started.")
+            except Exception as e:
+                print(f"[Error] External renderer failed: {e}")
+                traceback.print_exc()
+                messagebox.showerror("Renderer Error", str(e))
+                self.external_render_var.set(False)
+        elif self.external_renderer is not None:
+            self.external_renderer.stop()
+            self.external_renderer = None
+            print("[Info] External renderer stopped.")
+
+    def set_dashboard_host(self):
+        self.dashboard_host = "0.0.0.0" if self.dashboard_lan_var.get() else "127.0.0.1"
+        if self.web_dashboard is not None:
+            # Rebind a running dashboard on the new interface
+            self.web_dashboard_var.set(False)
+            self.toggle_web_dashboard()
+            self.web_dashboard_var.set(True)
+            self.toggle_web_dashboard()
+
+    def toggle_web_dashboard(self):
+        if self.web_dashboard_var.get():
+            try:
+                if self.series_writer is None:
+                    raise RuntimeError("The shared-memory live feed is not available.")
+                self.web_dashboard = WebDashboard(self.series_writer.name, self.dashboard_host, self.dashboard_port)
+                print(f"[Info] Web dashboard started on {self.dashboard_host}:{self.dashboard_port}.")
+            except Exception as e:
+                print(f"[Error] Web dashboard failed: {e}")
+                messagebox.showerror("Dashboard Error", str(e))
+                self.web_dashboard_var.set(False)
+        elif self.web_dashboard is not None:
+            self.web_dashboard.stop()
+            self.web_dashboard = None
+            print("[Info] Web dashboard stopped.")
+
+    # Axis and acquisition settings stored with a session snapshot: attribute -> entry widget
+    SESSION_SETTINGS = {
+        "time_range": "time_range_entry",
+        "reading_interval": "freq_entry",
+        "stats_window": "stats_window_entry",
+        "y_scale_a_lower": "y_scale_a_lower_entry",
+        "y_scale_a_upper": "y_scale_a_upper_entry",
+        "y_scale_diff_lower": "y_scale_diff_lower_entry",
+        "y_scale_diff_upper": "y_scale_diff_upper_entry",
+        "y_scale_1st_derivative_lower": "y_scale_1st_derivative_lower_entry",
+        "y_scale_1st_derivative_upper": "y_scale_1st_derivative_upper_entry",
+        "y_scale_2nd_derivative_lower": "y_scale_2nd_derivative_lower_entry",
+        "y_scale_2nd_derivative_upper": "y_scale_2nd_derivative_upper_entry",
+    }
+
+    def session_meta(self):
+        meta = {name: getattr(self, name) for name in self.SESSION_SETTINGS}
+        meta.update(
+            start_time=self.start_time,
+            channels=self.channel_selection.get(),
+            deriv_channels=self.deriv_channel_selection.get(),
+            second_deriv_channels=self.second_deriv_channel_selection.get(),
+            heating_rate_a=self.heating_rate_a,
+            heating_rate_b=self.heating_rate_b,
+        )
+        return meta
+
+    def save_session(self, session):
+        started = time.perf_counter()
+        session.save(self.history, self.session_meta())
+        return time.perf_counter() - started
+
+    def autosave_session(self):
+        # Append-only: each autosave writes just the rows added since the previous one
+        if len(self.history):
+            try:
+                self.save_session(self.session_file)
+            except Exception as e:
+                print(f"[Error] Session autosave failed: {e}")
+
+    def save_session_as(self):
+        file_path = filedialog.asksaveasfilename(defaultextension=".bin", filetypes=[("Session Snapshots", "*.bin")])
+        if not file_path:
+            return
+        try:
+            elapsed = self.save_session(SessionFile(file_path))
+            print(f"[Info] Saved {len(self.history)} samples to {file_path} in {elapsed:.2f} s.")
+        except Exception as e:
+            messagebox.showerror("Session Error", f"Could not save the session:\n{e}")
+
+    def restore_session_from(self):
+        file_path = filedialog.askopenfilename(filetypes=[("Session Snapshots", "*.bin"), ("All Files", "*.*")])
+        if file_path:
+            self.restore_session(SessionFile(file_path))
+
+    def offer_session_restore(self):
+        if messagebox.askyesno("Restore Session", "A session snapshot from a previous run was found.\n"
+                                                  "Restore it and continue on its time axis?"):
+            self.restore_session(self.session_file)
+
+    def restore_session(self, session):
+        started = time.perf_counter()
+        try:
+            meta, rows = session.load()
+            if tuple(meta["fields"]) != self.history.fields:
+                raise ValueError(f"Snapshot fields {meta['fields']} do not match {list(self.history.fields)}")
+            self.history.load(rows)
+            del rows  # Release the memory map of the snapshot
+        except Exception as e:
+            messagebox.showerror("Session Error", f"Could not restore the session:\n{e}")
+            return
+        if session is not self.session_file:
+            self.session_file.saved_rows = None  # Autosave rewrites its snapshot with the restored history
+
+        self.start_time = meta["start_time"]
+        for name, entry_name in self.SESSION_SETTINGS.items():
+            setattr(self, name, meta[name])
+            entry = getattr(self, entry_name)
+            entry.delete(0, tk.END)
+            entry.insert(0, str(meta[name]))
+        self.channel_selection.set(meta["channels"])
+        self.deriv_channel_selection.set(meta["deriv_channels"])
+        self.second_deriv_channel_selection.set(meta["second_deriv_channels"])
+        self.heating_rate_a = meta["heating_rate_a"]
+        self.heating_rate_b = meta["heating_rate_b"]
+
+        # Rebuild the sliding-window state from the tail of the history
+        last = self.history.last()
+        if last is not None:
+            self.prev_time, self.prev_temp_a, self.prev_temp_b = last[0], last[1], last[2]
+            self.last_sample_time = last[0]
+        self.eta_predictor.reset()
+        for stats in self.rolling_stats.values():
+            stats.reset()
+            stats.set_window(self.stats_window)
+        with self.settle_lock:
+            self.settle_detector.reset()
+        self.reset_alarms()
+        if len(self.history):
+            span = max(self.stats_window, self.eta_predictor.window)
+            tail = np.array(self.history.window(last[0] - span, last[0]))
+            for t, temp_a, temp_b, abs_diff in tail[:, :4]:
+                self.eta_predictor.update(t, temp_a)
+                for key, value in (("A", temp_a), ("B", temp_b), ("diff", abs_diff)):
+                    self.rolling_stats[key].add(t, value)
+            self.update_stats_display()
+        if self.series_writer is not None:
+            self.series_writer.reset()
+            self.backfill_live_feed()
+
+        self.resume_session = not self.is_running
+        self.navigator.follow()
+        self.frame_scheduler.mark_dirty()
+        print(f"[Info] Restored {len(self.history)} samples from {session.path} "
+              f"in {time.perf_counter() - started:.2f} s.")
+
+    def backfill_live_feed(self, max_rows=20000):
+        rows = np.array(self.history.rows(max(len(self.history) - max_rows, 0)))
+        if not len(rows):
+            return
+        t, temp_a, temp_b, abs_diff, heater = rows.T
+        dt = np.diff(t)
+        dt[dt <= 0] = np.nan
+        rate_a = np.concatenate([[0.0], np.diff(temp_a) / dt * 60])
+        rate_b = np.concatenate([[0.0], np.diff(temp_b) / dt * 60])
+        self.series_writer.extend([t, temp_a, temp_b, abs_diff, rate_a, rate_b, heater,
+                                   np.full(len(t), float(self.selected_heater))])
+
+    def close_instrument(self):
+        if self.instrument is None:
+            return
+        try:
+            self.instrument.close()  # Close the connection properly
+        except Exception as e:
+            print(f"Error while closing the instrument: {e}")
+        self.instrument = None
+
+    def on_close(self):
+        self.frame_scheduler.stop()
+        for line in self.scheduler.report():
+            print(f"[Info] Timing of {line}")
+        self.scheduler.stop()
+        if self.csv_logging:
+            self.toggle_csv_logging()  # Writes the compressor's pending rows and closes the file
+        self.autosave_session()
+        self.stop_service_monitor()
+        self.close_instrument()
+        self.lag_worker.stop()
+        if self.web_dashboard is not None:
+            self.web_dashboard.stop()
+        if self.external_renderer is not None:
+            self.external_renderer.stop()
+        if self.series_writer is not None:
+            self.series_writer.close()
+        self.history.close()
+        self.root.destroy()
 
     def update_plot(self, event=None):
         """ Update plot based on selected channel(s) """
@@ -688,10 +1739,6 @@ class Lakeshore335App:
         self.line_a.set_visible(selected_channel in ("Channel A", "Both"))
         self.line_b.set_visible(selected_channel in ("Channel B", "Both"))
 
-        self.line_a.set_data(self.time_history, self.temp_a_history)
-        self.line_b.set_data(self.time_history, self.temp_b_history)
-        self.line_diff.set_data(self.time_history, self.abs_diff_history)
-
         # 1st Derivative channels (ax3)
         deriv_channel = self.deriv_channel_selection.get()
 
@@ -731,29 +1778,27 @@ class Lakeshore335App:
             ] if line.get_visible()
         ], loc="upper right", fontsize=9)
 
-        # Update data for line A
-        self.line_a.set_data(self.time_history, self.temp_a_history)
-        # Update data for line B
-        self.line_b.set_data(self.time_history, self.temp_b_history)
-        # Update data for absolute difference
-        self.line_diff.set_data(self.time_history, self.abs_diff_history)
-
-        # Redraw the canvas
-        self.canvas.draw()
+        # Redraw the canvas; the lightweight view picks the selection up on its next frame
+        if self.lightweight_plot_var.get():
+            self.frame_scheduler.mark_dirty()
+        else:
+            self.canvas.draw()
 
     def on_plot_click(self, event):
         # Ignore if the click wasn't on an axes
         if event.inaxes is None:
             return
+        self.open_axis_popup(event.inaxes)
 
-        if event.inaxes == self.ax1:
+    def open_axis_popup(self, axis):
+        if axis == self.ax1:
             self.open_popup_plot("Temperature", self.ax1.get_ylabel(), self.line_a, self.line_b)
-        elif event.inaxes == self.ax2:
-            self.open_popup_plot("|A - B|", self.ax2.get_ylabel(), self.line_diff)
-        elif event.inaxes == self.ax3:
+        elif axis == self.ax2:
+            self.open_popup_plot("|A - B|", self.ax2.get_ylabel(), self.line_diff, self.line_diff_lag)
+        elif axis == self.ax3:
             self.open_popup_plot("Rate", self.ax3.get_ylabel(), self.line_deriv_a_pos, self.line_deriv_a_neg,
                                  self.line_deriv_b_pos, self.line_deriv_b_neg)
-        elif event.inaxes == self.ax4:
+        elif axis == self.ax4:
             self.open_popup_plot("2nd Derivative", self.ax4.get_ylabel(), self.line_2nd_deriv_a_pos,
                                  self.line_2nd_deriv_a_neg,
                                  self.line_2nd_deriv_b_pos, self.line_2nd_deriv_b_neg)
@@ -778,6 +1823,8 @@ class Lakeshore335App:
 
         canvas = FigureCanvasTkAgg(fig, master=popup)
         canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        # Navigating in a popup moves the shared time view
+        popup.navigation = PlotNavigation(canvas, self.navigator, self.view_time, self.frame_scheduler_dirty)
 
         ax_key = None
         if title == "Temperature":
@@ -852,11 +1899,13 @@ class Lakeshore335App:
                 dropdown.bind("<<ComboboxSelected>>", lambda event: apply_visibility_with_channel_filter())
 
         def update_popup_plot():
-            time_data = list(self.time_history)
+            if not popup.winfo_exists():
+                job.cancel()
+                return
             for src_line, dest_line in zip(lines, popup_lines):
-                dest_line.set_data(time_data, src_line.get_ydata())
+                dest_line.set_data(src_line.get_xdata(), src_line.get_ydata())
 
-            if time_data:
+            if len(self.line_a.get_xdata()):
                 main_ax = getattr(self, ax_key)
                 ax.set_xlim(main_ax.get_xlim())
 
@@ -875,16 +1924,24 @@ class Lakeshore335App:
             else:  # ax3 or ax4
                 apply_visibility_with_channel_filter()
 
-            if popup.winfo_exists():
-                popup.after(int(self.reading_interval * 1000), update_popup_plot)
+        def close():
+            job.cancel()
+            self.popup_axes_map.pop(popup, None)
+            plt.close(fig)
+            popup.destroy()
 
-        update_popup_plot()
+        popup.protocol("WM_DELETE_WINDOW", close)
+        job = self.scheduler.add("popup plot", update_popup_plot, self.reading_interval)
 
     def connect_to_instrument(self):
         try:
-            self.instrument = self.rm.open_resource(self.gpib_address)
-            self.instrument.timeout = 10000
+            # Short per-command timeouts plus background reconnect, see InstrumentLink
+            self.instrument = InstrumentLink(self.rm, self.gpib_address)
+            self.instrument.open()
+            self.start_service_monitor()
             print("Connected to Lakeshore 335.")
+            print(f"[Info] Worst-case read latency per tick: "
+                  f"{InstrumentLink.worst_case_latency('KRDG? A', 'KRDG? B'):.2f} s")
             self.update_status("Connected")
         except Exception as e:
             print(f"Error connecting to instrument: {e}")
@@ -909,32 +1966,50 @@ class Lakeshore335App:
             if self.instrument:
                 self.is_running = True
                 self.start_stop_button.config(text="Disconnect", bg="red")
-                self.start_time = time.time()
-                self.temp_a_history.clear()
-                self.temp_b_history.clear()
-                self.abs_diff_history.clear()
-                self.time_history.clear()
-                self.update_display_and_plot()
+                if self.resume_session:
+                    # Restored history: keep its time base and continue appending to it
+                    self.resume_session = False
+                else:
+                    self.start_time = time.time()
+                    self.history.clear()
+                    self.run_events = []
+                    self.session_file.saved_rows = None  # Next autosave starts a new snapshot
+                    self.navigator.follow()
+                    self.eta_predictor.reset()
+                    for stats in self.rolling_stats.values():
+                        stats.reset()
+                    with self.settle_lock:
+                        self.settle_detector.reset()
+                    self.reset_alarms()
+                    if self.series_writer is not None:
+                        self.series_writer.reset()
+                # First reading now, then on the reading-interval grid
+                self.acquisition_job = self.scheduler.add("acquisition", self.update_display_and_plot,
+                                                          self.reading_interval)
             else:
                 messagebox.showerror("Connection Error", "Could not connect to the Lakeshore 335 instrument.")
         else:
             # Stop reading and disconnect
             self.is_running = False
             self.start_stop_button.config(text="Connect", bg="green")
+            if self.acquisition_job is not None:
+                self.acquisition_job.cancel()
+                self.acquisition_job = None
 
             # Disconnect from the instrument
+            self.stop_service_monitor()
             if self.instrument:
                 try:
                     # Send disconnect or stop command if supported
                     self.instrument.write("*CLS")  # Clear any errors, not a disconnect command but can reset status
                     self.instrument.write(
                         "SYST:REM")  # Send system command to disable remote control mode (if supported)
-
-                    self.instrument.close()  # Close the connection properly
-                    print("Disconnected from Lakeshore 335.")
-                    self.update_status("Disconnected")
                 except Exception as e:
                     print(f"Error while disconnecting: {e}")
+                finally:
+                    # Also stops the reconnect thread; the writes above fail while the link is down
+                    self.close_instrument()
+                print("Disconnected from Lakeshore 335.")
 
             # Reset the instrument object to None
             self.instrument = None
@@ -975,6 +2050,10 @@ class Lakeshore335App:
             value = float(self.freq_entry.get())
             if 0.1 <= value <= 10.0:
                 self.reading_interval = value
+                for job in self.scheduler.find("acquisition") + self.scheduler.find("popup plot"):
+                    job.set_interval(value)
+                for job in self.scheduler.find("spectrum"):
+                    job.set_interval(max(value, 1.0))
                 print(f"Reading frequency set to {self.reading_interval} seconds.")
             else:
                 raise ValueError
@@ -985,12 +2064,22 @@ class Lakeshore335App:
         if not self.csv_logging:
             file_path = filedialog.asksaveasfilename(defaultextension=".csv", filetypes=[("CSV Files", "*.csv")])
             if file_path:
+                self.log_compressor = None
+                if self.compress_log_var.get():
+                    try:
+                        deviation = float(self.log_deadband_entry.get())
+                        self.log_deviations = (deviation, deviation, float(self.log_heater_deadband_entry.get()))
+                        self.log_max_interval = float(self.log_max_interval_entry.get())
+                    except ValueError:
+                        messagebox.showerror("Invalid Input", "Please enter numbers for the log deadbands.")
+                        return
+                    self.log_compressor = SwingingDoorCompressor(self.log_deviations, self.log_max_interval)
                 try:
                     self.csv_file = open(file_path, mode='w', newline='')
                     self.csv_writer = csv.writer(self.csv_file)
                     self.csv_writer.writerow(
                         ["Time (s)", "Channel A (K)", "Channel B (K)", "Abs Diff (K)", "Rate A (K/min)",
-                         "Rate B (K/min)"])
+                         "Rate B (K/min)", "Heater (%)", "Event"])
                     self.csv_logging = True
                     self.save_button.config(text="Stop Saving to CSV")
                     print(f"Logging data to {file_path}")
@@ -998,6 +2087,11 @@ class Lakeshore335App:
                     messagebox.showerror("CSV Error", f"Could not open file for writing: {e}")
         else:
             if self.csv_file:
+                if self.log_compressor is not None:
+                    self.csv_writer.writerows(self.log_compressor.flush())
+                    print(f"[Info] Log compressed {self.log_compressor.ratio():.1f}:1 "
+                          f"(within ±{self.log_deviations[0]} K, ±{self.log_deviations[2]} %).")
+                    self.log_compressor = None
                 self.csv_file.close()
             self.csv_logging = False
             self.save_button.config(text="Start Saving to CSV")
@@ -1045,15 +2139,25 @@ class Lakeshore335App:
 
     def reset_time(self):
         self.start_time = time.time()
-        self.time_history.clear()
-        self.temp_a_history.clear()
-        self.temp_b_history.clear()
-        self.abs_diff_history.clear()
+        self.history.clear()
+        self.run_events = []
+        self.session_file.saved_rows = None
+        self.resume_session = False
+        self.navigator.follow()
+        self.eta_predictor.reset()
+        for stats in self.rolling_stats.values():
+            stats.reset()
+        with self.settle_lock:
+            self.settle_detector.reset()
+        self.reset_alarms()
+        if self.series_writer is not None:
+            self.series_writer.reset()
 
         # Clear plot data immediately
         self.line_a.set_data([], [])
         self.line_b.set_data([], [])
         self.line_diff.set_data([], [])
+        self.line_diff_lag.set_data([], [])
 
         self.line_deriv_a_pos.set_data([], [])
         self.line_deriv_a_neg.set_data([], [])
@@ -1073,4 +2177,5 @@ class Lakeshore335App:
 if __name__ == "__main__":
     root = tk.Tk()
     app = Lakeshore335App(root)
+    root.protocol("WM_DELETE_WINDOW", app.on_close)
     root.mainloop()
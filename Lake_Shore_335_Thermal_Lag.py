@@ -0,0 +1,127 @@
+import threading
+
+import numpy as np
+
+
+def lag_correlation(a, b, max_shift):
+    """
+    Pearson correlation of a[i] with b[i + k] for k = -max_shift..max_shift, each over the
+    overlapping samples only. The cross products come from one FFT, the overlap sums from
+    cumulative sums, so the whole curve costs O(n log n).
+    """
+    n = len(a)
+    size = 1 << int(np.ceil(np.log2(2 * n)))
+    cross = np.fft.irfft(np.conj(np.fft.rfft(a, size)) * np.fft.rfft(b, size), size)
+    shifts = np.arange(-max_shift, max_shift + 1)
+    s_ab = cross[shifts % size]
+
+    def window_sums(x):
+        c = np.concatenate(([0.0], np.cumsum(x)))
+        c2 = np.concatenate(([0.0], np.cumsum(x * x)))
+        return c, c2
+
+    ca, ca2 = window_sums(a)
+    cb, cb2 = window_sums(b)
+    a_start = np.maximum(0, -shifts)
+    a_stop = n - np.maximum(0, shifts)
+    b_start, b_stop = a_start + shifts, a_stop + shifts
+    m = a_stop - a_start
+    s_a, s_aa = ca[a_stop] - ca[a_start], ca2[a_stop] - ca2[a_start]
+    s_b, s_bb = cb[b_stop] - cb[b_start], cb2[b_stop] - cb2[b_start]
+    var = (s_aa - s_a ** 2 / m) * (s_bb - s_b ** 2 / m)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        r = (s_ab - s_a * s_b / m) / np.sqrt(var)
+    return shifts, np.where(var > 0, r, 0.0)
+
+
+def estimate_lag(t, a, b, max_points=512, max_fraction=0.25, min_correlation=0.5):
+    """
+    Time lag and gain of channel B against channel A over one window, or None when the
+    window holds no feature to align (a flat hold or a constant ramp only shows up as offset).
+
+    Both channels are resampled onto a uniform grid of at most `max_points` (coarse enough
+    that the change per step stands out of the sensor noise) and differenced, so the rates
+    are correlated: a level offset drops out, and only changes of rate carry lag
+    information. The lag is the shift with the highest correlation, refined to a fraction of
+    a grid step by a parabola through the peak; positive means B follows A. The gain and
+    offset are the least-squares fit B(t) = gain * A(t - lag) + offset at that shift.
+    Returns a dict with lag [s], gain, offset [K] and the peak correlation.
+    """
+    finite = np.isfinite(t) & np.isfinite(a) & np.isfinite(b)
+    t, a, b = t[finite], a[finite], b[finite]
+    if len(t) < 32 or t[-1] <= t[0]:
+        return None
+    step = max(float(np.median(np.diff(t))), (t[-1] - t[0]) / max_points)
+    if step <= 0:
+        return None
+    grid = np.arange(t[0], t[-1], step)
+    if len(grid) < 32:
+        return None
+    a_g, b_g = np.interp(grid, t, a), np.interp(grid, t, b)
+    shifts, r = lag_correlation(np.diff(a_g), np.diff(b_g), int(len(grid) * max_fraction))
+    peak = int(np.argmax(r))
+    if r[peak] < min_correlation or peak in (0, len(r) - 1):
+        return None  # No feature, or the lag is beyond the searchable range
+    shift = float(shifts[peak])
+    denom = r[peak - 1] - 2 * r[peak] + r[peak + 1]
+    if denom < 0:
+        shift += 0.5 * (r[peak - 1] - r[peak + 1]) / denom
+
+    k = int(shifts[peak])
+    a_part = a_g[max(0, -k):len(grid) - max(0, k)]
+    b_part = b_g[max(0, k):len(grid) - max(0, -k)]
+    a_c = a_part - a_part.mean()
+    gain = float(a_c @ (b_part - b_part.mean()) / (a_c @ a_c)) if a_c @ a_c > 0 else 1.0
+    return {
+        "lag": shift * step,
+        "gain": gain,
+        "offset": float(b_part.mean() - gain * a_part.mean()),
+        "correlation": float(r[peak]),
+    }
+
+
+def lag_corrected_difference(t, a, b, lag):
+    """|A(t - lag) - B(t)|: the A/B difference without the part caused by the thermal lag."""
+    shifted = t - lag
+    out = np.abs(np.interp(shifted, t, a) - b)
+    out[(shifted < t[0]) | (shifted > t[-1])] = np.nan  # A not known there
+    return out
+
+
+class LagWorker:
+    """
+    Estimates the A/B lag on a background thread, the same way SpectrumWorker runs its
+    spectra: the GUI submits the visible window and picks up `result` on a later frame.
+    """
+
+    def __init__(self):
+        self.job = None
+        self.result = None  # Dict from estimate_lag, or None
+        self.lock = threading.Lock()
+        self.wake = threading.Event()
+        self.stopped = False
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def submit(self, t, a, b):
+        with self.lock:
+            self.job = (t, a, b)
+        self.wake.set()
+
+    def run(self):
+        while not self.stopped:
+            self.wake.wait()
+            self.wake.clear()
+            with self.lock:
+                job, self.job = self.job, None
+            if job is None:
+                continue
+            try:
+                self.result = estimate_lag(*job)
+            except Exception as e:
+                print(f"[Error] Lag estimation failed: {e}")
+                self.result = None
+
+    def stop(self):
+        self.stopped = True
+        self.wake.set()
@@ -0,0 +1,270 @@
+import base64
+import hashlib
+import json
+import multiprocessing
+import select
+import socket
+import struct
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+from Lake_Shore_335_Shared_Memory import FEED_NAME, SharedSeriesReader
+
+
+DEFAULT_PORT = 8335
+WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+POLL_INTERVAL = 0.5  # How often each connection checks the feed for new samples [s]
+BACKFILL = 20000  # Samples sent when a viewer connects
+SENT_FIELDS = ("A", "B", "diff", "rate_a", "rate_b", "heater")
+
+PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Lakeshore 335</title>
+<style>
+body { font-family: Helvetica, sans-serif; margin: 12px; }
+#values span { display: inline-block; min-width: 150px; font-size: 18px; }
+canvas { width: 100%; height: 300px; background: #b3b3b3; margin-top: 8px; }
+</style></head><body>
+<div id="values"><span id="A">A: -</span><span id="B">B: -</span><span id="diff">|A-B|: -</span>
+<span id="rate_a">Rate A: -</span><span id="heater">Heater: -</span><span id="state">connecting</span></div>
+<label>Window [s] <input id="range" type="number" value="300" size="6"></label>
+<canvas id="temp"></canvas><canvas id="delta"></canvas>
+<script>
+const cols = {time: [], A: [], B: [], diff: [], rate_a: [], rate_b: [], heater: []};
+const maxPoints = 200000;
+function append(msg) {
+  if (msg.reset) for (const k in cols) cols[k].length = 0;
+  let t = msg.t0;
+  msg.dt.forEach((d, i) => { t += d / 1000; cols.time.push(t); });
+  for (const k in msg.values) cols[k].push(...msg.values[k]);
+  const extra = cols.time.length - maxPoints;
+  if (extra > 0) for (const k in cols) cols[k].splice(0, extra);
+}
+function draw(id, series) {
+  const c = document.getElementById(id), w = c.width = c.clientWidth, h = c.height = c.clientHeight;
+  const g = c.getContext("2d"), n = cols.time.length;
+  if (n < 2) return;
+  const t1 = cols.time[n - 1], t0 = t1 - Number(document.getElementById("range").value || 300);
+  let start = n - 1;
+  while (start > 0 && cols.time[start - 1] >= t0) start--;
+  let lo = Infinity, hi = -Infinity;
+  for (const [k] of series) for (let i = start; i < n; i++) { lo = Math.min(lo, cols[k][i]); hi = Math.max(hi, cols[k][i]); }
+  if (hi - lo < 1e-6) { hi += 0.5; lo -= 0.5; }
+  g.fillStyle = "black"; g.font = "11px Helvetica";
+  g.fillText(hi.toFixed(3), 4, 12); g.fillText(lo.toFixed(3), 4, h - 4);
+  for (const [k, color] of series) {
+    g.strokeStyle = color; g.beginPath();
+    for (let i = start; i < n; i++) {
+      const x = (cols.time[i] - t0) / (t1 - t0) * w, y = h - (cols[k][i] - lo) / (hi - lo) * (h - 20) - 10;
+      i === start ? g.moveTo(x, y) : g.lineTo(x, y);
+    }
+    g.stroke();
+  }
+}
+function render() {
+  const n = cols.time.length;
+  if (n) {
+    const fmt = (k, label, unit) => document.getElementById(k).textContent = label + ": " + (cols[k][n - 1] ?? NaN).toFixed(3) + unit;
+    fmt("A", "A", " K"); fmt("B", "B", " K"); fmt("diff", "|A-B|", " K"); fmt("rate_a", "Rate A", " K/min");
+    fmt("heater", "Heater", " %");
+  }
+  draw("temp", [["A", "#d62728"], ["B", "#1f77b4"]]);
+  draw("delta", [["diff", "black"]]);
+}
+function connect() {
+  const ws = new WebSocket("ws://" + location.host + "/ws");
+  const state = document.getElementById("state");
+  ws.onopen = () => state.textContent = "live";
+  ws.onmessage = (e) => { append(JSON.parse(e.data)); requestAnimationFrame(render); };
+  ws.onclose = () => { state.textContent = "reconnecting"; setTimeout(connect, 2000); };
+}
+connect();
+</script></body></html>
+"""
+
+
+def encode_delta(columns, start, stop, reset):
+    """
+    One websocket message for samples [start, stop) of a feed window: the first time in
+    full, then time steps in ms and values rounded to what the GUI displays.
+    """
+    t = np.asarray(columns["time"][start:stop])
+    if len(t) == 0:
+        return None
+    message = {
+        "reset": reset,
+        "t0": float(t[0]),
+        "dt": [0] + np.round(np.diff(t) * 1000).astype(np.int64).tolist(),
+        "values": {},
+    }
+    for field in SENT_FIELDS:
+        values = np.round(np.asarray(columns[field][start:stop]), 4)
+        # JSON has no NaN: the heater column is NaN until the first HTR? reading
+        message["values"][field] = [None if v != v else v for v in values.tolist()]
+    return json.dumps(message, separators=(",", ":")).encode()
+
+
+def ws_frame(payload, opcode=0x1):
+    header = bytes([0x80 | opcode])
+    length = len(payload)
+    if length < 126:
+        header += bytes([length])
+    elif length < 1 << 16:
+        header += bytes([126]) + struct.pack(">H", length)
+    else:
+        header += bytes([127]) + struct.pack(">Q", length)
+    return header + payload
+
+
+def read_client_frame(sock):
+    """Read one (masked) client frame; returns (opcode, payload), opcode 0x8 on close or EOF."""
+    head = sock.recv(2)
+    if len(head) < 2:
+        return 0x8, b""
+    opcode, length = head[0] & 0x0F, head[1] & 0x7F
+    if length == 126:
+        length = struct.unpack(">H", sock.recv(2))[0]
+    elif length == 127:
+        length = struct.unpack(">Q", sock.recv(8))[0]
+    mask = sock.recv(4) if head[1] & 0x80 else b"\0\0\0\0"
+    payload = b""
+    while len(payload) < length:
+        chunk = sock.recv(length - len(payload))
+        if not chunk:
+            return 0x8, b""
+        payload += chunk
+    return opcode, bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+
+
+class DashboardHandler(BaseHTTPRequestHandler):
+    reader = None  # SharedSeriesReader, set by serve()
+    protocol_version = "HTTP/1.1"  # Browsers expect the websocket upgrade on HTTP/1.1
+
+    def log_message(self, format, *args):
+        pass  # Keep the console for instrument messages
+
+    def do_GET(self):
+        if self.path == "/ws":
+            self.stream()
+        elif self.path in ("/", "/index.html"):
+            body = PAGE.encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        else:
+            self.send_error(404)
+
+    def stream(self):
+        key = self.headers.get("Sec-WebSocket-Key")
+        if not key:
+            self.send_error(400, "Expected a websocket upgrade")
+            return
+        accept = base64.b64encode(hashlib.sha1((key + WS_GUID).encode()).digest()).decode()
+        self.send_response(101)
+        self.send_header("Upgrade", "websocket")
+        self.send_header("Connection", "Upgrade")
+        self.send_header("Sec-WebSocket-Accept", accept)
+        self.end_headers()
+        self.close_connection = True
+
+        sock = self.connection
+        reader = self.reader
+        sent_seq = 0
+        try:
+            while True:
+                readable, _, _ = select.select([sock], [], [], POLL_INTERVAL)
+                if readable:
+                    opcode, payload = read_client_frame(sock)
+                    if opcode == 0x8:
+                        break
+                    if opcode == 0x9:
+                        sock.sendall(ws_frame(payload, opcode=0xA))
+                    continue
+
+                seq = reader.seq
+                if seq == sent_seq:
+                    continue
+                # Reset Time in the GUI restarts the sequence; a viewer that fell a whole ring
+                # behind starts over as well
+                reset = seq < sent_seq or seq - sent_seq > reader.capacity or sent_seq == 0
+                n = min(seq if reset else seq - sent_seq, BACKFILL if reset else reader.capacity, reader.capacity)
+                columns, seq = reader.latest(n)
+                message = encode_delta(columns, 0, len(columns["time"]), reset)
+                intact = reader.is_intact(seq, len(columns["time"]))
+                del columns
+                if not intact:
+                    sent_seq = 0
+                    continue
+                if message is not None:
+                    sock.sendall(ws_frame(message))
+                sent_seq = seq
+        except (ConnectionError, OSError):
+            pass
+
+
+def serve(feed_name=FEED_NAME, host="127.0.0.1", port=DEFAULT_PORT):
+    """Serve the dashboard until interrupted. Waits for the monitor to publish its feed."""
+    reader = None
+    while reader is None:
+        try:
+            reader = SharedSeriesReader(feed_name)
+        except FileNotFoundError:
+            time.sleep(1.0)
+    DashboardHandler.reader = reader
+    server = ThreadingHTTPServer((host, port), DashboardHandler)
+    server.daemon_threads = True
+    print(f"[Info] Web dashboard on http://{host}:{port}/")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        DashboardHandler.reader = None
+        reader.close()
+
+
+class WebDashboard:
+    """Runs `serve` in a separate process, so viewers never compete with acquisition for the GIL."""
+
+    def __init__(self, feed_name=FEED_NAME, host="127.0.0.1", port=DEFAULT_PORT, startup_check=0.5):
+        # Bind once here so a port in use is reported to the caller, not only in the child's output
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as probe:
+            probe.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)  # As ThreadingHTTPServer does
+            try:
+                probe.bind((host, port))
+            except OSError as e:
+                raise RuntimeError(f"Cannot listen on {host}:{port}: {e}") from e
+        context = multiprocessing.get_context("spawn")
+        self.url = f"http://{host}:{port}/"
+        self.process = context.Process(target=serve, args=(feed_name, host, port), daemon=True)
+        self.process.start()
+        self.process.join(timeout=startup_check)
+        if not self.process.is_alive():
+            raise RuntimeError(f"The dashboard process exited at startup (code {self.process.exitcode}).")
+
+    def is_alive(self):
+        return self.process.is_alive()
+
+    def stop(self):
+        self.process.terminate()
+        self.process.join(timeout=2.0)
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve a live browser dashboard of the Lakeshore 335 feed.")
+    parser.add_argument("--host", default="127.0.0.1", help="Address to bind, 0.0.0.0 for the whole network")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"TCP port (default {DEFAULT_PORT})")
+    parser.add_argument("--name", default=FEED_NAME, help="Shared-memory segment name")
+    args = parser.parse_args()
+    try:
+        serve(args.name, args.host, args.port)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+from Lake_Shore_335_Alarms import AlarmEngine
+
+RULE = {"name": "A high", "channel": "A", "low": None, "high": 300.0, "hysteresis": 1.0, "holdoff": 5.0}
+
+
+def feed(engine, samples):
+    for t, temp_a in samples:
+        engine.push(t, temp_a, 10.0, 0.0, 0.0, 0.0, None)
+    return engine.evaluate()
+
+
+def test_holdoff_delays_the_raise():
+    engine = AlarmEngine([RULE])
+    # 4 s outside the limit, back inside, then 5 s outside again
+    transitions = feed(engine, [(0, 301), (4, 301), (5, 299.5), (6, 301), (10, 301), (11, 301)])
+    assert transitions == [("A high", "raised", 11.0, 301.0)]
+    assert engine.active_names() == ["A high"]
+
+
+def test_hysteresis_band_holds_the_alarm():
+    engine = AlarmEngine([RULE])
+    feed(engine, [(0, 305), (5, 305)])
+    # Inside the limit but within the 1 K hysteresis band: still active
+    assert feed(engine, [(6, 299.5), (7, 299.1)]) == []
+    assert engine.active_names() == ["A high"]
+    assert feed(engine, [(8, 298.9)]) == [("A high", "cleared", 8.0, 298.9)]
+    assert engine.active_names() == []
+
+
+def test_listeners_and_missing_values():
+    engine = AlarmEngine([dict(RULE, channel="heater", high=99.5, holdoff=0.0)])
+    seen = []
+    engine.add_listener(lambda *transition: seen.append(transition))
+    feed(engine, [(0, 301)])  # No heater reading: never raises
+    assert seen == []
+    engine.push(1, 301, 10, 0, 0, 0, 100.0)
+    engine.evaluate()
+    assert seen == [("A high", "raised", 1.0, 100.0)]
+
+
+def test_reset_forgets_states_and_pending_samples():
+    engine = AlarmEngine([RULE])
+    feed(engine, [(0, 305), (5, 305)])
+    engine.push(6, 305, 10, 0, 0, 0, None)
+    engine.reset()
+    assert engine.active_names() == []
+    assert engine.evaluate() == []
+    # The run time restarts at 0 s: the hold-off counts from the new violation
+    assert feed(engine, [(0, 305), (4, 305)]) == []
+    assert feed(engine, [(5, 305)]) == [("A high", "raised", 5.0, 305.0)]
@@ -0,0 +1,108 @@
+import pytest
+
+pyvisa = pytest.importorskip("pyvisa")
+
+import Lake_Shore_335_Connection as connection
+from Lake_Shore_335_Connection import CircuitBreaker, InstrumentLink
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(connection.time, "monotonic", clock)
+    return clock
+
+
+def test_breaker_opens_after_threshold(clock):
+    breaker = CircuitBreaker(failure_threshold=2, base_delay=0.5, max_delay=4.0)
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED and breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+    assert breaker.backoff() == pytest.approx(0.5)
+
+
+def test_breaker_half_open_probe_and_backoff(clock):
+    breaker = CircuitBreaker(failure_threshold=1, base_delay=0.5, max_delay=4.0)
+    breaker.record_failure()
+    delays = []
+    for _ in range(5):
+        delays.append(breaker.backoff())
+        clock.now += breaker.backoff()
+        assert breaker.allow() and breaker.state == CircuitBreaker.HALF_OPEN
+        assert not breaker.allow()  # Only one probe while half-open
+        breaker.record_failure()  # Failed probe trips again with a longer delay
+        assert breaker.state == CircuitBreaker.OPEN
+    assert delays == pytest.approx([0.5, 1.0, 2.0, 4.0, 4.0])
+
+    clock.now += breaker.backoff()
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED and breaker.allow()
+    breaker.record_failure()
+    assert breaker.backoff() == pytest.approx(0.5)  # Backoff restarts after a success
+
+
+class FakeResource:
+    def __init__(self, fail):
+        self.fail = fail
+        self.closed = False
+        self.timeout = None
+
+    def query(self, command):
+        if self.fail:
+            raise pyvisa.VisaIOError(-1073807339)  # VI_ERROR_TMO
+        return "LSCI,MODEL335,0,1.0"
+
+    def write(self, command):
+        return self.query(command)
+
+    def close(self):
+        self.closed = True
+
+
+class FakeManager:
+    def __init__(self):
+        self.fail = False
+        self.opened = []
+
+    def open_resource(self, address):
+        self.opened.append(FakeResource(self.fail))
+        return self.opened[-1]
+
+
+def test_failed_probes_do_not_leak_resources(clock, monkeypatch):
+    monkeypatch.setattr(connection.time, "sleep", lambda seconds: None)
+    rm = FakeManager()
+    link = InstrumentLink(rm, "GPIB0::12::INSTR")
+    link.open()
+    link.breaker.failure_threshold = 1
+    rm.opened[0].fail = rm.fail = True
+    attempts = []
+
+    def allow():
+        # The failing command, then two probes; the next check closes the link as the GUI would
+        attempts.append(clock.now)
+        if len(attempts) > 3:
+            link.close()
+            return False
+        return True
+
+    monkeypatch.setattr(link.breaker, "allow", allow)
+    with pytest.raises(ConnectionError):
+        link.run("KRDG? A", lambda res: res.query("KRDG? A"))
+    link.reconnect_thread.join(timeout=5)
+    assert not link.reconnect_thread.is_alive()
+    assert len(rm.opened) == 3  # The first session plus two failed probes
+    assert all(resource.closed for resource in rm.opened)
+    assert link.resource is None and link.state == "Disconnected"
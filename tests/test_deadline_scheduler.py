@@ -0,0 +1,86 @@
+import pytest
+
+from Lake_Shore_335_Deadline_Scheduler import DeadlineScheduler
+
+
+class FakeTk:
+    """Stands in for the Tk root and its clock: after() timers run when the test advances time."""
+
+    def __init__(self):
+        self.now = 100.0
+        self.timers = {}
+        self.next_id = 0
+
+    def clock(self):
+        return self.now
+
+    def after(self, ms, callback):
+        self.next_id += 1
+        self.timers[self.next_id] = (self.now + ms / 1000, callback)
+        return self.next_id
+
+    def after_cancel(self, after_id):
+        del self.timers[after_id]
+
+    def run_until(self, end):
+        while self.timers:
+            after_id, (due, callback) = min(self.timers.items(), key=lambda item: item[1][0])
+            if due > end:
+                break
+            del self.timers[after_id]
+            self.now = max(self.now, due)
+            callback()
+        self.now = max(self.now, end)
+
+
+def test_absolute_deadlines_do_not_drift():
+    tk = FakeTk()
+    scheduler = DeadlineScheduler(tk, clock=tk.clock)
+    calls = []
+
+    def work():
+        calls.append(tk.now)
+        tk.now += 0.3  # The work time must not stretch the period
+
+    job = scheduler.add("poll", work, 1.0)
+    tk.run_until(110.5)
+    assert calls == pytest.approx([100.0 + k for k in range(11)])
+    assert (job.fired, job.missed) == (11, 0)
+    assert job.jitter == pytest.approx(0.0, abs=1e-9)
+
+
+def test_overrun_skips_missed_deadlines():
+    tk = FakeTk()
+    scheduler = DeadlineScheduler(tk, clock=tk.clock)
+    calls = []
+
+    def work():
+        calls.append(tk.now)
+        if len(calls) == 3:
+            tk.now += 3.5  # Runs past the deadlines at 103, 104 and 105
+
+    job = scheduler.add("poll", work, 1.0)
+    tk.run_until(108.5)
+    # The 103 deadline runs once, late, at 105.5; 104 and 105 are skipped instead of caught up
+    assert calls == pytest.approx([100, 101, 102, 105.5, 106, 107, 108])
+    assert job.missed == 2
+    assert job.max_late == pytest.approx(2.5)
+    assert job.max_error == pytest.approx(0.5)  # 3.5 s against 3 intervals
+
+
+def test_cancel_and_interval_change():
+    tk = FakeTk()
+    scheduler = DeadlineScheduler(tk, clock=tk.clock)
+    fast, slow = [], []
+    scheduler.add("fast", lambda: fast.append(tk.now), 0.5)
+    job = scheduler.add("slow", lambda: slow.append(tk.now), 2.0)
+    tk.run_until(102.1)
+    job.set_interval(1.0)  # Next run one new interval after the run at 102
+    tk.run_until(104.1)
+    job.cancel()
+    tk.run_until(106.0)
+    assert slow == pytest.approx([100, 102, 103, 104])
+    assert len(fast) == 13
+    assert scheduler.find("slow") == []
+    scheduler.stop()
+    assert tk.timers == {}
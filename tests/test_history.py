@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+from Lake_Shore_335_History import SampleHistory, CompactHistory
+
+
+@pytest.fixture
+def filled(tmp_path):
+    """A SampleHistory that spilled several times, and the same rows as a plain array."""
+    history = SampleHistory(("time", "A", "B", "diff"), ram_budget_mb=0.1, spill_dir=str(tmp_path))
+    rng = np.random.default_rng(2)
+    t = np.cumsum(rng.uniform(0.05, 0.15, 20_000))
+    reference = np.column_stack([t, 300 + rng.normal(size=len(t)), rng.normal(size=len(t)), rng.normal(size=len(t))])
+    for row in reference:
+        history.append(row)
+    yield history, reference
+    history.close()
+
+
+def test_spills_and_keeps_every_row(filled):
+    history, reference = filled
+    assert history.spilled > 3 * history.ram_rows  # Several spill cycles
+    assert len(history) == len(reference)
+    np.testing.assert_array_equal(history.rows(), reference)
+    np.testing.assert_array_equal(history.last(), reference[-1])
+
+
+def test_strided_rows_across_spill_boundary(filled):
+    history, reference = filled
+    rng = np.random.default_rng(3)
+    boundary = history.spilled
+    cases = [(boundary - 5, boundary + 5, 3), (boundary - 1, len(reference), 7), (0, boundary + 1, boundary),
+             (boundary, boundary + 100, 9), (boundary - 100, boundary, 11)]
+    cases += [tuple(sorted(rng.integers(0, len(reference), 2))) + (int(rng.integers(1, 500)),) for _ in range(300)]
+    for start, stop, step in cases:
+        np.testing.assert_array_equal(history.rows(start, stop, step), reference[start:stop:step],
+                                      err_msg=f"rows({start}, {stop}, {step})")
+
+
+def test_bisect_and_window(filled):
+    history, reference = filled
+    t = reference[:, 0]
+    rng = np.random.default_rng(4)
+    queries = np.concatenate([t[rng.integers(0, len(t), 200)], rng.uniform(t[0] - 1, t[-1] + 1, 200),
+                              [t[history.spilled - 1], t[history.spilled], t[0], t[-1]]])
+    for q in queries:
+        assert history.bisect(q) == np.searchsorted(t, q, side="left")
+
+    for _ in range(200):
+        t0, t1 = np.sort(rng.choice(t, 2))
+        expected = reference[(t >= t0) & (t <= t1)]
+        np.testing.assert_array_equal(history.window(t0, t1), expected)
+        decimated = history.window(t0, t1, max_points=50)
+        assert len(decimated) <= 50
+        if len(expected):
+            assert decimated[0, 0] == expected[0, 0]
+
+
+def test_compact_history_matches(filled):
+    history, reference = filled
+    compact = CompactHistory(history.fields, chunk_rows=1024)
+    for row in reference:
+        compact.append(row)
+    t = reference[:, 0]
+    rng = np.random.default_rng(5)
+    for _ in range(200):
+        t0, t1 = np.sort(rng.choice(t, 2))
+        a, b = history.window(t0, t1), compact.window(t0, t1)
+        assert len(a) == len(b)
+        np.testing.assert_allclose(b, a, rtol=0, atol=5e-5 + 1e-9)
+    start, stop, step = 100, len(reference) - 3, 37
+    np.testing.assert_allclose(compact.rows(start, stop, step), reference[start:stop:step], rtol=0, atol=5e-5 + 1e-9)
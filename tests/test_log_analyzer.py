@@ -0,0 +1,67 @@
+import csv
+import sys
+
+import numpy as np
+import pytest
+
+import Lake_Shore_335_Log_Analyzer as analyzer
+
+HEADER = ["Time (s)", "Channel A (K)", "Channel B (K)", "Abs Diff (K)", "Rate A (K/min)", "Rate B (K/min)",
+          "Heater (%)", "Event"]
+
+
+@pytest.fixture
+def log(tmp_path):
+    """A 0.5 s log at 300 K with mK noise, a hold then a ramp: (path, rows)."""
+    rng = np.random.default_rng(0)
+    t = np.arange(3000) * 0.5
+    a = 300 + np.where(t < 600, 0.0, (t - 600) / 60 * 0.2) + rng.normal(0, 0.001, len(t))
+    b = a + 0.25 + rng.normal(0, 0.001, len(t))
+    path = tmp_path / "run.csv"
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(HEADER)
+        for row in zip(t, a, b, np.abs(a - b)):
+            writer.writerow([f"{row[0]:.1f}", f"{row[1]:.6f}", f"{row[2]:.6f}", f"{row[3]:.6f}", 0, 0, 10.0, ""])
+    return path, np.loadtxt(path, delimiter=",", skiprows=1, usecols=(0, 1, 2, 3))
+
+
+def run(monkeypatch, capsys, *args):
+    monkeypatch.setattr(sys, "argv", ["Lake_Shore_335_Log_Analyzer.py", *map(str, args)])
+    analyzer.main()
+    return capsys.readouterr().out
+
+
+def test_single_pass_and_workers_agree(log, tmp_path, monkeypatch, capsys):
+    path, _ = log
+    # About 1 KB per chunk, so every 60 s segment (120 rows) is split across several chunks and
+    # the worker byte ranges start in the middle of segments
+    common = ["--segment", 60, "--chunk-mb", 0.001]
+    single_runs = run(monkeypatch, capsys, path, *common, "--out", tmp_path / "single.csv")
+    parallel_runs = run(monkeypatch, capsys, path, *common, "--workers", 3, "--out", tmp_path / "parallel.csv")
+    single = (tmp_path / "single.csv").read_text().splitlines()
+    assert len(single) == 26
+    assert (tmp_path / "parallel.csv").read_text().splitlines() == single
+    assert parallel_runs == single_runs
+
+
+def test_ranges_match_two_pass_reference(log):
+    path, rows = log
+    segment, chunk_bytes = 60.0, 1024
+    segments = {}
+    for start, end in analyzer.aligned_ranges(path, 3):
+        part, _ = analyzer.analyze_range(path, start, end, segment, chunk_bytes)
+        for index, acc in part.items():
+            segments[index] = segments[index].merge(acc) if index in segments else acc
+    assert sorted(segments) == list(range(25))
+
+    index = np.floor(rows[:, 0] / segment).astype(int)
+    for k, acc in segments.items():
+        part = rows[index == k]
+        assert acc.n == len(part)
+        np.testing.assert_allclose(acc.sum / acc.n, part[:, 1:].mean(axis=0), rtol=1e-12)
+        np.testing.assert_allclose(np.sqrt(acc.m2 / acc.n), part[:, 1:].std(axis=0), rtol=1e-6)
+        np.testing.assert_array_equal(acc.min, part[:, 1:].min(axis=0))
+        np.testing.assert_array_equal(acc.max, part[:, 1:].max(axis=0))
+        slopes = [np.polyfit(part[:, 0], part[:, i], 1)[0] * 60 for i in (1, 2)]
+        np.testing.assert_allclose(acc.slope(), slopes, rtol=1e-6, atol=1e-9)
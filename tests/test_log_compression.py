@@ -0,0 +1,73 @@
+import numpy as np
+
+from Lake_Shore_335_Log_Compression import SwingingDoorCompressor, resample
+
+
+def synthetic_log(n=200_000, dt=0.1, seed=0):
+    """Holds, ramps and a slow oscillation with sensor noise: (t, A, B, heater)."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(n) * dt
+    profile = np.interp(t, [0, 4000, 8000, 12000, 16000, t[-1]], [300, 300, 200, 200, 250, 250])
+    a = profile + 0.02 * np.sin(2 * np.pi * t / 900) + rng.normal(0, 0.002, n)
+    b = np.convolve(a, np.full(50, 1 / 50), mode="same") + 0.3 + rng.normal(0, 0.002, n)
+    heater = np.clip(40 + 10 * np.sin(2 * np.pi * t / 3000) + rng.normal(0, 0.5, n), 0, 100)
+    return t, np.column_stack([a, b, heater])
+
+
+def compress(t, values, deviations, max_interval=600.0, events=()):
+    compressor = SwingingDoorCompressor(deviations, max_interval)
+    events = set(events)
+    kept = []
+    for i in range(len(t)):
+        kept += compressor.push(t[i], values[i], i, force=i in events)
+    kept += compressor.flush()
+    return np.array(kept), compressor
+
+
+def test_interpolation_error_within_deviation():
+    t, values = synthetic_log()
+    deviations = np.array([0.005, 0.005, 1.0])
+    kept, compressor = compress(t, values, deviations)
+    assert compressor.ratio() > 2
+    assert kept[0] == 0 and kept[-1] == len(t) - 1
+    for i, deviation in enumerate(deviations):
+        error = np.abs(np.interp(t, t[kept], values[kept, i]) - values[:, i])
+        assert error.max() <= deviation * (1 + 1e-9)
+
+
+def test_events_and_max_interval_are_kept():
+    t, values = synthetic_log(n=50_000)
+    events = [123, 20_000, 49_000]
+    kept, _ = compress(t, values, [1.0, 1.0, 50.0], max_interval=60.0, events=events)
+    assert set(events) <= set(kept.tolist())
+    assert np.diff(t[kept]).max() <= 60.0 + 1e-9
+
+
+def test_nan_transitions_are_kept():
+    t = np.arange(100) * 1.0
+    values = np.full((100, 3), 10.0)
+    values[40:60, 2] = np.nan  # Heater reading missing for a while
+    kept, _ = compress(t, values, [0.1, 0.1, 0.1])
+    assert {39, 40, 59, 60} <= set(kept.tolist())
+
+
+def test_resample_joins_chunks_seamlessly():
+    t, values = synthetic_log(n=50_000)
+    kept, _ = compress(t, values, [0.005, 0.005, 1.0])
+    rows = np.column_stack([t[kept], values[kept, 0], values[kept, 1], np.abs(values[kept, 0] - values[kept, 1])])
+    whole = resample(rows, 0.1)
+
+    rng = np.random.default_rng(1)
+    cuts = np.sort(rng.choice(np.arange(1, len(rows)), size=20, replace=False))
+    parts, previous = [], None
+    for chunk in np.split(rows, cuts):
+        parts.append(resample(chunk, 0.1, previous))
+        previous = chunk[-1]
+    chunked = np.concatenate(parts)
+
+    assert len(chunked) == len(whole)
+    np.testing.assert_allclose(chunked, whole, rtol=0, atol=1e-9)
+    np.testing.assert_allclose(np.diff(chunked[:, 0]), 0.1, atol=1e-6)
+    # The reconstruction stays within the deadband of the original samples
+    grid = np.round(whole[:, 0] / 0.1).astype(int)
+    assert np.abs(whole[:, 1] - values[grid, 0]).max() <= 0.005 * (1 + 1e-9)
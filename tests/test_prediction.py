@@ -0,0 +1,48 @@
+import math
+
+import numpy as np
+import pytest
+
+from Lake_Shore_335_Prediction import ApproachPredictor
+
+
+def approach(t, t_inf=10.0, t0=300.0, tau=300.0):
+    return t_inf + (t0 - t_inf) * np.exp(-t / tau)
+
+
+def test_recovers_known_ar_coefficient():
+    predictor = ApproachPredictor(window=600.0)
+    rng = np.random.default_rng(2)
+    t = np.arange(0.0, 900.0, 1.0)
+    for ti, temp in zip(t, approach(t) + rng.normal(0, 0.005, len(t))):
+        predictor.update(ti, temp)
+    phi, sigma = predictor.fit()
+    # Pairs 60 s apart: T(t + 60) = c + phi * T(t) with phi = exp(-60 / tau)
+    assert phi == pytest.approx(math.exp(-60.0 / 300.0), abs=1e-4)
+    assert abs(phi - math.exp(-60.0 / 300.0)) < 4 * sigma
+    t_inf, tau = predictor.model(phi)
+    assert t_inf == pytest.approx(10.0, abs=0.1)
+    assert tau == pytest.approx(300.0, rel=1e-3)
+
+
+def test_eta_to_the_setpoint_band():
+    predictor = ApproachPredictor(window=600.0)
+    t = np.arange(0.0, 700.0, 1.0)
+    for ti, temp in zip(t, approach(t)):
+        predictor.update(ti, temp)
+    result = predictor.predict(setpoint=10.0, tolerance=0.1, rate_threshold=0.01, dwell=60.0)
+    # Exact model: |T - 10| = 290 exp(-t / 300) reaches 0.1 K at t = 300 ln(2900)
+    expected = 300.0 * math.log(2900.0) - t[-1]
+    estimate, low, high = result["band"]
+    assert estimate == pytest.approx(expected, rel=1e-6)
+    assert low <= estimate <= high
+    assert result["settled"][0] >= estimate + 60.0
+
+
+def test_linear_ramp_falls_back_to_the_slope():
+    predictor = ApproachPredictor(window=600.0)
+    for ti in np.arange(0.0, 700.0, 1.0):
+        predictor.update(ti, 100.0 + ti / 60.0)  # 1 K/min
+    assert predictor.model(predictor.fit()[0])[0] is None
+    estimate = predictor.predict(setpoint=120.0, tolerance=0.0, rate_threshold=0.01, dwell=0.0)["band"][0]
+    assert estimate == pytest.approx((120.0 - (100.0 + 699.0 / 60.0)) * 60.0, rel=1e-3)
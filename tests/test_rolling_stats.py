@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+
+from Lake_Shore_335_Rolling_Stats import RollingStats
+
+
+def test_window_matches_numpy():
+    rng = np.random.default_rng(1)
+    # Irregular sampling over a long run at 300 K with a slow drift, noise and spikes
+    t = np.cumsum(rng.uniform(0.05, 0.5, 20000))
+    x = 300 + 0.01 * t / 60 + rng.normal(0, 0.002, len(t))
+    x[rng.integers(0, len(t), 50)] += rng.normal(0, 0.5, 50)
+    stats = RollingStats(window=30.0)
+    for i in range(len(t)):
+        stats.add(t[i], x[i])
+        if i % 997 == 0 or i == len(t) - 1:
+            inside = (t[i] - t[:i + 1]) <= 30.0
+            tw, xw = t[:i + 1][inside], x[:i + 1][inside]
+            assert stats.n == len(xw)
+            assert stats.mean == pytest.approx(xw.mean(), rel=1e-12)
+            assert stats.minimum == xw.min()
+            assert stats.maximum == xw.max()
+            if len(xw) > 2:
+                assert stats.std == pytest.approx(xw.std(ddof=1), rel=1e-8)
+                assert stats.drift == pytest.approx(np.polyfit(tw, xw, 1)[0] * 60, rel=1e-6, abs=1e-9)
+                assert stats.span() == pytest.approx(tw[-1] - tw[0])
+
+
+def test_shrinking_the_window_and_emptying_it():
+    stats = RollingStats(window=100.0)
+    for t, x in enumerate([5.0, 1.0, 4.0, 2.0, 3.0]):
+        stats.add(float(t), x)
+    stats.set_window(1.5)  # Keeps t = 3, 4
+    assert (stats.n, stats.minimum, stats.maximum) == (2, 2.0, 3.0)
+    assert stats.std == pytest.approx(np.std([2.0, 3.0], ddof=1))
+    stats.set_window(100.0)
+    stats.add(200.0, 7.0)  # Everything else expires
+    assert (stats.n, stats.mean, stats.minimum, stats.maximum, stats.std, stats.drift) == (1, 7.0, 7.0, 7.0, None, None)
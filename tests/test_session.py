@@ -0,0 +1,131 @@
+import os
+
+import numpy as np
+import pytest
+
+from Lake_Shore_335_History import SampleHistory, CompactHistory
+from Lake_Shore_335_Session import SessionFile, HEADER_BYTES
+
+FIELDS = ("time", "A", "B", "diff", "heater")
+META = {"start_time": 1700000000.0, "time_range": 300.0}
+
+
+def fill(history, start, stop, seed=0):
+    """Rows depend only on the index and seed, so filling in pieces gives the same history."""
+    for i in range(start, stop):
+        a = 300 - 0.001 * i + 0.001 * np.sin(1.7 * i + seed)
+        b = a + 0.25
+        history.append((0.1 * i, a, b, abs(a - b), 40.0 + (i % 7)))
+
+
+def expected_rows(n, seed=0):
+    history = SampleHistory(FIELDS, ram_budget_mb=1)
+    fill(history, 0, n, seed)
+    rows = np.array(history.rows())
+    history.close()
+    return rows
+
+
+@pytest.fixture
+def history(tmp_path):
+    # A small RAM budget so the saved rows span the spill file and the RAM block
+    history = SampleHistory(FIELDS, ram_budget_mb=1, spill_dir=str(tmp_path))
+    yield history
+    history.close()
+
+
+def test_full_save_then_appends(tmp_path, history):
+    session = SessionFile(str(tmp_path / "session.bin"))
+    fill(history, 0, 30_000)
+    session.save(history, META)
+    size_after_first = os.path.getsize(session.path)
+    for stop in (30_001, 45_000, 80_000):
+        fill(history, len(history), stop)
+        session.save(history, dict(META, time_range=float(stop)))
+
+    meta, rows = SessionFile(session.path).load()
+    assert meta["rows"] == 80_000 and meta["time_range"] == 80_000.0
+    assert meta["fields"] == list(FIELDS) and meta["start_time"] == META["start_time"]
+    np.testing.assert_array_equal(rows, expected_rows(80_000))
+    assert os.path.getsize(session.path) == HEADER_BYTES + 80_000 * 8 * len(FIELDS) > size_after_first
+
+
+def test_rewrite_after_reset(tmp_path, history):
+    session = SessionFile(str(tmp_path / "session.bin"))
+    fill(history, 0, 50_000)
+    session.save(history, META)
+
+    # Reset Time: the history starts over and the next save must not append to the old rows
+    history.clear()
+    session.saved_rows = None
+    fill(history, 0, 60_000, seed=5)
+    session.save(history, META)
+
+    _, rows = SessionFile(session.path).load()
+    np.testing.assert_array_equal(rows, expected_rows(60_000, seed=5))
+
+
+def test_shrunk_history_forces_rewrite(tmp_path, history):
+    session = SessionFile(str(tmp_path / "session.bin"))
+    fill(history, 0, 20_000)
+    session.save(history, META)
+    history.clear()
+    fill(history, 0, 1_000)
+    session.save(history, META)  # Fewer rows than saved: rewritten even without saved_rows = None
+    _, rows = SessionFile(session.path).load()
+    np.testing.assert_array_equal(rows, expected_rows(1_000))
+
+
+@pytest.mark.parametrize("make_history", [
+    lambda tmp_path: SampleHistory(FIELDS, ram_budget_mb=1, spill_dir=str(tmp_path)),
+    lambda tmp_path: CompactHistory(FIELDS, chunk_rows=4096),
+], ids=["sample", "compact"])
+def test_restore_into_history(tmp_path, history, make_history):
+    session = SessionFile(str(tmp_path / "session.bin"))
+    fill(history, 0, 70_000)
+    session.save(history, META)
+
+    _, rows = SessionFile(session.path).load()
+    restored = make_history(tmp_path)
+    restored.load(rows)
+    del rows
+    expected = expected_rows(70_000)
+    assert len(restored) == len(expected)
+    # CompactHistory keeps 0.1 ms / 0.1 mK / 0.01 % resolution
+    np.testing.assert_allclose(restored.rows(), expected, rtol=0, atol=1e-2 / 2 + 1e-9)
+    np.testing.assert_allclose(restored.rows()[:, :4], expected[:, :4], rtol=0, atol=1e-4 / 2 + 1e-9)
+
+    # Appending continues seamlessly after the restored rows
+    fill(restored, 70_000, 72_000)
+    np.testing.assert_allclose(restored.rows(69_000, 72_000), expected_rows(72_000)[69_000:], rtol=0, atol=5e-3 + 1e-9)
+    restored.close()
+
+
+def test_rows_beyond_header_count_are_ignored(tmp_path, history):
+    session = SessionFile(str(tmp_path / "session.bin"))
+    fill(history, 0, 10_000)
+    session.save(history, META)
+    # A crash after appending rows but before rewriting the header
+    with open(session.path, "ab") as f:
+        f.write(np.full((500, len(FIELDS)), 1e9).tobytes())
+        f.write(b"\x01\x02\x03")  # Partial row
+    meta, rows = SessionFile(session.path).load()
+    assert meta["rows"] == 10_000
+    np.testing.assert_array_equal(rows, expected_rows(10_000))
+
+
+def test_truncated_file_is_rejected(tmp_path, history):
+    session = SessionFile(str(tmp_path / "session.bin"))
+    fill(history, 0, 10_000)
+    session.save(history, META)
+    with open(session.path, "r+b") as f:
+        f.truncate(HEADER_BYTES + 9_000 * 8 * len(FIELDS))
+    with pytest.raises(ValueError, match="truncated"):
+        SessionFile(session.path).load()
+
+
+def test_not_a_snapshot(tmp_path):
+    path = tmp_path / "log.csv"
+    path.write_text("Time (s),Channel A (K)\n" * 300)
+    with pytest.raises(ValueError):
+        SessionFile(str(path)).load()
@@ -0,0 +1,31 @@
+import numpy as np
+import pytest
+
+from Lake_Shore_335_Settling import SettleDetector
+
+
+def test_rate_matches_least_squares_late_in_a_long_run():
+    rng = np.random.default_rng(8)
+    # A week into the run, where sums of raw times would have lost the slope
+    t = 600000.0 + np.cumsum(rng.uniform(0.1, 0.3, 30000))
+    temp = 300.0 + 0.05 * np.sin(t / 500.0) + rng.normal(0, 0.001, len(t))
+    detector = SettleDetector(rate_window=60.0)
+    for i in range(len(t)):
+        detector.update(t[i], temp[i])
+        if i % 1999 == 0 and i > 1000:
+            inside = t[i] - t[:i + 1] <= 60.0
+            expected = np.polyfit(t[:i + 1][inside], temp[:i + 1][inside], 1)[0] * 60.0
+            assert detector.rate == pytest.approx(expected, rel=1e-6, abs=1e-9)
+
+
+def test_reached_settled_and_unsettled():
+    events = []
+    detector = SettleDetector(setpoint=100.0, tolerance=0.1, rate_threshold=0.01, dwell=30.0, rate_window=10.0)
+    detector.add_listener(lambda event, t, _: events.append((event, t)))
+    t = np.arange(0.0, 200.0, 1.0)
+    temp = np.where(t < 50, 99.0 + t / 50.0, 100.0)
+    temp[t >= 150] = 100.5  # Jumps out of the band
+    for ti, value in zip(t, temp):
+        detector.update(ti, value)
+    # In band from 45 s, flat from 60 s (window clear of the ramp), settled after 30 s of dwell
+    assert events == [("reached", 45.0), ("settled", 90.0), ("unsettled", 150.0)]
@@ -0,0 +1,65 @@
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from Lake_Shore_335_Shared_Memory import OWNER_INDEX, SharedSeriesReader, SharedSeriesWriter
+
+FIELDS = ("time", "A")
+
+
+@pytest.fixture
+def name(request):
+    return f"ls335_test_{os.getpid()}_{request.node.name}"[:30]
+
+
+def test_extend_matches_append(name):
+    writer = SharedSeriesWriter(name, FIELDS, capacity=50)
+    reference = SharedSeriesWriter(name + "r", FIELDS, capacity=50)
+    try:
+        # The second block wraps around the end of the ring
+        for chunk in (np.arange(30.0), np.arange(30.0, 70.0), np.arange(70.0, 120.0)):
+            writer.extend([chunk, chunk * 2])
+            for value in chunk:
+                reference.append((value, value * 2))
+            assert writer.seq == reference.seq
+            np.testing.assert_array_equal(writer.data, reference.data)
+        # A block longer than the ring keeps its newest samples
+        writer.extend([np.arange(120.0, 300.0), np.zeros(180)])
+        reader = SharedSeriesReader(name)
+        columns, seq = reader.latest()
+        np.testing.assert_array_equal(columns["time"], np.arange(250.0, 300.0))
+        del columns
+        reader.close()
+    finally:
+        writer.close()
+        reference.close()
+
+
+def test_segment_of_a_running_owner_is_kept(name):
+    writer = SharedSeriesWriter(name, FIELDS, capacity=10)
+    try:
+        writer.append((1.0, 2.0))
+        with pytest.raises(FileExistsError, match="in use by process"):
+            SharedSeriesWriter(name, FIELDS, capacity=10)
+        assert writer.seq == 1
+    finally:
+        writer.close()
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="Windows frees segments with their last handle")
+def test_segment_of_a_dead_owner_is_taken_over(name):
+    stale = SharedSeriesWriter(name, FIELDS, capacity=10)
+    stale.append((1.0, 2.0))
+    child = subprocess.run([sys.executable, "-c", "import os; print(os.getpid())"], capture_output=True, text=True)
+    stale.header[OWNER_INDEX] = int(child.stdout)  # As if that process had crashed holding the feed
+    writer = SharedSeriesWriter(name, FIELDS, capacity=10)
+    try:
+        assert writer.seq == 0
+        assert writer.header[OWNER_INDEX] == os.getpid()
+    finally:
+        stale.header = stale.settings = stale.data = None
+        stale.shm.close()
+        writer.close()
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from Lake_Shore_335_Thermal_Lag import estimate_lag, lag_corrected_difference, lag_correlation
+
+
+def smooth_signal(t, seed):
+    """Sum of slow sines with random phases: features on several time scales, no constant ramp."""
+    rng = np.random.default_rng(seed)
+    periods = rng.uniform(40.0, 400.0, 8)
+    phases = rng.uniform(0, 2 * np.pi, 8)
+    return 100.0 + sum(np.sin(2 * np.pi * t / p + f) for p, f in zip(periods, phases))
+
+
+def test_lag_correlation_matches_brute_force():
+    rng = np.random.default_rng(3)
+    a, b = rng.normal(size=200), rng.normal(size=200)
+    b[5:] += a[:-5]
+    shifts, r = lag_correlation(a, b, 20)
+    for k, value in zip(shifts, r):
+        x, y = (a[:len(a) - k], b[k:]) if k >= 0 else (a[-k:], b[:len(b) + k])
+        assert value == pytest.approx(np.corrcoef(x, y)[0, 1], abs=1e-9)
+    assert shifts[np.argmax(r)] == 5
+
+
+def test_recovers_a_known_lag_gain_and_offset():
+    rng = np.random.default_rng(4)
+    t = np.sort(rng.uniform(0.0, 1800.0, 6000))  # Irregular sampling, about 0.3 s apart
+    a = smooth_signal(t, 5)
+    b = 0.8 * smooth_signal(t - 7.3, 5) + 5.0 + rng.normal(0, 0.001, len(t))
+    result = estimate_lag(t, a, b)
+    step = 1800.0 / 512
+    assert result["lag"] == pytest.approx(7.3, abs=0.2 * step)  # Sub-step refinement
+    assert result["gain"] == pytest.approx(0.8, rel=0.02)
+    assert result["offset"] == pytest.approx(5.0, abs=0.5)
+    assert result["correlation"] > 0.99
+
+    # The reverse order gives a negative lag
+    assert estimate_lag(t, b, a)["lag"] == pytest.approx(-7.3, abs=0.2 * step)
+
+
+def test_featureless_window_has_no_lag():
+    t = np.arange(0.0, 600.0, 0.5)
+    rng = np.random.default_rng(6)
+    ramp = 50.0 + t / 60.0
+    assert estimate_lag(t, ramp + rng.normal(0, 1e-4, len(t)), ramp + 0.3 + rng.normal(0, 1e-4, len(t))) is None
+    assert estimate_lag(t[:10], ramp[:10], ramp[:10]) is None
+
+
+def test_lag_corrected_difference():
+    t = np.arange(0.0, 100.0, 1.0)
+    a = smooth_signal(t, 7)
+    b = smooth_signal(t - 4.0, 7)
+    out = lag_corrected_difference(t, a, b, 4.0)
+    assert np.isnan(out[:4]).all()
+    np.testing.assert_allclose(out[4:], 0.0, atol=1e-12)